@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass, asdict
+import os
+from dataclasses import asdict, dataclass, fields
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.engine.audit_index import AuditIndex
+from app.engine.audit_rollups import AuditRollups
+from app.engine.audit_segments import AuditSegments
+from app.engine.group_commit import GroupCommitWriter
 
 
 @dataclass(frozen=True)
@@ -18,23 +24,188 @@ class AuditLogEntry:
     allowed: bool
     reasons: tuple[str, ...]
     completeness_percent: Optional[int]
+    cache_hit: bool = False  # decision came from GateEngine's decision cache
+    entity_id: Optional[str] = None  # None for ad-hoc checks not tied to a stored entity
+
+    @classmethod
+    def from_json(cls, row: Dict[str, Any]) -> "AuditLogEntry":
+        """Rebuild an entry from its JSON line; unknown keys are ignored, missing optional ones
+        defaulted."""
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in row.items() if k in known}
+        values["reasons"] = tuple(values.get("reasons", ()))
+        return cls(**values)
 
 
 class AuditLogger:
     """
     Simple JSONL audit logger.
-    Appends one JSON record per transition attempt
+    Appends one JSON record per transition attempt.
+
+    By default each log()/log_many() call is written straight away and the
+    file closed again. With buffered=True the file stays open and entries are
+    committed in groups (every `flush_entries` entries or `flush_interval`
+    seconds), fsynced per `fsync` policy ("none", "batch" or "entry"). Using
+    the logger as a context manager buffers even an unbuffered logger until
+    the block ends, so a batch command commits once:
+
+        with AuditLogger(path, fsync="batch") as audit:
+            audit.log_many(entries)
+
+    Leave the block (or call close()) to write the last group.
+
+    With segment_bytes / segment_age set, the log rotates into compressed,
+    block-indexed segments once the active file reaches that size or age
+    (see AuditSegments); read() covers rotated and active segments alike.
+
+    Unless index=False, every write also catches up the per-entity history
+    index (see AuditIndex), which query() uses to read one entity's or one
+    type's entries without scanning the whole log. Likewise, unless
+    rollups=False, it folds new entries into the allowed/blocked rollups
+    (see AuditRollups) that the stats command reads.
     """
 
-    def __init__(self, path:Path):
+    def __init__(
+        self,
+        path: Path,
+        *,
+        buffered: bool = False,
+        flush_entries: int = 256,
+        flush_interval: float = 1.0,
+        fsync: str = "none",
+        segment_bytes: int = 0,
+        segment_age: float = 0.0,
+        index: bool = True,
+        rollups: bool = True,
+    ):
         self._path = path
+        self._buffered = buffered
+        self._depth = 0
+        self.segments = AuditSegments(path, max_bytes=segment_bytes, max_age=segment_age)
+        self.index: Optional[AuditIndex] = AuditIndex(self.segments) if index else None
+        self.rollups: Optional[AuditRollups] = AuditRollups(self.segments) if rollups else None
+        self._writer = GroupCommitWriter(
+            path,
+            flush_entries=flush_entries,
+            flush_interval=flush_interval,
+            fsync=fsync,
+            lock_path=self.segments.lock_path,
+        )
+
+    @classmethod
+    def from_env(cls, path: Path) -> "AuditLogger":
+        """
+        GUARDIAN_AUDIT_BUFFER=<entries> keeps the log open and commits in groups
+        of that size (default 0: write every call); GUARDIAN_AUDIT_FSYNC picks
+        the fsync policy (default none). GUARDIAN_AUDIT_SEGMENT_BYTES and
+        GUARDIAN_AUDIT_SEGMENT_AGE (seconds) turn on rotation (default off).
+        GUARDIAN_AUDIT_INDEX=0 / GUARDIAN_AUDIT_ROLLUPS=0 stop maintaining the
+        history index / the stats rollups on write.
+        """
+        buffer = int(os.getenv("GUARDIAN_AUDIT_BUFFER", "0"))
+        fsync = os.getenv("GUARDIAN_AUDIT_FSYNC", "none").strip().lower()
+        return cls(
+            path,
+            buffered=buffer > 0,
+            flush_entries=max(1, buffer),
+            fsync=fsync,
+            segment_bytes=int(os.getenv("GUARDIAN_AUDIT_SEGMENT_BYTES", "0")),
+            segment_age=float(os.getenv("GUARDIAN_AUDIT_SEGMENT_AGE", "0")),
+            index=_env_flag("GUARDIAN_AUDIT_INDEX"),
+            rollups=_env_flag("GUARDIAN_AUDIT_ROLLUPS"),
+        )
 
     def log(self, entry: AuditLogEntry) -> None:
-        record = asdict(entry)
-        with self._path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(record))
-            f.write("\n")
+        self.log_many([entry])
+
+    def log_many(self, entries: Iterable[AuditLogEntry]) -> None:
+        """Append several entries as one group."""
+        lines = [json.dumps(asdict(entry)) for entry in entries]
+        if self._buffered or self._depth:
+            self._writer.write(lines)
+        else:
+            self._writer.append_once(lines)
+        if not self._writer.pending:
+            self._after_write()
+
+    def flush(self) -> None:
+        self._writer.flush()
+        self._after_write()
+
+    def close(self) -> None:
+        self._writer.close()
+        self._after_write()
+        if self.index is not None:
+            self.index.close()
+
+    def _after_write(self) -> None:
+        if self.index is not None:
+            self.index.catch_up()
+        if self.rollups is not None:
+            self.rollups.catch_up()
+        self.segments.maybe_rotate()
+
+    def read(
+        self, *, since: Optional[str] = None, until: Optional[str] = None
+    ) -> Iterator[AuditLogEntry]:
+        """Entries with since <= timestamp <= until (ISO-8601, UTC), across all segments."""
+        for row in self.segments.read(since=since, until=until):
+            try:
+                yield AuditLogEntry.from_json(row)
+            except TypeError:
+                continue  # not an audit entry (missing required fields)
+
+    def query(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        from_state: Optional[str] = None,
+        to_state: Optional[str] = None,
+        allowed: Optional[bool] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Iterator[AuditLogEntry]:
+        """
+        Entries matching every given filter, in log order. With an entity
+        type the history index picks the lines to read; otherwise the log
+        is scanned (time-pruned by segment and block).
+        """
+        if entity_id is not None and entity_type is None:
+            raise ValueError("Filtering by entity_id needs an entity_type.")
+        if entity_type is not None and self.index is not None:
+            rows = self.index.lookup(entity_type, entity_id, since=since, until=until)
+        else:
+            rows = self.segments.read(since=since, until=until)
+        for row in rows:
+            try:
+                entry = AuditLogEntry.from_json(row)
+            except TypeError:
+                continue
+            if (
+                (entity_type is None or entry.entity_type == entity_type)
+                and (entity_id is None or entry.entity_id == entity_id)
+                and (from_state is None or entry.from_state == from_state)
+                and (to_state is None or entry.to_state == to_state)
+                and (allowed is None or entry.allowed == allowed)
+                and (since is None or entry.timestamp >= since)
+                and (until is None or entry.timestamp <= until)
+            ):
+                yield entry
+
+    def __enter__(self) -> "AuditLogger":
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self.close()
 
     @staticmethod
     def now_iso() -> str:
-        return datetime.now(timezone.utc).isoformat()
\ No newline at end of file
+        return datetime.now(timezone.utc).isoformat()
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "1").strip().lower() not in ("0", "false", "no")
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from app.engine.audit_segments import AuditSegments
+from app.engine.locking import file_lock
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    entity_type TEXT NOT NULL,
+    entity_id   TEXT,
+    ts          TEXT,
+    seg         INTEGER NOT NULL,
+    pos         INTEGER NOT NULL,
+    PRIMARY KEY (seg, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_history_entity ON history (entity_type, entity_id, seg, pos);
+CREATE TABLE IF NOT EXISTS watermark (
+    id  INTEGER PRIMARY KEY CHECK (id = 0),
+    seg INTEGER NOT NULL,
+    pos INTEGER NOT NULL
+);
+"""
+
+
+class AuditIndex:
+    """
+    Per-entity history index over a (segmented) audit log.
+
+    Maps (entity_type, entity_id) to the positions of that entity's entries,
+    where a position is (segment number, uncompressed byte offset) as
+    defined by AuditSegments, so it survives rotation and compression.
+    Entries without an entity_id are indexed under their type only.
+
+    The index lives in a SQLite file next to the log (<path>.history.db)
+    and is maintained incrementally: it records how far into the log it has
+    read (the watermark), and catch_up() indexes only the lines appended
+    since. AuditLogger calls it after every write, so each append costs
+    one short transaction and per-entity history reads cost O(history),
+    not O(log size). If the watermark points past the end of the log (the
+    log was replaced or truncated) the index is rebuilt from scratch.
+    """
+
+    def __init__(self, segments: AuditSegments, *, busy_timeout_ms: int = 5000):
+        self._segments = segments
+        self._busy_timeout_ms = busy_timeout_ms
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def path(self) -> Path:
+        log = self._segments.path
+        return log.with_name(log.name + ".history.db")
+
+    def _db(self) -> sqlite3.Connection:
+        # Opened on first use, so loggers that never write pay nothing.
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self._busy_timeout_ms / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def reset(self) -> None:
+        """Forget everything; the next catch_up() re-reads the whole log."""
+        conn = self._db()
+        with conn:
+            conn.execute("DELETE FROM history")
+            conn.execute("DELETE FROM watermark")
+
+    def catch_up(self) -> int:
+        """Index entries appended since the last call; returns how many lines were read."""
+        conn = self._db()
+        # The shared lock keeps the active segment from being rotated mid-scan;
+        # BEGIN IMMEDIATE serializes concurrent catch-ups on the watermark.
+        with file_lock(self._segments.lock_path, shared=True):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                read = self._catch_up_locked(conn)
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        return read
+
+    def _catch_up_locked(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT seg, pos FROM watermark WHERE id = 0").fetchone()
+        position = tuple(row) if row is not None else None
+        if position is not None and not self._segments.is_current(position):
+            conn.execute("DELETE FROM history")
+            position = None
+
+        rows = []
+        read = 0
+
+        def consume(seg: int, offset: int, line: bytes) -> None:
+            nonlocal read
+            read += 1
+            entry = _decode(line)
+            if entry is not None:
+                rows.append((*entry, seg, offset))
+
+        seg, pos = self._segments.follow(position, consume)
+        conn.executemany(
+            "INSERT OR REPLACE INTO history (entity_type, entity_id, ts, seg, pos) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            "INSERT INTO watermark (id, seg, pos) VALUES (0, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET seg = excluded.seg, pos = excluded.pos",
+            (seg, pos),
+        )
+        return read
+
+    def lookup(
+        self,
+        entity_type: str,
+        entity_id: Optional[str] = None,
+        *,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Decoded entries of one entity (or a whole type), in log order, reading only their
+        lines."""
+        self.catch_up()
+        sql = "SELECT seg, pos FROM history WHERE entity_type = ?"
+        params: list[Any] = [entity_type]
+        if entity_id is not None:
+            sql += " AND entity_id = ?"
+            params.append(entity_id)
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND ts <= ?"
+            params.append(until)
+        positions = self._db().execute(sql + " ORDER BY seg, pos", params).fetchall()
+        for seg, group in groupby(positions, key=lambda p: p[0]):
+            try:
+                lines = list(self._segments.lines_at(seg, [p[1] for p in group]))
+            except FileNotFoundError:
+                continue  # segment deleted since it was indexed
+            for _, line in lines:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(row, dict):
+                    yield row
+
+
+def _decode(line: bytes) -> Optional[tuple[str, Optional[str], Optional[str]]]:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return None  # debris from a crashed writer
+    if not isinstance(row, dict) or not isinstance(row.get("entity_type"), str):
+        return None
+    entity_id = row.get("entity_id")
+    ts = row.get("timestamp")
+    return (
+        row["entity_type"],
+        entity_id if isinstance(entity_id, str) else None,
+        ts if isinstance(ts, str) else None,
+    )
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.engine.audit_segments import AuditSegments
+from app.engine.locking import atomic_write_text, file_lock
+
+ROLLUP_FORMAT = 1
+
+# (entity_type, from_state, to_state, risk_tier)
+RollupKey = tuple[str, str, str, str]
+
+_NUMBERS = re.compile(r"\d+")
+
+
+def reason_kind(reason: str) -> str:
+    """Collapse numbers so "Completeness 33% is below required 60%." counts with its siblings."""
+    return _NUMBERS.sub("#", reason)
+
+
+def completeness_bucket(percent: Optional[int]) -> str:
+    """Decile bucket label: "0" for 0-9%, ..., "90" for 90-99%, "100"; "none" if not computed."""
+    if percent is None:
+        return "none"
+    return str(min(100, max(0, int(percent)) // 10 * 10))
+
+
+@dataclass
+class Rollup:
+    """Counters for one transition attempted at one risk tier."""
+
+    allowed: int = 0
+    blocked: int = 0
+    reasons: Counter = field(default_factory=Counter)  # reason kind -> entries citing it
+    completeness: Counter = field(default_factory=Counter)  # bucket -> entries
+
+    @property
+    def attempts(self) -> int:
+        return self.allowed + self.blocked
+
+    @property
+    def block_rate(self) -> float:
+        return self.blocked / self.attempts if self.attempts else 0.0
+
+    def add(self, allowed: bool, reasons: list[str], completeness_percent: Optional[int]) -> None:
+        if allowed:
+            self.allowed += 1
+        else:
+            self.blocked += 1
+        self.reasons.update({reason_kind(r) for r in reasons})
+        self.completeness[completeness_bucket(completeness_percent)] += 1
+
+    def histogram(self) -> list[tuple[str, int]]:
+        """Completeness counts as ("0-9%", n), ..., ("100%", n), ("n/a", n), lowest bucket first."""
+        out = []
+        for bucket in sorted(self.completeness, key=lambda b: 1000 if b == "none" else int(b)):
+            if bucket == "none":
+                label = "n/a"
+            elif bucket == "100":
+                label = "100%"
+            else:
+                label = f"{bucket}-{int(bucket) + 9}%"
+            out.append((label, self.completeness[bucket]))
+        return out
+
+
+class AuditRollups:
+    """
+    Running allowed/blocked counts, blocking-reason histograms and
+    completeness histograms per (entity type, transition, risk tier).
+
+    The counters live in a small JSON sidecar next to the log
+    (<path>.rollups.json) together with the log position they cover.
+    catch_up() folds in only the entries appended since, so AuditLogger
+    keeps the rollups current on every write while stats readers load just
+    the sidecar. rebuild() recomputes everything from the log for recovery;
+    a position beyond the end of the log (the log was replaced) triggers
+    the same rebuild automatically.
+    """
+
+    def __init__(self, segments: AuditSegments):
+        self._segments = segments
+
+    @property
+    def path(self) -> Path:
+        log = self._segments.path
+        return log.with_name(log.name + ".rollups.json")
+
+    def read(self) -> Dict[RollupKey, Rollup]:
+        """The rollups as last persisted; does not touch the log."""
+        return self._load()[1]
+
+    def catch_up(self) -> int:
+        """Fold entries appended since the last call into the rollups; returns lines read."""
+        return self._update(rebuild=False)
+
+    def rebuild(self) -> int:
+        """Recompute the rollups from the whole log; returns lines read."""
+        return self._update(rebuild=True)
+
+    def _update(self, *, rebuild: bool) -> int:
+        # Shared log lock first (as AuditIndex does), then our own lock for the read-modify-write.
+        with file_lock(self._segments.lock_path, shared=True), file_lock(self._lock_path()):
+            position, groups = (None, {}) if rebuild else self._load()
+            if position is not None and not self._segments.is_current(position):
+                position, groups = None, {}
+            read = 0
+
+            def consume(_seg: int, _offset: int, line: bytes) -> None:
+                nonlocal read
+                read += 1
+                _fold(groups, line)
+
+            new_position = self._segments.follow(position, consume)
+            if read or rebuild or new_position != position:
+                self._save(new_position, groups)
+        return read
+
+    def _lock_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".lock")
+
+    def _load(self) -> tuple[Optional[tuple[int, int]], Dict[RollupKey, Rollup]]:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None, {}
+        if payload.get("format") != ROLLUP_FORMAT:
+            return None, {}
+        groups = {
+            (t, f, to, tier): Rollup(allowed, blocked, Counter(reasons), Counter(completeness))
+            for t, f, to, tier, allowed, blocked, reasons, completeness in payload["groups"]
+        }
+        return tuple(payload["position"]), groups
+
+    def _save(self, position: tuple[int, int], groups: Dict[RollupKey, Rollup]) -> None:
+        payload: Dict[str, Any] = {
+            "format": ROLLUP_FORMAT,
+            "position": list(position),
+            "groups": [
+                [*key, r.allowed, r.blocked, dict(r.reasons), dict(r.completeness)]
+                for key, r in sorted(groups.items())
+            ],
+        }
+        # No fsync: an empty file after a crash just means a rebuild from the log.
+        atomic_write_text(self.path, json.dumps(payload, separators=(",", ":")), durable=False)
+
+
+def _fold(groups: Dict[RollupKey, Rollup], line: bytes) -> None:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return  # debris from a crashed writer
+    if not isinstance(row, dict):
+        return
+    key = (row.get("entity_type"), row.get("from_state"), row.get("to_state"), row.get("risk_tier"))
+    if not all(isinstance(k, str) for k in key) or "allowed" not in row:
+        return  # not an audit entry
+    allowed = bool(row["allowed"])
+    rollup = groups.get(key)
+    if rollup is None:
+        rollup = groups[key] = Rollup()
+    rollup.add(allowed, list(row.get("reasons") or ()), row.get("completeness_percent"))
@@ -0,0 +1,481 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import zlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional
+
+from app.engine.locking import atomic_write_text, file_lock
+
+# Blocks never span two hours ("YYYY-MM-DDTHH"), so the sparse index doubles
+# as an hourly time-bucket index.
+_BUCKET_CHARS = 13
+_CHUNK = 1 << 16
+_INDEX_FORMAT = 2
+
+
+@dataclass(frozen=True)
+class Block:
+    offset: int  # byte offset of the gzip member in the segment file
+    length: int  # compressed length
+    first_ts: str  # timestamp of the block's first entry
+    min_ts: str
+    max_ts: str
+    lines: int
+    raw_offset: int  # byte offset of the block's first line in the uncompressed segment
+
+
+def _block(offset: int, length: int, raw: bytes, raw_offset: int) -> Block:
+    stamps = [ts for ts in map(_timestamp, raw.splitlines()) if ts is not None]
+    return Block(
+        offset=offset,
+        length=length,
+        first_ts=stamps[0] if stamps else "",
+        min_ts=min(stamps, default=""),
+        max_ts=max(stamps, default=""),
+        lines=raw.count(b"\n"),
+        raw_offset=raw_offset,
+    )
+
+
+def _timestamp(line: bytes) -> Optional[str]:
+    try:
+        ts = json.loads(line).get("timestamp")
+    except (ValueError, AttributeError):
+        return None
+    return ts if isinstance(ts, str) else None
+
+
+def _in_window(ts: str, since: Optional[str], until: Optional[str]) -> bool:
+    return (since is None or ts >= since) and (until is None or ts <= until)
+
+
+class AuditSegments:
+    """
+    Rotation, compression and reading of a segmented JSONL log.
+
+    The active segment is the log path itself (audit_log.jsonl). Once it
+    reaches `max_bytes` or its first entry is `max_age` seconds old, it is
+    renamed to <path>.NNNNNN under an exclusive lock (writers append under
+    the shared side and reopen when the path's inode changes) and then
+    compressed to <path>.NNNNNN.gz. The .gz file is a series of gzip members
+    ("blocks") of about `block_bytes` raw bytes each that never span an hour,
+    so `zcat`/`zgrep` still read it as one file. A <path>.NNNNNN.idx sidecar
+    lists each block's offset, length, first/min/max timestamp, line count
+    and uncompressed offset; it records the .gz size and is rebuilt from the
+    members when it does not match.
+
+    A line's position is (segment number, byte offset in the uncompressed
+    segment). The active file already has the number it will be rotated to
+    (active_segment()), and compression keeps uncompressed offsets
+    reachable through the index, so a position stays valid across rotation.
+
+    read() walks closed segments in order and then the active file. With a
+    time window it skips whole segments and blocks whose timestamp range
+    misses it and decompresses only the rest. Timestamps compare as
+    ISO-8601 strings, so windows must use the log's (UTC) format; a date
+    prefix such as "2026-10-01" works as a lower bound.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = 0,
+        max_age: float = 0.0,
+        block_bytes: int = 64 * 1024,
+    ):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._block_bytes = max(1, block_bytes)
+        # (inode, size when last checked, first entry time) of the active segment
+        self._started: Optional[tuple[int, int, Optional[datetime]]] = None
+        self._name_re = re.compile(re.escape(path.name) + r"\.(\d{6})(\.gz)?$")
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def lock_path(self) -> Path:
+        """Writers append holding this shared; rotation renames holding it exclusively."""
+        return self._path.with_name(self._path.name + ".lock")
+
+    # --- naming ---
+
+    def _raw_path(self, seq: int) -> Path:
+        return self._path.with_name(f"{self._path.name}.{seq:06d}")
+
+    def _gz_path(self, seq: int) -> Path:
+        return self._path.with_name(f"{self._path.name}.{seq:06d}.gz")
+
+    def _idx_path(self, seq: int) -> Path:
+        return self._path.with_name(f"{self._path.name}.{seq:06d}.idx")
+
+    def _scan_names(self) -> tuple[set[int], set[int]]:
+        raw: set[int] = set()
+        gz: set[int] = set()
+        if not self._path.parent.exists():
+            return raw, gz
+        for p in self._path.parent.iterdir():
+            m = self._name_re.match(p.name)
+            if m:
+                (gz if m.group(2) else raw).add(int(m.group(1)))
+        return raw, gz
+
+    def segments(self) -> list[int]:
+        """Sequence numbers of rotated segments, compressed or not, oldest first."""
+        raw, gz = self._scan_names()
+        return sorted(raw | gz)
+
+    def active_segment(self) -> int:
+        """The number the active file gets when it is rotated."""
+        existing = self.segments()
+        return (existing[-1] if existing else 0) + 1
+
+    # --- rotation ---
+
+    def _due(self) -> bool:
+        try:
+            st = self._path.stat()
+        except FileNotFoundError:
+            return False
+        if st.st_size == 0:
+            return False
+        if self._max_bytes > 0 and st.st_size >= self._max_bytes:
+            return True
+        if self._max_age > 0:
+            # Inodes get reused after rotation, so a shrunken file is a new one too.
+            started = self._started
+            if started is None or started[0] != st.st_ino or st.st_size < started[1]:
+                self._started = (st.st_ino, st.st_size, self._first_entry_time())
+            else:
+                self._started = (st.st_ino, st.st_size, self._started[2])
+            started = self._started[2]
+            if started is not None:
+                return (datetime.now(timezone.utc) - started).total_seconds() >= self._max_age
+        return False
+
+    def _first_entry_time(self) -> Optional[datetime]:
+        try:
+            with self._path.open("rb") as f:
+                ts = _timestamp(f.readline())
+            return datetime.fromisoformat(ts) if ts else None
+        except (OSError, ValueError):
+            return None
+
+    def maybe_rotate(self) -> Optional[int]:
+        """Rotate if the active segment is over its size or age limit; returns the new segment's
+        number."""
+        if (self._max_bytes <= 0 and self._max_age <= 0) or not self._due():
+            return None
+        return self.rotate(only_if_due=True)
+
+    def rotate(self, *, only_if_due: bool = False) -> Optional[int]:
+        """Close the active segment and compress it. None if there was nothing to rotate."""
+        with file_lock(self.lock_path):
+            # Another process may have rotated since we looked.
+            if only_if_due and not self._due():
+                return None
+            if not self._path.exists() or self._path.stat().st_size == 0:
+                return None
+            seq = self.active_segment()
+            os.replace(self._path, self._raw_path(seq))
+            self._started = None
+        self.compress_pending()
+        return seq
+
+    def compress_pending(self) -> None:
+        """Compress rotated segments still in raw form (e.g. left by a crash)."""
+        with file_lock(self._path.with_name(self._path.name + ".compress.lock")):
+            raw, _ = self._scan_names()
+            for seq in sorted(raw):
+                self._compress(seq)
+
+    def _compress(self, seq: int) -> None:
+        raw_path = self._raw_path(seq)
+        with raw_path.open("rb") as src:
+            self._write_segment(seq, src)
+        raw_path.unlink()
+
+    def _write_segment(self, seq: int, lines) -> None:
+        """Compress an iterable of raw lines into segment `seq` (.gz, then .idx)."""
+        gz_path = self._gz_path(seq)
+        tmp = gz_path.with_name(gz_path.name + ".tmp")
+        blocks: list[Block] = []
+        with tmp.open("wb") as out:
+            chunk = bytearray()
+            bucket: Optional[str] = None
+            raw_offset = 0
+
+            def cut() -> None:
+                nonlocal raw_offset
+                if chunk:
+                    member = gzip.compress(bytes(chunk), mtime=0)
+                    blocks.append(_block(out.tell(), len(member), bytes(chunk), raw_offset))
+                    raw_offset += len(chunk)
+                    out.write(member)
+                    chunk.clear()
+
+            for line in lines:
+                ts = _timestamp(line)
+                line_bucket = ts[:_BUCKET_CHARS] if ts else bucket
+                if chunk and (len(chunk) >= self._block_bytes or line_bucket != bucket):
+                    cut()
+                bucket = line_bucket
+                chunk += line if line.endswith(b"\n") else line + b"\n"
+            cut()
+            out.flush()
+            os.fsync(out.fileno())
+            size = out.tell()
+        os.replace(tmp, gz_path)
+        self._save_index(seq, size, blocks)
+
+    def _save_index(self, seq: int, size: int, blocks: list[Block]) -> None:
+        payload = {
+            "format": _INDEX_FORMAT,
+            "size": size,
+            "blocks": [
+                [b.offset, b.length, b.first_ts, b.min_ts, b.max_ts, b.lines, b.raw_offset]
+                for b in blocks
+            ],
+        }
+        atomic_write_text(self._idx_path(seq), json.dumps(payload))
+
+    def index(self, seq: int) -> list[Block]:
+        """The segment's block index, rebuilt from the .gz if missing or stale."""
+        gz_path = self._gz_path(seq)
+        size = gz_path.stat().st_size
+        try:
+            payload = json.loads(self._idx_path(seq).read_text(encoding="utf-8"))
+            if payload.get("format") == _INDEX_FORMAT and payload.get("size") == size:
+                return [Block(*b) for b in payload["blocks"]]
+        except (FileNotFoundError, ValueError):
+            pass
+        blocks = self._scan_members(gz_path)
+        self._save_index(seq, size, blocks)
+        return blocks
+
+    @staticmethod
+    def _scan_members(gz_path: Path) -> list[Block]:
+        blocks: list[Block] = []
+        with gz_path.open("rb") as f:
+            start = consumed = raw_offset = 0
+            d = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            raw = bytearray()
+            buf = f.read(_CHUNK)
+            while buf:
+                raw += d.decompress(buf)
+                if d.eof:
+                    end = consumed + len(buf) - len(d.unused_data)
+                    blocks.append(_block(start, end - start, bytes(raw), raw_offset))
+                    raw_offset += len(raw)
+                    start = consumed = end
+                    raw.clear()
+                    buf = d.unused_data or f.read(_CHUNK)
+                    d = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                else:
+                    consumed += len(buf)
+                    buf = f.read(_CHUNK)
+        return blocks
+
+    # --- reading ---
+
+    def read_lines(
+        self, *, since: Optional[str] = None, until: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Raw lines of every segment in log order, skipping segments and blocks
+        outside [since, until]. Lines inside a read block are not filtered.
+        """
+        raw, gz = self._scan_names()
+        for seq in sorted(raw | gz):
+            if seq in raw:
+                yield from self._complete_lines(self._raw_path(seq))
+                continue
+            blocks = [
+                b for b in self.index(seq)
+                if not b.lines or not b.min_ts or _overlaps(b, since, until)
+            ]
+            if not blocks:
+                continue
+            with self._gz_path(seq).open("rb") as f:
+                for b in blocks:
+                    f.seek(b.offset)
+                    yield from gzip.decompress(f.read(b.length)).splitlines(keepends=True)
+        yield from self._complete_lines(self._path)
+
+    @staticmethod
+    def _complete_lines(path: Path) -> Iterator[bytes]:
+        try:
+            f = path.open("rb")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # entry still being written
+                yield line
+
+    def read(
+        self, *, since: Optional[str] = None, until: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Decoded entries with since <= timestamp <= until, in log order."""
+        for line in self.read_lines(since=since, until=until):
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # debris from a crashed writer
+            if not isinstance(row, dict):
+                continue
+            if since is not None or until is not None:
+                ts = row.get("timestamp")
+                if not isinstance(ts, str) or not _in_window(ts, since, until):
+                    continue
+            yield row
+
+    def scan(self, seq: int, start: int = 0) -> Iterator[tuple[int, bytes]]:
+        """
+        (offset, line) for every complete line of segment `seq` at or after
+        uncompressed offset `start`. Hold the shared lock while scanning the
+        active segment so it cannot be rotated away mid-read.
+        """
+        f = self._open_plain(seq)
+        if f is None:
+            blocks = self.index(seq)
+            first = max(0, bisect_right([b.raw_offset for b in blocks], start) - 1)
+            with self._gz_path(seq).open("rb") as gz:
+                for b in blocks[first:]:
+                    gz.seek(b.offset)
+                    pos = b.raw_offset
+                    for line in gzip.decompress(gz.read(b.length)).splitlines(keepends=True):
+                        if pos >= start:
+                            yield pos, line
+                        pos += len(line)
+            return
+        with f:
+            f.seek(start)
+            pos = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # entry still being written
+                yield pos, line
+                pos += len(line)
+
+    def follow(
+        self,
+        position: Optional[tuple[int, int]],
+        consume: Callable[[int, int, bytes], None],
+    ) -> tuple[int, int]:
+        """
+        Pass (segment, offset, line) for every complete line after `position`
+        to `consume`, in log order, and return the position just past the
+        last one. None starts at the oldest segment. Check a saved position
+        with is_current() first, and hold the shared lock throughout.
+        """
+        closed = self.segments()
+        active = self.active_segment()
+        seg, pos = position if position is not None else (closed[0] if closed else active, 0)
+        end = 0
+        for s in [c for c in closed if c >= seg] + [active]:
+            end = pos if s == seg else 0
+            try:
+                for offset, line in self.scan(s, end):
+                    consume(s, offset, line)
+                    end = offset + len(line)
+            except FileNotFoundError:
+                pass  # no active file yet
+        return (active, end)
+
+    def is_current(self, position: tuple[int, int]) -> bool:
+        """False if `position` lies beyond the end of the log, i.e. the log was replaced or
+        truncated."""
+        seg, pos = position
+        active = self.active_segment()
+        if seg != active:
+            return seg < active
+        try:
+            return pos <= self._path.stat().st_size
+        except FileNotFoundError:
+            return pos == 0
+
+    def lines_at(self, seq: int, offsets: Iterable[int]) -> Iterator[tuple[int, bytes]]:
+        """The lines of segment `seq` starting at the given uncompressed offsets, in offset
+        order."""
+        with file_lock(self.lock_path, shared=True):
+            f = self._open_plain(seq)
+        wanted = sorted(offsets)
+        if f is None:
+            blocks = self.index(seq)
+            starts = [b.raw_offset for b in blocks]
+            with self._gz_path(seq).open("rb") as gz:
+                current, data = -1, b""
+                for off in wanted:
+                    i = bisect_right(starts, off) - 1
+                    if i < 0:
+                        continue
+                    if i != current:
+                        gz.seek(blocks[i].offset)
+                        current, data = i, gzip.decompress(gz.read(blocks[i].length))
+                    rel = off - starts[i]
+                    end = data.find(b"\n", rel)
+                    if end >= 0:
+                        yield off, data[rel:end + 1]
+            return
+        with f:
+            for off in wanted:
+                f.seek(off)
+                line = f.readline()
+                if line.endswith(b"\n"):
+                    yield off, line
+
+    def _open_plain(self, seq: int) -> Optional[BinaryIO]:
+        """
+        Open segment `seq` if it is uncompressed (rotated but not yet
+        compressed, or the active file); None once it is compressed. Raises
+        FileNotFoundError for a segment that does not exist.
+        """
+        for _ in range(2):
+            raw, gz = self._scan_names()
+            if seq in gz:
+                return None
+            if seq in raw:
+                path = self._raw_path(seq)
+            elif seq == max(raw | gz, default=0) + 1:
+                path = self._path
+            else:
+                break
+            try:
+                return path.open("rb")
+            except FileNotFoundError:
+                continue  # compressed (or rotated) since we looked
+        raise FileNotFoundError(f"Audit segment {seq:06d} of {self._path} does not exist.")
+
+    # --- maintenance ---
+
+    def rewrite(self, seq: int, transform: Callable[[bytes], bytes]) -> None:
+        """Stream a closed segment through `transform` (one line in, one line out) and
+        recompress it."""
+        if self._raw_path(seq).exists():
+            self.compress_pending()
+        blocks = self.index(seq)
+
+        def lines() -> Iterator[bytes]:
+            with self._gz_path(seq).open("rb") as f:
+                for b in blocks:
+                    f.seek(b.offset)
+                    for line in gzip.decompress(f.read(b.length)).splitlines(keepends=True):
+                        yield transform(line)
+
+        self._write_segment(seq, lines())
+
+
+def _overlaps(block: Block, since: Optional[str], until: Optional[str]) -> bool:
+    return (since is None or block.max_ts >= since) and (until is None or block.min_ts <= until)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, Optional
+
+from app.engine.audit import AuditLogEntry, AuditLogger
+from app.engine.bulk_gates import BulkGateEvaluator
+from app.engine.compiled_spec import CompiledSpec
+from app.engine.state_machine import TransitionError
+from app.engine.store import ConcurrencyError, EntityRecord, EntityStore
+
+
+@dataclass(frozen=True)
+class TransitionOutcome:
+    entity_id: str
+    from_state: Optional[str]  # None when the entity does not exist
+    allowed: bool
+    reasons: tuple[str, ...] = ()
+
+
+@dataclass
+class BatchTransitionReport:
+    to_state: str
+    outcomes: list[TransitionOutcome] = field(default_factory=list)
+    conflict: Optional[str] = None  # set when a concurrent edit kept transitions from committing
+
+    @property
+    def allowed(self) -> list[TransitionOutcome]:
+        return [o for o in self.outcomes if o.allowed]
+
+    @property
+    def blocked(self) -> list[TransitionOutcome]:
+        return [o for o in self.outcomes if not o.allowed]
+
+
+class BatchTransitioner:
+    """
+    Moves many entities of one type to the same target state in one pass.
+
+    Entities are grouped by their current state; each group's gate plan runs
+    once through BulkGateEvaluator. All allowed transitions are committed in
+    one compare-and-swap upsert_many, so a concurrent edit to any of them
+    aborts the whole commit (per shard on the sharded backend, where shards
+    committed before the conflict stay committed). The audit entries are
+    appended in one write after the commit. On a conflict, transitions that
+    did not commit are reported and audited as blocked with the conflict as
+    their reason, and report.conflict is set.
+    """
+
+    def __init__(self, compiled: CompiledSpec, store: EntityStore, audit: AuditLogger):
+        self._compiled = compiled
+        self._store = store
+        self._audit = audit
+
+    def run(
+        self,
+        entity_type: str,
+        entity_ids: Iterable[str],
+        to_state: str,
+        *,
+        human_approved: bool = False,
+    ) -> BatchTransitionReport:
+        entity = self._compiled.entities[entity_type]
+        ids = list(dict.fromkeys(entity_ids))
+        found = self._store.get_many((entity_type, i) for i in ids)
+        report = BatchTransitionReport(to_state=to_state)
+
+        groups: Dict[str, list[EntityRecord]] = {}
+        for entity_id in ids:
+            rec = found.get((entity_type, entity_id))
+            if rec is None:
+                report.outcomes.append(TransitionOutcome(
+                    entity_id=entity_id,
+                    from_state=None,
+                    allowed=False,
+                    reasons=(f"Entity not found: {entity_type}:{entity_id}",),
+                ))
+                continue
+            groups.setdefault(rec.state, []).append(rec)
+
+        entries: list[AuditLogEntry] = []
+        to_commit: list[EntityRecord] = []
+        committed_entries: list[int] = []  # indexes into entries of the to_commit records
+        committed_outcomes: list[int] = []  # and into report.outcomes
+        timestamp = AuditLogger.now_iso()
+        for from_state, records in groups.items():
+            try:
+                resolved = entity.resolve(from_state, to_state)
+            except TransitionError as e:
+                report.outcomes.extend(
+                    TransitionOutcome(rec.entity_id, from_state, False, (str(e),))
+                    for rec in records
+                )
+                continue
+
+            gate = BulkGateEvaluator(resolved.plan).evaluate(
+                entity_data=[rec.data for rec in records],
+                risk_tiers=[rec.risk_tier for rec in records],
+                human_approved=human_approved,
+                masks=[entity.completeness_mask(rec).bits for rec in records],
+            )
+            for i, rec in enumerate(records):
+                decision = gate.decision(i)
+                completeness = decision.completeness
+                report.outcomes.append(
+                    TransitionOutcome(rec.entity_id, from_state, decision.allowed, decision.reasons)
+                )
+                entries.append(AuditLogEntry(
+                    timestamp=timestamp,
+                    entity_type=entity_type,
+                    from_state=from_state,
+                    to_state=to_state,
+                    risk_tier=rec.risk_tier,
+                    human_approved=human_approved,
+                    allowed=decision.allowed,
+                    reasons=decision.reasons,
+                    completeness_percent=completeness.percent if completeness else None,
+                    entity_id=rec.entity_id,
+                ))
+                if decision.allowed:
+                    rec.state = to_state
+                    to_commit.append(rec)
+                    committed_entries.append(len(entries) - 1)
+                    committed_outcomes.append(len(report.outcomes) - 1)
+
+        versions = [rec.version for rec in to_commit]
+        try:
+            if to_commit:
+                self._store.upsert_many(to_commit, cas=True)
+        except ConcurrencyError as e:
+            # Written records get their new version in place; the others did not commit.
+            report.conflict = str(e)
+            reason = f"Not applied: {e}"
+            for rec, version, entry, outcome in zip(
+                to_commit, versions, committed_entries, committed_outcomes
+            ):
+                if rec.version != version:
+                    continue
+                entries[entry] = replace(entries[entry], allowed=False, reasons=(reason,))
+                report.outcomes[outcome] = replace(
+                    report.outcomes[outcome], allowed=False, reasons=(reason,)
+                )
+        self._audit.log_many(entries)
+        return report
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.engine.completeness import CompletenessResult, item_test
+from app.engine.gates import GateDecision, GatePlan, human_approval_required
+from app.engine.rules import RuleCheck, RuleContext, RuleRegistry, default_rule_registry
+from app.models import GateRule
+
+HUMAN_REASON = "Human approval required but not provided."
+
+
+class _Batch:
+    """The columns a vector rule can read, plus per-entity completeness."""
+
+    def __init__(self, entity_data, risk_tiers, checklist, satisfied, percent, active):
+        self.entity_data = entity_data
+        self.risk_tiers = risk_tiers
+        self.percent = percent
+        self.active = active  # entities not yet stopped by an earlier rule
+        self._checklist = checklist
+        self._satisfied = satisfied
+
+    def completeness(self, i: int) -> CompletenessResult:
+        return _completeness_row(self._checklist, self._satisfied[i], int(self.percent[i]))
+
+
+def _completeness_row(
+    checklist: tuple[str, ...], row: np.ndarray, percent: int
+) -> CompletenessResult:
+    return CompletenessResult(
+        total_items=len(checklist),
+        satisfied_items=int(row.sum()),
+        percent=percent,
+        missing_items=tuple(item for item, ok in zip(checklist, row) if not ok),
+    )
+
+
+@dataclass(frozen=True)
+class _RuleResult:
+    blocked: np.ndarray  # bool[entities]: rule adds a reason
+    stop: np.ndarray  # bool[entities]: evaluation ends here (always_block)
+    reason: Callable[[int], str]  # reason for blocked entity i
+    needs_completeness: np.ndarray  # bool[entities]: the rule read entity i's completeness
+
+
+@dataclass(frozen=True)
+class _VectorRule:
+    apply: Callable[[_Batch], _RuleResult]
+
+
+def _const_reason(reason: str, *, stop: bool = False) -> _VectorRule:
+    def apply(batch: _Batch) -> _RuleResult:
+        mask = batch.active.copy()
+        none = np.zeros_like(mask)
+        return _RuleResult(mask, mask if stop else none, lambda _i: reason, none)
+
+    return _VectorRule(apply)
+
+
+def _vector_completeness_min(rule: GateRule) -> _VectorRule:
+    if rule.percent is None:
+        return _const_reason("Rule completeness_min missing required 'percent'.")
+    required = int(rule.percent)
+
+    def apply(batch: _Batch) -> _RuleResult:
+        return _RuleResult(
+            blocked=(batch.percent < required) & batch.active,
+            stop=np.zeros(batch.percent.shape, dtype=bool),
+            reason=lambda i: (
+                f"Completeness {int(batch.percent[i])}% is below required {required}%."
+            ),
+            needs_completeness=batch.active.copy(),
+        )
+
+    return _VectorRule(apply)
+
+
+def _vector_always_block(rule: GateRule) -> _VectorRule:
+    return _const_reason("Rule always_block triggered.", stop=True)
+
+
+_VECTOR_LOWERINGS: dict[str, Callable[[GateRule], _VectorRule]] = {
+    "completeness_min": _vector_completeness_min,
+    "always_block": _vector_always_block,
+}
+
+
+def _scalar_fallback(check: RuleCheck) -> _VectorRule:
+    """Run a registered rule that has no vector form once per active entity."""
+
+    def apply(batch: _Batch) -> _RuleResult:
+        n = len(batch.active)
+        blocked = np.zeros(n, dtype=bool)
+        stop = np.zeros(n, dtype=bool)
+        used = np.zeros(n, dtype=bool)
+        reasons: dict[int, str] = {}
+        for i in np.flatnonzero(batch.active):
+            ctx = RuleContext(
+                batch.entity_data[i], batch.risk_tiers[i], lambda i=i: batch.completeness(i)
+            )
+            reason, stops = check(ctx)
+            if reason is not None:
+                blocked[i] = True
+                reasons[int(i)] = reason
+            stop[i] = stops
+            used[i] = ctx.computed_completeness is not None
+        return _RuleResult(blocked, stop, reasons.__getitem__, used)
+
+    return _VectorRule(apply)
+
+
+def _lower(rule: GateRule, registry: RuleRegistry) -> _VectorRule:
+    rule_type = (getattr(rule, "type", "") or "").strip()
+    vector = _VECTOR_LOWERINGS.get(rule_type)
+    if vector is not None and registry.get(rule_type) is default_rule_registry().get(rule_type):
+        return vector(rule)
+    if registry.get(rule_type) is None:
+        return _const_reason(f"Unsupported rule type: {rule_type}")
+    return _scalar_fallback(registry.lower(rule).check)
+
+
+@dataclass(frozen=True)
+class BulkGateReport:
+    """
+    Column-oriented gate results for a batch of entities. Per-entity
+    GateDecisions (with reasons) are only materialized by decision(i).
+    """
+
+    checklist: tuple[str, ...]
+    satisfied: np.ndarray  # bool[entities, checklist items]
+    percent: np.ndarray  # int[entities]
+    human_blocked: np.ndarray  # bool[entities]
+    allowed: np.ndarray  # bool[entities]
+    _rules: tuple[_RuleResult, ...]
+
+    def __len__(self) -> int:
+        return int(self.allowed.shape[0])
+
+    @property
+    def rule_blocked(self) -> tuple[np.ndarray, ...]:
+        """One bool[entities] mask per evaluated rule, in rule order."""
+        return tuple(r.blocked for r in self._rules)
+
+    @property
+    def allowed_count(self) -> int:
+        return int(self.allowed.sum())
+
+    @property
+    def blocked_count(self) -> int:
+        return len(self) - self.allowed_count
+
+    def completeness(self, i: int) -> CompletenessResult:
+        return _completeness_row(self.checklist, self.satisfied[i], int(self.percent[i]))
+
+    def decision(self, i: int) -> GateDecision:
+        """Same decision GateEngine.evaluate_plan would return for entity i."""
+        reasons: list[str] = []
+        if self.human_blocked[i]:
+            reasons.append(HUMAN_REASON)
+        used_completeness = False
+        for rule in self._rules:
+            used_completeness = used_completeness or bool(rule.needs_completeness[i])
+            if rule.blocked[i]:
+                reasons.append(rule.reason(i))
+            if rule.stop[i]:
+                return GateDecision(allowed=False, reasons=tuple(reasons))
+        completeness = self.completeness(i) if used_completeness else None
+        return GateDecision(allowed=not reasons, reasons=tuple(reasons), completeness=completeness)
+
+
+class BulkGateEvaluator:
+    """
+    Evaluates one transition's gate for many entities at once.
+
+    Checklist satisfaction is packed into a boolean matrix (entities x items),
+    completeness percents come from one row-sum, and completeness_min,
+    always_block and the human-approval policy are applied as array masks.
+    Decisions match GateEngine.evaluate_plan entity for entity (in its
+    default full-reasons mode). Registered rule types without a vector form
+    run once per entity still active at that point.
+    """
+
+    def __init__(self, plan: GatePlan, *, registry: Optional[RuleRegistry] = None):
+        self._plan = plan
+        registry = registry or default_rule_registry()
+        self._rules = tuple(_lower(rule, registry) for rule in plan.rules)
+
+    def satisfaction_matrix(self, entity_data: Sequence[Mapping[str, object]]) -> np.ndarray:
+        items = self._plan.checklist
+        matrix = np.zeros((len(entity_data), len(items)), dtype=bool)
+        for col, item in enumerate(items):
+            test = item_test(item, self._plan.predicates)
+            matrix[:, col] = [test(data) for data in entity_data]
+        return matrix
+
+    def mask_matrix(self, masks: Sequence[int]) -> np.ndarray:
+        """Satisfaction matrix unpacked from tracked completeness bitmasks."""
+        total = len(self._plan.checklist)
+        if total < 63:
+            bits = np.asarray(masks, dtype=np.int64).reshape(-1, 1)
+            return ((bits >> np.arange(total, dtype=np.int64)) & 1).astype(bool)
+        rows = [[bool(m >> i & 1) for i in range(total)] for m in masks]
+        return np.array(rows, dtype=bool).reshape(len(masks), total)
+
+    def evaluate(
+        self,
+        *,
+        entity_data: Sequence[Mapping[str, object]],
+        risk_tiers: Sequence[str],
+        human_approved: bool | Sequence[bool] | np.ndarray = False,
+        masks: Sequence[int] | None = None,
+    ) -> BulkGateReport:
+        """
+        `masks`, if given, are the entities' CompletenessMask bits for this
+        plan's checklist and replace the per-item lookups in entity_data.
+        """
+        n = len(entity_data)
+        if masks is None:
+            satisfied = self.satisfaction_matrix(entity_data)
+        else:
+            satisfied = self.mask_matrix(masks)
+        total = len(self._plan.checklist)
+        if total == 0:
+            percent = np.full(n, 100, dtype=np.int64)
+        else:
+            percent = (satisfied.sum(axis=1, dtype=np.int64) * 100) // total
+
+        # Human approval: resolve the policy once per distinct tier, then gather.
+        tiers, codes = np.unique(np.asarray(risk_tiers, dtype=object), return_inverse=True)
+        required_by_tier = np.array(
+            [human_approval_required(self._plan.require_human_approval, str(t)) for t in tiers],
+            dtype=bool,
+        )
+        required = required_by_tier[codes]
+        approved = np.broadcast_to(np.asarray(human_approved, dtype=bool), (n,))
+        human_blocked = required & ~approved
+
+        active = np.ones(n, dtype=bool)
+        batch = _Batch(entity_data, risk_tiers, self._plan.checklist, satisfied, percent, active)
+        blocked_any = human_blocked.copy()
+        results: list[_RuleResult] = []
+        for rule in self._rules:
+            if not batch.active.any():
+                break
+            result = rule.apply(batch)
+            results.append(result)
+            blocked_any |= result.blocked | result.stop
+            batch.active = batch.active & ~result.stop
+
+        return BulkGateReport(
+            checklist=self._plan.checklist,
+            satisfied=satisfied,
+            percent=percent,
+            human_blocked=human_blocked,
+            allowed=~blocked_any,
+            _rules=tuple(results),
+        )
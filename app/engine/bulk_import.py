@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable
+
+from app.engine.compiled_spec import CompiledSpec
+from app.engine.identity import IdentityError
+from app.engine.store import ConcurrencyError, EntityRecord, EntityStore
+
+# Re-reads of a batch that lost a compare-and-swap race before it is split up.
+_CAS_RETRIES = 3
+
+
+@dataclass(frozen=True)
+class ImportFailure:
+    line_no: int
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    failures: list[ImportFailure] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+class EntityImporter:
+    """
+    Streams entity rows (one JSON object per line) into a store in batches.
+
+    Each row looks like:
+      {"entity_type": "Ticket", "entity_id": "TCKT-1", "risk_tier": "low", "data": {...}}
+
+    New entities start in the entity type's initial state; existing entities keep
+    their state and get risk_tier/data refreshed. Legacy IDs are stored under
+    their canonical form when the spec defines one. Invalid rows are reported
+    and skipped without aborting the import.
+
+    Writes are compare-and-swap against the versions just read, so a transition
+    committed concurrently is never overwritten: the batch is re-read and
+    retried, and rows that keep conflicting are reported as failures.
+    """
+
+    def __init__(self, compiled: CompiledSpec, store: EntityStore, *, batch_size: int = 1000):
+        self._compiled = compiled
+        self._store = store
+        self._batch_size = max(1, batch_size)
+
+    def parse_line(self, line: str) -> EntityRecord:
+        """Validate one input row; raises ValueError with a human-readable reason."""
+        try:
+            row: Any = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+        if not isinstance(row, dict):
+            raise ValueError("Row must be a JSON object.")
+
+        entity_type = row.get("entity_type")
+        entity_id = row.get("entity_id")
+        risk_tier = row.get("risk_tier")
+        data = row.get("data", {})
+
+        if entity_type not in self._compiled.entities:
+            raise ValueError(f"Unknown entity type: {entity_type}")
+        if risk_tier not in self._compiled.risk_tiers:
+            raise ValueError(f"Unknown risk tier '{risk_tier}'")
+        if not isinstance(entity_id, str):
+            raise ValueError("Missing entity_id")
+        if not isinstance(data, dict):
+            raise ValueError("data must be a JSON object")
+
+        entity = self._compiled.entities[entity_type]
+        try:
+            id_result = entity.ids.validate(entity_type, entity_id)
+        except IdentityError as e:
+            raise ValueError(str(e)) from e
+        if id_result.canonical_id is None:
+            raise ValueError(f"Legacy ID detected, refusing import until normalized: {entity_id}")
+
+        return EntityRecord(
+            entity_type=entity_type,
+            entity_id=id_result.canonical_id,
+            risk_tier=risk_tier,
+            state=entity.initial_state,
+            data=data,
+            completeness=entity.checklist.track(data).to_json(),
+        )
+
+    def run(self, lines: Iterable[str]) -> ImportReport:
+        report = ImportReport()
+        batch: Dict[tuple[str, str], tuple[int, EntityRecord]] = {}
+
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                rec = self.parse_line(line)
+            except ValueError as e:
+                report.failures.append(ImportFailure(line_no=line_no, reason=str(e)))
+                continue
+
+            # A later row for the same entity within one batch wins.
+            batch[(rec.entity_type, rec.entity_id)] = (line_no, rec)
+            if len(batch) >= self._batch_size:
+                self._commit(batch, report)
+                batch = {}
+
+        if batch:
+            self._commit(batch, report)
+        return report
+
+    def _commit(
+        self, batch: Dict[tuple[str, str], tuple[int, EntityRecord]], report: ImportReport
+    ) -> None:
+        records = {key: rec for key, (_, rec) in batch.items()}
+        for _ in range(_CAS_RETRIES):
+            try:
+                created = self._write(records)
+            except ConcurrencyError:
+                continue
+            report.created += created
+            report.updated += len(records) - created
+            return
+        # Still racing: commit row by row so only the contended entities fail.
+        for key, (line_no, rec) in batch.items():
+            try:
+                created = self._write({key: rec})
+            except ConcurrencyError as e:
+                report.failures.append(ImportFailure(line_no=line_no, reason=str(e)))
+                continue
+            report.created += created
+            report.updated += 1 - created
+
+    def _write(self, records: Dict[tuple[str, str], EntityRecord]) -> int:
+        """Compare-and-swap upsert against the stored versions; returns how many were new."""
+        existing = self._store.get_many(records.keys())
+        created = 0
+        for key, rec in records.items():
+            prior = existing.get(key)
+            if prior is not None:
+                rec.state = prior.state
+                rec.version = prior.version
+            else:
+                rec.state = self._compiled.entities[rec.entity_type].initial_state
+                rec.version = 0
+                created += 1
+        self._store.upsert_many(records.values(), cas=True)
+        return created
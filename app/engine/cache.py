@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+_STATS: Dict[str, CacheStats] = {}
+
+
+def cache_stats(name: str) -> CacheStats:
+    """Return the process-wide counters registered under `name`, creating them once."""
+    stats = _STATS.get(name)
+    if stats is None:
+        stats = _STATS[name] = CacheStats()
+    return stats
+
+
+def cache_stats_snapshot() -> Dict[str, Dict[str, float]]:
+    """Export every registered cache's counters, e.g. for a metrics endpoint."""
+    return {name: stats.as_dict() for name, stats in sorted(_STATS.items())}
+
+
+class LRUCache(Generic[V]):
+    """
+    Bounded least-recently-used mapping that records hits/misses/evictions
+    into a CacheStats instance.
+    """
+
+    def __init__(self, maxsize: int, stats: Optional[CacheStats] = None):
+        if maxsize <= 0:
+            raise ValueError("LRUCache maxsize must be positive.")
+        self._maxsize = maxsize
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self.stats = stats or CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable) -> Optional[V]:
+        value = self._data.get(key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def keys(self) -> list[Hashable]:
+        return list(self._data)
+
+    def clear(self) -> None:
+        if self._data:
+            self.stats.invalidations += 1
+        self._data.clear()
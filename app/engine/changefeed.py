@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.engine.locking import file_lock
+
+_CONDITIONS: Dict[str, threading.Condition] = {}
+_CONDITIONS_LOCK = threading.Lock()
+
+
+def _condition_for(path: Path) -> threading.Condition:
+    # Shared per feed file so followers wake up on writes from any ChangeFeed
+    # instance in this process.
+    key = str(path.resolve())
+    with _CONDITIONS_LOCK:
+        cond = _CONDITIONS.get(key)
+        if cond is None:
+            cond = _CONDITIONS[key] = threading.Condition()
+        return cond
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    seq: int
+    timestamp: str
+    entity_type: str
+    entity_id: str
+    before: Optional[Dict[str, Any]]  # None when the entity was created
+    after: Optional[Dict[str, Any]]  # None when the entity was deleted
+
+
+class ChangeFeed:
+    """
+    Persistent, ordered stream of store mutations (JSONL, one event per line).
+
+    Sequence numbers increase by one per event across all writers (assigned
+    under an flock), so a consumer can remember the last seq it handled and
+    resume with read(after_seq=...). Resuming seeks by binary search over the
+    file instead of rescanning it.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock_path = path.with_name(path.name + ".lock")
+        self._appended = _condition_for(path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @staticmethod
+    def now_iso() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    # --- writing ---
+
+    def append(
+        self, changes: Iterable[tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+    ) -> list[ChangeEvent]:
+        """Append (before, after) record pairs as consecutive events."""
+        changes = list(changes)
+        if not changes:
+            return []
+        with file_lock(self._lock_path):
+            seq = self.last_seq()
+            timestamp = self.now_iso()
+            events = []
+            for before, after in changes:
+                seq += 1
+                row = after if after is not None else before
+                events.append(ChangeEvent(
+                    seq=seq,
+                    timestamp=timestamp,
+                    entity_type=row["entity_type"],
+                    entity_id=row["entity_id"],
+                    before=before,
+                    after=after,
+                ))
+            chunk = "".join(json.dumps(asdict(e)) + "\n" for e in events)
+            with self._path.open("a", encoding="utf-8") as f:
+                f.write(chunk)
+        with self._appended:
+            self._appended.notify_all()
+        return events
+
+    def last_seq(self) -> int:
+        """Sequence number of the last complete event (0 for an empty feed)."""
+        if not self._path.exists():
+            return 0
+        with self._path.open("rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            block = 4096
+            while True:
+                start = max(0, end - block)
+                f.seek(start)
+                data = f.read(end - start)
+                # Drop a torn final line left by an interrupted writer.
+                complete = data[: data.rfind(b"\n") + 1]
+                lines = complete.splitlines()
+                if len(lines) > 1 or (lines and start == 0):
+                    return json.loads(lines[-1])["seq"]
+                if start == 0:
+                    return 0
+                block *= 2
+
+    # --- reading ---
+
+    def _offset_after(self, after_seq: int) -> int:
+        """Byte offset of the first event with seq > after_seq (binary search)."""
+        if after_seq <= 0 or not self._path.exists():
+            return 0
+        with self._path.open("rb") as f:
+            lo, hi = 0, f.seek(0, os.SEEK_END)
+            # Invariant: `lo` is a line start and every line before it has
+            # seq <= after_seq. read() skips any stragglers between lo and the target.
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(max(0, mid - 1))
+                if mid > 0:
+                    f.readline()  # advance to the first line starting at or after mid
+                line_start = f.tell()
+                line = f.readline() if line_start < hi else b""
+                if not line.endswith(b"\n"):
+                    hi = mid
+                elif json.loads(line)["seq"] <= after_seq:
+                    lo = line_start + len(line)
+                else:
+                    hi = mid
+            return lo
+
+    def read(self, after_seq: int = 0, *, limit: Optional[int] = None) -> Iterator[ChangeEvent]:
+        if not self._path.exists():
+            return
+        n = 0
+        with self._path.open("rb") as f:
+            f.seek(self._offset_after(after_seq))
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # event still being written
+                event = ChangeEvent(**json.loads(line))
+                if event.seq <= after_seq:
+                    continue
+                yield event
+                n += 1
+                if limit is not None and n >= limit:
+                    return
+
+    def follow(
+        self,
+        after_seq: int = 0,
+        *,
+        max_wait: float = 1.0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[ChangeEvent]:
+        """
+        Yield events after `after_seq` forever (or until `timeout` seconds pass
+        with no new events). Between reads it waits on an in-process condition
+        that local writers signal, and otherwise only stats the file with an
+        exponential backoff capped at `max_wait`, so an idle follower costs a
+        few syscalls per second rather than a spin.
+        """
+        last = after_seq
+        size = -1
+        wait = 0.01
+        idle_since = time.monotonic()
+        while True:
+            current = self._path.stat().st_size if self._path.exists() else 0
+            if current != size:
+                size = current
+                for event in self.read(last):
+                    last = event.seq
+                    yield event
+                    wait = 0.01
+                    idle_since = time.monotonic()
+            if timeout is not None and time.monotonic() - idle_since >= timeout:
+                return
+            with self._appended:
+                self._appended.wait(wait)
+            wait = min(wait * 2, max_wait)
@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.engine.audit_segments import AuditSegments
+from app.engine.locking import atomic_write_text, file_lock
+from app.engine.store import EntityStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for format="parquet"
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+
+EXPORT_FORMATS = ("npz", "parquet")
+
+
+class ExportError(ValueError):
+    pass
+
+
+class _DictColumn:
+    """Dictionary-encoded strings: int32 codes into a per-chunk dictionary, -1 for null."""
+
+    def __init__(self) -> None:
+        self._lookup: Dict[str, int] = {}
+        self.codes: list[int] = []
+
+    def code(self, value: Any) -> int:
+        if not isinstance(value, str):
+            return -1
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self._lookup)
+        return code
+
+    def append(self, value: Any) -> None:
+        self.codes.append(self.code(value))
+
+    def dictionary(self) -> np.ndarray:
+        return np.array(list(self._lookup), dtype=str)
+
+
+class _Utf8Column:
+    """Mostly-unique strings as one UTF-8 buffer plus int64 offsets (Arrow's layout)."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self.offsets: list[int] = [0]
+
+    def append(self, value: str) -> None:
+        self._buf += value.encode("utf-8")
+        self.offsets.append(len(self._buf))
+
+    def data(self) -> np.ndarray:
+        return np.frombuffer(bytes(self._buf), dtype=np.uint8)
+
+
+class _Chunk:
+    """Rows of one output chunk, collected column by column."""
+
+    def __init__(
+        self,
+        dict_columns: tuple[str, ...],
+        utf8_columns: tuple[str, ...],
+        list_columns: tuple[str, ...],
+    ):
+        self.rows = 0
+        self.dicts = {name: _DictColumn() for name in dict_columns}
+        self.utf8 = {name: _Utf8Column() for name in utf8_columns}
+        # List-of-string columns: codes into a shared dictionary plus per-row offsets.
+        self.lists = {name: (_DictColumn(), [0]) for name in list_columns}
+        self.plain: Dict[str, list[Any]] = {}
+
+    def add(self, name: str, value: Any) -> None:
+        if name in self.dicts:
+            self.dicts[name].append(value)
+        elif name in self.utf8:
+            self.utf8[name].append(value)
+        elif name in self.lists:
+            column, offsets = self.lists[name]
+            column.codes.extend(column.code(v) for v in value)
+            offsets.append(len(column.codes))
+        else:
+            self.plain.setdefault(name, []).append(value)
+
+    def arrays(self, dtypes: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        out: Dict[str, np.ndarray] = {}
+        for name, column in self.dicts.items():
+            out[f"{name}.codes"] = np.array(column.codes, dtype=np.int32)
+            out[f"{name}.dictionary"] = column.dictionary()
+        for name, column in self.utf8.items():
+            out[f"{name}.data"] = column.data()
+            out[f"{name}.offsets"] = np.array(column.offsets, dtype=np.int64)
+        for name, (column, offsets) in self.lists.items():
+            out[f"{name}.codes"] = np.array(column.codes, dtype=np.int32)
+            out[f"{name}.dictionary"] = column.dictionary()
+            out[f"{name}.offsets"] = np.array(offsets, dtype=np.int64)
+        for name, values in self.plain.items():
+            out[name] = np.array(values, dtype=dtypes[name])
+        return out
+
+
+def _timestamp(value: Any) -> np.datetime64:
+    try:
+        ts = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return np.datetime64("NaT", "us")
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(ts, "us")
+
+
+_AUDIT_DICT = ("entity_type", "entity_id", "from_state", "to_state", "risk_tier")
+_AUDIT_DTYPES = {
+    "timestamp": "datetime64[us]",
+    "human_approved": bool,
+    "allowed": bool,
+    "cache_hit": bool,
+    "completeness_percent": np.int16,  # -1 = not computed
+    "log_segment": np.int64,
+    "log_offset": np.int64,
+}
+_ENTITY_DICT = ("entity_type", "risk_tier", "state")
+_ENTITY_DTYPES = {"version": np.int64}
+
+
+def load_chunk(path: Path) -> Dict[str, Any]:
+    """
+    Read an .npz chunk back into plain columns: dictionary columns become
+    object arrays (None for null), UTF-8 columns and list columns lists.
+    Meant for tests and quick looks; analysis code can use the codes directly.
+    """
+    out: Dict[str, Any] = {}
+    with np.load(path) as z:
+        names = {key.split(".", 1)[0] for key in z.files}
+        for name in sorted(names):
+            if f"{name}.data" in z.files:
+                data, offsets = z[f"{name}.data"].tobytes(), z[f"{name}.offsets"]
+                out[name] = [data[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+            elif f"{name}.dictionary" in z.files:
+                values = np.array(z[f"{name}.dictionary"].tolist() + [None], dtype=object)
+                decoded = values[z[f"{name}.codes"]]  # code -1 picks the trailing None
+                if f"{name}.offsets" in z.files:
+                    offsets = z[f"{name}.offsets"]
+                    out[name] = [list(decoded[a:b]) for a, b in zip(offsets[:-1], offsets[1:])]
+                else:
+                    out[name] = decoded
+            else:
+                out[name] = z[name]
+    return out
+
+
+class ColumnarExporter:
+    """
+    Streams audit entries and entity snapshots into columnar chunk files.
+
+    Output goes to a directory, one file per chunk of at most `chunk_rows`
+    rows, so memory stays at one chunk however large the log or store is:
+
+      audit-NNNNNN.npz              audit entries, appended to incrementally
+      audit.cursor.json             log position and chunk count of the audit export
+      entities/entities-NNNNNN.npz  a full entity snapshot, replaced on each export
+
+    Low-cardinality strings (types, states, tiers, entity ids, reasons) are
+    dictionary-encoded as int32 codes plus a per-chunk dictionary (code -1
+    is null); entity data is JSON in one UTF-8 buffer plus offsets, and
+    reasons are a list column (codes plus per-row offsets). Timestamps are
+    datetime64[us] in UTC. Everything loads with np.load(allow_pickle=False).
+    With format="parquet" (needs pyarrow) the same columns are written as
+    .parquet files with dictionary types instead.
+
+    The audit export remembers the log position (segment, offset) it reached
+    and the next run continues from there, across rotation. Each chunk is
+    written before the cursor moves past it, so a crashed run rewrites the
+    same chunk when re-run. The log's shared lock is held while reading, so
+    rotation waits for the export; writers do not.
+
+    An entity snapshot is written into a temporary directory and renamed
+    into place when complete, so readers never see a mix of two snapshots
+    and a crashed export leaves the previous one intact.
+    """
+
+    def __init__(self, out_dir: Path, *, chunk_rows: int = 65536, format: str = "npz"):
+        if format not in EXPORT_FORMATS:
+            raise ExportError(
+                f"Unknown export format '{format}'. Known: {', '.join(EXPORT_FORMATS)}"
+            )
+        if format == "parquet" and pq is None:
+            raise ExportError("Parquet export needs pyarrow; install it or use format 'npz'.")
+        self._dir = out_dir
+        self._chunk_rows = max(1, chunk_rows)
+        self._format = format
+
+    def _write(
+        self, directory: Path, kind: str, n: int, chunk: _Chunk, dtypes: Dict[str, Any]
+    ) -> None:
+        path = directory / f"{kind}-{n:06d}.{self._format}"
+        tmp = path.with_name(path.name + ".tmp")
+        arrays = chunk.arrays(dtypes)
+        if self._format == "npz":
+            with tmp.open("wb") as f:
+                np.savez(f, **arrays)
+        else:
+            pq.write_table(_arrow_table(arrays), str(tmp))
+        os.replace(tmp, path)
+
+    # --- audit ---
+
+    def export_audit(self, segments: AuditSegments) -> int:
+        """Export audit entries appended since the last run; returns rows written."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        cursor_path = self._dir / "audit.cursor.json"
+        with file_lock(self._dir / "export.lock"), file_lock(segments.lock_path, shared=True):
+            try:
+                cursor = json.loads(cursor_path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                cursor = {"position": None, "chunks": 0, "rows": 0}
+            position = tuple(cursor["position"]) if cursor["position"] is not None else None
+            if position is not None and not segments.is_current(position):
+                raise ExportError(
+                    f"{cursor_path} points past the end of {segments.path}; "
+                    "the log was replaced. Export into a fresh directory."
+                )
+
+            chunk = _new_audit_chunk()
+            written = 0
+
+            def flush(reached: tuple[int, int]) -> None:
+                nonlocal chunk, written
+                cursor["chunks"] += 1
+                self._write(self._dir, "audit", cursor["chunks"], chunk, _AUDIT_DTYPES)
+                written += chunk.rows
+                cursor["rows"] += chunk.rows
+                cursor["position"] = list(reached)
+                atomic_write_text(cursor_path, json.dumps(cursor))
+                chunk = _new_audit_chunk()
+
+            def consume(seg: int, offset: int, line: bytes) -> None:
+                if _add_audit_row(chunk, seg, offset, line) and chunk.rows >= self._chunk_rows:
+                    flush((seg, offset + len(line)))
+
+            end = segments.follow(position, consume)
+            if chunk.rows:
+                flush(end)
+            elif cursor["position"] != list(end):
+                cursor["position"] = list(end)
+                atomic_write_text(cursor_path, json.dumps(cursor))
+        return written
+
+    # --- entities ---
+
+    def export_entities(self, store: EntityStore) -> int:
+        """Write a full snapshot of the store, one page per chunk; returns rows written."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        target = self._dir / "entities"
+        old = self._dir / "entities.old"
+        with file_lock(self._dir / "export.lock"):
+            _recover_snapshot(target, old)
+            tmp = Path(tempfile.mkdtemp(prefix="entities.tmp-", dir=self._dir))
+            try:
+                rows = self._write_snapshot(store, tmp)
+                # A directory cannot be replaced by rename, so move the old
+                # snapshot aside first; _recover_snapshot undoes a crash in between.
+                if target.exists():
+                    os.replace(target, old)
+                os.replace(tmp, target)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+            shutil.rmtree(old, ignore_errors=True)
+        return rows
+
+    def _write_snapshot(self, store: EntityStore, directory: Path) -> int:
+        n = rows = 0
+        after: Optional[str] = None
+        while True:
+            page = list(store.query(after=after, limit=self._chunk_rows))
+            if not page:
+                break
+            records = store.get_many([(s.entity_type, s.entity_id) for s in page])
+            chunk = _Chunk(_ENTITY_DICT, ("entity_id", "data"), ())
+            for s in page:
+                rec = records.get((s.entity_type, s.entity_id))
+                if rec is None:
+                    continue  # deleted since the page was listed
+                chunk.rows += 1
+                for name in _ENTITY_DICT:
+                    chunk.add(name, getattr(rec, name))
+                chunk.add("entity_id", rec.entity_id)
+                chunk.add("data", json.dumps(rec.data, sort_keys=True))
+                chunk.add("version", rec.version)
+            n += 1
+            self._write(directory, "entities", n, chunk, _ENTITY_DTYPES)
+            rows += chunk.rows
+            after = page[-1].key
+        return rows
+
+
+def _recover_snapshot(target: Path, old: Path) -> None:
+    """Clean up after an export that crashed mid-way (called under the export lock)."""
+    if old.exists():
+        if target.exists():
+            shutil.rmtree(old)
+        else:
+            os.replace(old, target)  # crashed between the two renames
+    for tmp in target.parent.glob("entities.tmp-*"):
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _new_audit_chunk() -> _Chunk:
+    return _Chunk(_AUDIT_DICT, (), ("reasons",))
+
+
+def _add_audit_row(chunk: _Chunk, seg: int, offset: int, line: bytes) -> bool:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return False  # debris from a crashed writer
+    if not isinstance(row, dict) or "allowed" not in row:
+        return False
+    chunk.rows += 1
+    chunk.add("timestamp", _timestamp(row.get("timestamp")))
+    for name in _AUDIT_DICT:
+        chunk.add(name, row.get(name))
+    chunk.add("human_approved", bool(row.get("human_approved")))
+    chunk.add("allowed", bool(row.get("allowed")))
+    chunk.add("cache_hit", bool(row.get("cache_hit")))
+    percent = row.get("completeness_percent")
+    chunk.add("completeness_percent", percent if isinstance(percent, int) else -1)
+    chunk.add("reasons", [r for r in row.get("reasons") or () if isinstance(r, str)])
+    chunk.add("log_segment", seg)
+    chunk.add("log_offset", offset)
+    return True
+
+
+def _arrow_table(arrays: Dict[str, np.ndarray]):
+    """Same columns as the .npz layout, as an Arrow table with dictionary types."""
+    columns: Dict[str, Any] = {}
+    names = dict.fromkeys(key.split(".", 1)[0] for key in arrays)
+    for name in names:
+        if f"{name}.data" in arrays:
+            columns[name] = pa.LargeStringArray.from_buffers(
+                len(arrays[f"{name}.offsets"]) - 1,
+                pa.py_buffer(arrays[f"{name}.offsets"]),
+                pa.py_buffer(arrays[f"{name}.data"]),
+            )
+        elif f"{name}.dictionary" in arrays:
+            codes = arrays[f"{name}.codes"]
+            values = pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0),
+                pa.array(arrays[f"{name}.dictionary"].tolist(), pa.string()),
+            )
+            if f"{name}.offsets" in arrays:
+                values = pa.LargeListArray.from_arrays(pa.array(arrays[f"{name}.offsets"]), values)
+            columns[name] = values
+        else:
+            columns[name] = pa.array(arrays[name])
+    return pa.table(columns)
+
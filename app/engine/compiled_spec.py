@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Mapping
+
+from app.engine.completeness import ChecklistTracker, CompletenessMask
+from app.engine.expressions import CompiledExpression, ExpressionError, compile_expression
+from app.engine.gates import GatePlan, compile_gate
+from app.engine.identity import IdentityValidator
+from app.engine.rules import EXPR_CONTEXT_NAMES
+from app.engine.state_machine import TransitionError
+from app.engine.store import EntityRecord
+from app.engine.transition_graph import TransitionGraph
+from app.models import EntitySpec, GuardianSpec, TransitionSpec
+
+
+@dataclass(frozen=True)
+class CompiledTransition:
+    from_state: str
+    to_state: str
+    transition: TransitionSpec
+    plan: GatePlan
+
+
+class CompiledEntity:
+    """
+    One entity type with its lookups prepared: state membership is a set test
+    and transitions are a dict keyed by (from_state, to_state).
+    """
+
+    def __init__(self, name: str, spec: EntitySpec, *, spec_hash: str = ""):
+        self.name = name
+        self.spec = spec
+        self.states = frozenset(spec.states)
+        self.initial_state = spec.states[0]
+        self.ids = IdentityValidator(
+            canonical_regex=spec.id.canonical_regex,
+            legacy_regexes=spec.id.legacy_regexes,
+            canonical_format=spec.id.canonical_format,
+        )
+        # Parsed and lowered once here; evaluation never re-parses.
+        self.predicates: Dict[str, CompiledExpression] = {
+            item: _checklist_predicate(name, item, source)
+            for item, source in spec.checklist_expressions.items()
+        }
+        self.checklist = ChecklistTracker(spec.checklist, self.predicates)
+        self.transitions: Dict[tuple[str, str], CompiledTransition] = {}
+        for t in spec.transitions:
+            key = (t.from_state, t.to_state)
+            if key in self.transitions:
+                # Same precedence as resolve_transition: first match wins.
+                continue
+            self.transitions[key] = CompiledTransition(
+                from_state=t.from_state,
+                to_state=t.to_state,
+                transition=t,
+                plan=compile_gate(
+                    checklist=spec.checklist,
+                    predicates=self.predicates,
+                    rules=t.gate.rules,
+                    require_human_approval=t.gate.require_human_approval,
+                    key=(spec_hash, name, t.from_state, t.to_state),
+                ),
+            )
+
+        self.graph = TransitionGraph(name, spec.states, self.transitions, spec_hash=spec_hash)
+
+    def resolve(self, from_state: str, to_state: str) -> CompiledTransition:
+        if from_state not in self.states:
+            raise TransitionError(f"Unknown from_state '{from_state}'. Known: {self.spec.states}")
+        if to_state not in self.states:
+            raise TransitionError(f"Unknown to_state '{to_state}'. Known: {self.spec.states}")
+
+        compiled = self.transitions.get((from_state, to_state))
+        if compiled is None:
+            raise TransitionError(f"Transition not allowed: {from_state} -> {to_state}")
+        return compiled
+
+    def completeness_mask(self, record: EntityRecord) -> CompletenessMask:
+        """
+        The record's stored mask, or a fresh one if it has none or it was built
+        for an older checklist. Also stores the result on the record, so the
+        next write persists it.
+        """
+        stored = CompletenessMask.from_json(record.completeness)
+        mask = self.checklist.current(stored, record.data)
+        if mask is not stored:
+            record.completeness = mask.to_json()
+        return mask
+
+    def update_data(self, record: EntityRecord, changes: Mapping[str, object]) -> CompletenessMask:
+        """Merge `changes` into record.data and adjust the mask for just those keys."""
+        before = self.completeness_mask(record)
+        record.data.update(changes)
+        mask = self.checklist.update(before, changes, record.data)
+        record.completeness = mask.to_json()
+        return mask
+
+
+class CompiledSpec:
+    """
+    GuardianSpec lowered once for repeated use: per-entity transition tables,
+    state sets and gate plans. Build it right after loading the spec and pass
+    it to every command or bulk path instead of re-resolving per call.
+    """
+
+    def __init__(self, spec: GuardianSpec):
+        self.spec = spec
+        # Content hash of the validated spec; part of every gate plan's cache key.
+        self.spec_hash = hashlib.sha256(spec.model_dump_json().encode("utf-8")).hexdigest()
+        self.risk_tiers = frozenset(spec.risk_tiers)
+        self.entities: Dict[str, CompiledEntity] = {
+            name: CompiledEntity(name, entity, spec_hash=self.spec_hash)
+            for name, entity in spec.entities.items()
+        }
+
+    def __reduce__(self):
+        # Gate plans hold closures, which cannot be pickled. Pickle the validated
+        # spec and re-lower on load; that is cheap next to YAML parsing and
+        # pydantic validation, which unpickling skips.
+        return (CompiledSpec, (self.spec,))
+
+
+def compile_spec(spec: GuardianSpec) -> CompiledSpec:
+    return CompiledSpec(spec)
+
+
+def _checklist_predicate(entity_type: str, item: str, source: str) -> CompiledExpression:
+    """
+    Compile a checklist predicate. Predicates see entity data only, so the
+    gate context names expr rules resolve (risk_tier, completeness) are
+    rejected rather than silently read from the data.
+    """
+    predicate = compile_expression(source)
+    context = sorted(predicate.names.intersection(EXPR_CONTEXT_NAMES))
+    if context:
+        raise ExpressionError(
+            f"{entity_type} checklist item {item!r} reads {', '.join(context)}, which only "
+            f"expr gate rules can see; move that condition into an expr rule."
+        )
+    return predicate
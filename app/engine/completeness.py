@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
-from typing import Iterable, Mapping
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
+
+from app.engine.expressions import CompiledExpression
 
 
 class CompletenessError(ValueError):
@@ -16,6 +19,20 @@ class CompletenessResult:
     missing_items: tuple[str, ...]
 
 
+# Checklist items with a compiled predicate (spec `checklist_expressions`);
+# other items are satisfied by a truthy entity_data[item].
+Predicates = Mapping[str, CompiledExpression]
+
+
+def item_test(
+    item: str, predicates: Optional[Predicates] = None
+) -> Callable[[Mapping[str, object]], bool]:
+    predicate = predicates.get(item) if predicates else None
+    if predicate is not None:
+        return predicate.test
+    return lambda entity_data: bool(entity_data.get(item, False))
+
+
 class CompletenessEngine:
     """
     Computes completeness for an entity instance using a checklist defined in the spec.
@@ -28,6 +45,7 @@ class CompletenessEngine:
         self,
         checklist: Iterable[str],
         entity_data: Mapping[str, object],
+        predicates: Optional[Predicates] = None,
     ) -> CompletenessResult:
         items = list(checklist)
         total = len(items)
@@ -46,8 +64,12 @@ class CompletenessEngine:
 
         for item in items:
             # Missing keys are treated as not satisfied
-            value = entity_data.get(item, False)
-            if bool(value):
+            predicate = predicates.get(item) if predicates else None
+            if predicate is not None:
+                ok = predicate.test(entity_data)
+            else:
+                ok = bool(entity_data.get(item, False))
+            if ok:
                 satisfied += 1
             else:
                 missing.append(item)
@@ -61,3 +83,132 @@ class CompletenessEngine:
             percent=percent,
             missing_items=tuple(missing),
         )
+
+
+def checklist_hash(checklist: Iterable[str], predicates: Optional[Predicates] = None) -> str:
+    """
+    Stable fingerprint of a checklist and its predicates; item order matters
+    (it fixes bit positions).
+    """
+    lines = [
+        f"{item}={predicates[item].source}" if predicates and item in predicates else item
+        for item in checklist
+    ]
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class CompletenessMask:
+    """
+    Satisfied checklist items of one entity as a bitmask (bit i = item i),
+    plus the satisfied count, valid for the checklist with `checklist_hash`.
+    """
+
+    checklist_hash: str
+    bits: int
+    satisfied: int
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"checklist": self.checklist_hash, "bits": self.bits, "satisfied": self.satisfied}
+
+    @classmethod
+    def from_json(cls, raw: Optional[Mapping[str, Any]]) -> Optional["CompletenessMask"]:
+        if not raw:
+            return None
+        return cls(
+            checklist_hash=raw["checklist"], bits=int(raw["bits"]), satisfied=int(raw["satisfied"])
+        )
+
+
+class ChecklistTracker:
+    """
+    Maintains CompletenessMasks for one checklist.
+
+    track() builds a mask from scratch; update() adjusts an existing mask for
+    a dict of changed data keys, touching only the checklist items among them.
+    current() reuses a stored mask when it was built for this checklist and
+    recomputes it when the checklist changed since (different hash).
+    """
+
+    def __init__(self, checklist: Iterable[str], predicates: Optional[Predicates] = None):
+        self.items = tuple(checklist)
+        self.hash = checklist_hash(self.items, predicates)
+        self._bit = {item: 1 << i for i, item in enumerate(self.items)}
+        self._tests = [(1 << i, item_test(item, predicates)) for i, item in enumerate(self.items)]
+        # Data key -> bits of the items whose satisfaction depends on it.
+        self._dependents: Dict[str, int] = {}
+        self._predicate_bits = 0
+        for item, bit in self._bit.items():
+            predicate = predicates.get(item) if predicates else None
+            if predicate is not None:
+                self._predicate_bits |= bit
+            for key in predicate.names if predicate is not None else (item,):
+                self._dependents[key] = self._dependents.get(key, 0) | bit
+
+    def track(self, entity_data: Mapping[str, object]) -> CompletenessMask:
+        bits = 0
+        for bit, test in self._tests:
+            if test(entity_data):
+                bits |= bit
+        return CompletenessMask(self.hash, bits, bits.bit_count())
+
+    def update(
+        self,
+        mask: CompletenessMask,
+        changes: Mapping[str, object],
+        entity_data: Optional[Mapping[str, object]] = None,
+    ) -> CompletenessMask:
+        """
+        `entity_data` is the data with `changes` already applied; it is needed
+        only when a changed key feeds a checklist predicate.
+        """
+        if mask.checklist_hash != self.hash:
+            raise CompletenessError("Mask was built for a different checklist; use track().")
+        affected = 0
+        for key in changes:
+            affected |= self._dependents.get(key, 0)
+        if not affected:
+            return mask
+        if entity_data is None and affected & self._predicate_bits:
+            raise CompletenessError(
+                "Changed keys feed checklist predicates; pass the updated entity_data."
+            )
+        data = entity_data if entity_data is not None else changes
+        bits, satisfied = mask.bits, mask.satisfied
+        for bit, test in self._tests:
+            if not affected & bit:
+                continue
+            was = bool(bits & bit)
+            now = test(data)
+            if now and not was:
+                bits |= bit
+                satisfied += 1
+            elif was and not now:
+                bits &= ~bit
+                satisfied -= 1
+        return CompletenessMask(self.hash, bits, satisfied)
+
+    def current(
+        self, mask: Optional[CompletenessMask], entity_data: Mapping[str, object]
+    ) -> CompletenessMask:
+        if mask is not None and mask.checklist_hash == self.hash:
+            return mask
+        return self.track(entity_data)
+
+    def percent(self, mask: CompletenessMask) -> int:
+        total = len(self.items)
+        return 100 if total == 0 else (mask.satisfied * 100) // total
+
+    def result(self, mask: CompletenessMask) -> CompletenessResult:
+        """Same result CompletenessEngine.compute gives, read off the mask."""
+        total = len(self.items)
+        if total == 0:
+            return CompletenessResult(
+                total_items=0, satisfied_items=0, percent=100, missing_items=()
+            )
+        return CompletenessResult(
+            total_items=total,
+            satisfied_items=mask.satisfied,
+            percent=self.percent(mask),
+            missing_items=tuple(item for item, bit in self._bit.items() if not mask.bits & bit),
+        )
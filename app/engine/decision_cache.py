@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Hashable, Optional
+
+from app.engine.cache import CacheStats
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    key      TEXT PRIMARY KEY,
+    decision TEXT NOT NULL,
+    used     REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_decisions_used ON decisions (used);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class PersistentDecisionCache:
+    """
+    Gate decisions shared across processes in a SQLite file, so repeated CLI
+    calls (e.g. CI re-checking the same entities) reuse earlier decisions.
+
+    Keys are a digest of the in-process cache key (plan key, which carries
+    the spec hash, plus risk tier, human_approved, fail_fast and the data
+    digest), so an edited spec or changed entity data never hits a stale
+    entry. At most `maxsize` decisions are kept; the least recently used
+    tenth is dropped when that is exceeded. Hit and miss counts are kept
+    in the same file (stats()) so they add up across runs.
+    """
+
+    def __init__(self, path: Path, *, maxsize: int = 100_000, busy_timeout_ms: int = 5000):
+        self._path = path
+        self._maxsize = max(1, maxsize)
+        self._conn = sqlite3.connect(str(path), timeout=busy_timeout_ms / 1000)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """The stored (JSON) decision for `key`, counting a hit or a miss."""
+        digest = _digest(key)
+        row = self._conn.execute(
+            "SELECT decision FROM decisions WHERE key = ?", (digest,)
+        ).fetchone()
+        with self._conn:
+            self._count("hits" if row is not None else "misses")
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE decisions SET used = ? WHERE key = ?", (time.time(), digest)
+                )
+        return row[0] if row is not None else None
+
+    def put(self, key: Hashable, decision: str) -> None:
+        digest = _digest(key)
+        with self._conn:
+            updated = self._conn.execute(
+                "UPDATE decisions SET decision = ?, used = ? WHERE key = ?",
+                (decision, time.time(), digest),
+            ).rowcount
+            if updated:
+                return
+            self._conn.execute(
+                "INSERT INTO decisions (key, decision, used) VALUES (?, ?, ?)",
+                (digest, decision, time.time()),
+            )
+            self._count("entries")
+            (count,) = self._conn.execute(
+                "SELECT value FROM counters WHERE name = 'entries'"
+            ).fetchone()
+            if count > self._maxsize:
+                dropped = self._conn.execute(
+                    "DELETE FROM decisions WHERE key IN "
+                    "(SELECT key FROM decisions ORDER BY used LIMIT ?)",
+                    (count - self._maxsize + self._maxsize // 10,),
+                ).rowcount
+                self._conn.execute(
+                    "UPDATE counters SET value = value - ? WHERE name = 'entries'", (dropped,)
+                )
+
+    def stats(self) -> CacheStats:
+        """Hits and misses recorded by every process using this file."""
+        counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        return CacheStats(hits=counters.get("hits", 0), misses=counters.get("misses", 0))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _count(self, name: str) -> None:
+        # Counters are updated inside the caller's transaction.
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+
+def _digest(key: Hashable) -> str:
+    payload = json.dumps(key, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import ast
+import operator
+from typing import Any, Callable, Mapping
+
+MAX_EXPRESSION_LENGTH = 1000
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+# An evaluator takes the name lookup environment and returns a value.
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "len": lambda v: 0 if v is None else len(v),
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "sum": sum,
+    "any": any,
+    "all": all,
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": bool,
+    "lower": lambda v: str(v).lower(),
+}
+
+def _multiply(a: Any, b: Any) -> Any:
+    # Numbers only: "x" * 10**9 would let a single expression allocate gigabytes.
+    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+        raise TypeError("'*' only multiplies numbers")
+    return a * b
+
+
+def _modulo(a: Any, b: Any) -> Any:
+    # Numbers only: on strings '%' is formatting, and "%0200000000d" % 1 is 200MB.
+    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+        raise TypeError("'%' only applies to numbers")
+    return a % b
+
+
+_BINARY: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _multiply,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: _modulo,
+}
+
+_UNARY: dict[type, Callable[[Any], Any]] = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_COMPARE: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+# Errors an expression can raise on odd data (e.g. len(3), "a" < 1); predicates
+# treat them as "not satisfied" instead of crashing the gate.
+EVALUATION_ERRORS = (TypeError, ValueError, ZeroDivisionError, KeyError, IndexError)
+
+
+class CompiledExpression:
+    """
+    An expression parsed and lowered once into nested closures.
+
+    Names resolve against the environment mapping via .get(), so a missing
+    field reads as None. Only literals, names, boolean logic, comparisons,
+    arithmetic (`*` and `%` on numbers only), subscripts, conditional
+    expressions and calls to a fixed set of functions (len, min, max, abs,
+    sum, any, all, int, float, str, bool, lower) are accepted; anything else
+    is rejected at compile time.
+    """
+
+    __slots__ = ("source", "names", "_fn")
+
+    def __init__(self, source: str, fn: Evaluator, names: frozenset[str]):
+        self.source = source
+        self.names = names  # environment names the expression reads
+        self._fn = fn
+
+    def __call__(self, env: Mapping[str, Any]) -> Any:
+        return self._fn(env)
+
+    def test(self, env: Mapping[str, Any]) -> bool:
+        """Truthiness of the result; evaluation errors count as False."""
+        try:
+            return bool(self._fn(env))
+        except EVALUATION_ERRORS:
+            return False
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+def compile_expression(source: str) -> CompiledExpression:
+    if not isinstance(source, str) or not source.strip():
+        raise ExpressionError("Expression must be a non-empty string.")
+    if len(source) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters.")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression {source!r}: {e.msg}") from e
+
+    names: set[str] = set()
+    fn = _compile(tree.body, names, source)
+    return CompiledExpression(source, fn, frozenset(names))
+
+
+def _compile(node: ast.AST, names: set[str], source: str) -> Evaluator:
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (str, int, float, bool, type(None))):
+            raise ExpressionError(f"Unsupported constant in {source!r}: {node.value!r}")
+        value = node.value
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        names.add(name)
+        return lambda env: env.get(name)
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v, names, source) for v in node.values]
+        if isinstance(node.op, ast.And):
+            def and_(env):
+                result = True
+                for part in parts:
+                    result = part(env)
+                    if not result:
+                        return result
+                return result
+
+            return and_
+
+        def or_(env):
+            result = False
+            for part in parts:
+                result = part(env)
+                if result:
+                    return result
+            return result
+
+        return or_
+
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator in {source!r}")
+        operand = _compile(node.operand, names, source)
+        return lambda env: op(operand(env))
+
+    if isinstance(node, ast.BinOp):
+        op = _BINARY.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator in {source!r}")
+        left = _compile(node.left, names, source)
+        right = _compile(node.right, names, source)
+        return lambda env: op(left(env), right(env))
+
+    if isinstance(node, ast.Compare):
+        first = _compile(node.left, names, source)
+        steps = []
+        for op_node, comparator in zip(node.ops, node.comparators):
+            op = _COMPARE.get(type(op_node))
+            if op is None:
+                raise ExpressionError(f"Unsupported comparison in {source!r}")
+            steps.append((op, _compile(comparator, names, source)))
+
+        if len(steps) == 1:
+            (op, right), = steps
+            return lambda env: op(first(env), right(env))
+
+        def chain(env):
+            left = first(env)
+            for op, right_fn in steps:
+                right = right_fn(env)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+
+        return chain
+
+    if isinstance(node, ast.IfExp):
+        test = _compile(node.test, names, source)
+        body = _compile(node.body, names, source)
+        orelse = _compile(node.orelse, names, source)
+        return lambda env: body(env) if test(env) else orelse(env)
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_compile(e, names, source) for e in node.elts]
+        kind = {ast.List: list, ast.Tuple: tuple, ast.Set: frozenset}[type(node)]
+        return lambda env: kind(item(env) for item in items)
+
+    if isinstance(node, ast.Subscript):
+        value = _compile(node.value, names, source)
+        index = _compile(node.slice, names, source)
+        return lambda env: value(env)[index(env)]
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise ExpressionError(
+                f"Unsupported call in {source!r}. Allowed: {', '.join(sorted(_FUNCTIONS))}"
+            )
+        if node.keywords or any(isinstance(a, ast.Starred) for a in node.args):
+            raise ExpressionError(f"Only positional arguments are supported in {source!r}")
+        func = _FUNCTIONS[node.func.id]
+        args = [_compile(a, names, source) for a in node.args]
+        if len(args) == 1:
+            arg, = args
+            return lambda env: func(arg(env))
+        return lambda env: func(*(a(env) for a in args))
+
+    raise ExpressionError(f"Unsupported syntax in {source!r}: {type(node).__name__}")
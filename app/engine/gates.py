@@ -1,9 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, Mapping, Optional
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Hashable, Iterable, Mapping, Optional
 
+from app.engine.cache import LRUCache, cache_stats
 from app.engine.completeness import CompletenessEngine, CompletenessResult
+from app.engine.decision_cache import PersistentDecisionCache
+from app.engine.expressions import CompiledExpression
+from app.engine.rules import RuleCheck, RuleContext, RuleRegistry, default_rule_registry
 from app.models import GateRule
 
 
@@ -16,6 +24,94 @@ class GateDecision:
     allowed: bool
     reasons: tuple[str, ...]
     completeness: Optional[CompletenessResult] = None
+    cache_hit: bool = field(default=False, compare=False)  # served from GateEngine's decision cache
+
+
+@dataclass(frozen=True)
+class GatePlan:
+    """
+    A gate with its rules pre-lowered into closures, so evaluation does no
+    rule-type dispatch. Build once per transition with compile_gate().
+    """
+
+    checklist: tuple[str, ...]
+    require_human_approval: bool | str
+    checks: tuple[RuleCheck, ...]  # in spec order
+    rules: tuple[GateRule, ...] = ()  # source rules, for alternative (e.g. bulk) lowerings
+    # Indexes into `checks`, cheapest estimated cost first (fail-fast order).
+    fast_order: tuple[int, ...] = ()
+    # Identifies the plan for decision caching (spec hash, entity, from, to);
+    # None = never cached.
+    key: Optional[Hashable] = None
+    # Entity data fields the plan's decision depends on.
+    fields: tuple[str, ...] = ()
+    # Compiled checklist predicates (see CompletenessEngine.compute).
+    predicates: Mapping[str, CompiledExpression] = field(default_factory=dict)
+
+
+def human_approval_required(require_human_approval: bool | str, risk_tier: str) -> bool:
+    if isinstance(require_human_approval, bool):
+        return require_human_approval
+
+    if require_human_approval == "medium_or_high":
+        return risk_tier in ("medium", "high")
+
+    # Safe default
+    return True
+
+
+def data_digest(fields: Iterable[str], entity_data: Mapping[str, object]) -> str:
+    """Stable digest of the given fields' values; other keys do not affect it."""
+    payload = json.dumps(
+        [[f, entity_data.get(f)] for f in fields],
+        sort_keys=True,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def compile_gate(
+    *,
+    checklist: Iterable[str],
+    rules: list[GateRule],
+    require_human_approval: bool | str,
+    key: Optional[Hashable] = None,
+    registry: Optional[RuleRegistry] = None,
+    predicates: Optional[Mapping[str, CompiledExpression]] = None,
+) -> GatePlan:
+    """
+    Lower a gate's rules through the rule registry (the process-wide default
+    unless given). The plan is only cacheable (keeps `key`) if every rule
+    declares which data fields it reads.
+    """
+    registry = registry or default_rule_registry()
+    checklist = tuple(checklist)
+    lowered = [registry.lower(rule) for rule in rules]
+
+    predicates = dict(predicates or {})
+    fields: list[str] = []
+    for item in checklist:
+        for name in sorted(predicates[item].names) if item in predicates else (item,):
+            if name not in fields:
+                fields.append(name)
+    cacheable = key is not None
+    for rule in lowered:
+        if rule.fields is None:
+            cacheable = False
+        else:
+            fields.extend(f for f in rule.fields if f not in fields)
+
+    return GatePlan(
+        checklist=checklist,
+        require_human_approval=require_human_approval,
+        checks=tuple(rule.check for rule in lowered),
+        rules=tuple(rules),
+        fast_order=tuple(sorted(range(len(lowered)), key=lambda i: lowered[i].cost)),
+        key=key if cacheable else None,
+        fields=tuple(fields),
+        predicates=predicates,
+    )
 
 
 class GateEngine:
@@ -25,10 +121,48 @@ class GateEngine:
       - completeness_min
       - require_human_approval: true/false,"medium_or_high"
       - always_block
+      - any rule type registered in the rule registry (app.engine.rules)
+
+    By default every rule runs in spec order and all reasons are reported.
+    With fail_fast=True rules run cheapest-first and evaluation stops at the
+    first blocking reason, for callers that only need allowed/blocked.
+
+    With decision_cache_size > 0, decisions for keyed plans (see CompiledSpec)
+    are memoized in an LRU keyed by (plan key, risk tier, human_approved,
+    digest of the plan's data fields). Hits come back with cache_hit=True and
+    are counted under cache_stats("gates.decisions"). That cache lives and
+    dies with the process, so it only pays off for long-lived callers that
+    embed the engine (a server, a batch job); each CLI call starts empty.
+
+    With decision_cache_path set, decisions are also kept in a
+    PersistentDecisionCache (SQLite) under the same key, which is what makes
+    repeated CLI calls hit. The in-process LRU, if any, sits in front of it.
     """
 
-    def __init__(self):
+    def __init__(self, *, decision_cache_size: int = 0, decision_cache_path: Optional[Path] = None):
         self._completeness = CompletenessEngine()
+        self._decisions: Optional[LRUCache[GateDecision]] = None
+        if decision_cache_size > 0:
+            self._decisions = LRUCache(decision_cache_size, cache_stats("gates.decisions"))
+        self.persistent: Optional[PersistentDecisionCache] = None
+        if decision_cache_path is not None:
+            self.persistent = PersistentDecisionCache(decision_cache_path)
+
+    @classmethod
+    def from_env(cls) -> "GateEngine":
+        """
+        GUARDIAN_GATE_CACHE_SIZE=<decisions> enables the in-process decision
+        cache; GUARDIAN_GATE_CACHE_PATH=<file> the persistent one (both default off).
+        """
+        path = os.getenv("GUARDIAN_GATE_CACHE_PATH", "").strip()
+        return cls(
+            decision_cache_size=int(os.getenv("GUARDIAN_GATE_CACHE_SIZE", "0")),
+            decision_cache_path=Path(path) if path else None,
+        )
+
+    def close(self) -> None:
+        if self.persistent is not None:
+            self.persistent.close()
 
     def evaluate(
         self,
@@ -39,50 +173,140 @@ class GateEngine:
         require_human_approval: bool | str,
         risk_tier: str,
         human_approved: bool,
+        fail_fast: bool = False,
     ) -> GateDecision:
-        reasons: list[str] = []
-        completeness_result: Optional[CompletenessResult] = None
+        plan = compile_gate(
+            checklist=checklist,
+            rules=rules,
+            require_human_approval=require_human_approval,
+        )
+        return self.evaluate_plan(
+            plan,
+            entity_data=entity_data,
+            risk_tier=risk_tier,
+            human_approved=human_approved,
+            fail_fast=fail_fast,
+        )
 
-        def get_completeness() -> CompletenessResult:
-            nonlocal completeness_result
-            if completeness_result is None:
-                completeness_result = self._completeness.compute(checklist, entity_data)
-            return completeness_result
+    def evaluate_plan(
+        self,
+        plan: GatePlan,
+        *,
+        entity_data: Mapping[str, object],
+        risk_tier: str,
+        human_approved: bool,
+        completeness: Optional[CompletenessResult] = None,
+        fail_fast: bool = False,
+    ) -> GateDecision:
+        """
+        `completeness`, when the caller already has it (e.g. from the record's
+        tracked mask), is used instead of recomputing it from entity_data.
+        """
+        cache_key = None
+        if (self._decisions is not None or self.persistent is not None) and plan.key is not None:
+            cache_key = (
+                plan.key,
+                risk_tier,
+                bool(human_approved),
+                fail_fast,
+                data_digest(plan.fields, entity_data),
+            )
+            cached = self._decisions.get(cache_key) if self._decisions is not None else None
+            if cached is None and self.persistent is not None:
+                stored = self.persistent.get(cache_key)
+                if stored is not None:
+                    cached = _decision_from_json(stored)
+                    if self._decisions is not None:
+                        self._decisions.put(cache_key, cached)
+            if cached is not None:
+                return replace(cached, cache_hit=True)
+
+        decision = self._decide(
+            plan,
+            entity_data=entity_data,
+            risk_tier=risk_tier,
+            human_approved=human_approved,
+            completeness=completeness,
+            fail_fast=fail_fast,
+        )
+        if cache_key is not None:
+            if self._decisions is not None:
+                self._decisions.put(cache_key, decision)
+            if self.persistent is not None:
+                self.persistent.put(cache_key, _decision_to_json(decision))
+        return decision
+
+    def _decide(
+        self,
+        plan: GatePlan,
+        *,
+        entity_data: Mapping[str, object],
+        risk_tier: str,
+        human_approved: bool,
+        completeness: Optional[CompletenessResult],
+        fail_fast: bool,
+    ) -> GateDecision:
+        reasons: list[str] = []
+        ctx = RuleContext(
+            entity_data,
+            risk_tier,
+            lambda: completeness
+            or self._completeness.compute(plan.checklist, entity_data, plan.predicates),
+        )
 
         # Human approval policy
-        if self._human_required(require_human_approval, risk_tier):
+        if self._human_required(plan.require_human_approval, risk_tier):
             if not human_approved:
                 reasons.append("Human approval required but not provided.")
+                if fail_fast:
+                    return GateDecision(allowed=False, reasons=tuple(reasons))
 
-        # Rule evaluation (typed GateRule)
-        for rule in rules:
-            rule_type = (getattr(rule, "type", "") or "").strip()
-
-            if rule_type == "completeness_min":
-                if rule.percent is None:
-                    reasons.append("Rule completeness_min missing required 'percent'.")
-                    continue
-
-                completeness_result = get_completeness()
-                if completeness_result.percent < int(rule.percent):
-                    reasons.append(
-                        f"Completeness {completeness_result.percent}% is below required {int(rule.percent)}%."
+        if fail_fast:
+            for i in plan.fast_order:
+                reason, stop = plan.checks[i](ctx)
+                if reason is not None or stop:
+                    return GateDecision(
+                        allowed=False,
+                        reasons=(reason,) if reason is not None else (),
+                        completeness=ctx.computed_completeness,
                     )
-            elif rule_type == "always_block":
-                reasons.append("Rule always_block triggered.")
+            return GateDecision(allowed=True, reasons=(), completeness=ctx.computed_completeness)
+
+        # Pre-lowered rule checks
+        for check in plan.checks:
+            reason, stop = check(ctx)
+            if reason is not None:
+                reasons.append(reason)
+            if stop:
                 return GateDecision(allowed=False, reasons=tuple(reasons))
-            else:
-                reasons.append(f"Unsupported rule type: {rule_type}")
 
-        return GateDecision(allowed=(len(reasons) == 0), reasons=tuple(reasons), completeness=completeness_result)
+        return GateDecision(
+            allowed=(len(reasons) == 0),
+            reasons=tuple(reasons),
+            completeness=ctx.computed_completeness,
+        )
 
     @staticmethod
     def _human_required(require_human_approval: bool | str, risk_tier: str) -> bool:
-        if isinstance(require_human_approval, bool):
-            return require_human_approval
+        return human_approval_required(require_human_approval, risk_tier)
+
+
+def _decision_to_json(decision: GateDecision) -> str:
+    c = decision.completeness
+    return json.dumps({
+        "allowed": decision.allowed,
+        "reasons": list(decision.reasons),
+        "completeness": None if c is None else [
+            c.total_items, c.satisfied_items, c.percent, list(c.missing_items)
+        ],
+    })
 
-        if require_human_approval == "medium_or_high":
-            return risk_tier in ("medium", "high")
 
-        # Safe default
-        return True
\ No newline at end of file
+def _decision_from_json(payload: str) -> GateDecision:
+    row = json.loads(payload)
+    c = row["completeness"]
+    return GateDecision(
+        allowed=row["allowed"],
+        reasons=tuple(row["reasons"]),
+        completeness=None if c is None else CompletenessResult(c[0], c[1], c[2], tuple(c[3])),
+    )
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.engine.locking import file_lock
+
+FSYNC_POLICIES = ("none", "batch", "entry")
+
+
+class GroupCommitWriter:
+    """
+    Appends newline-terminated lines to a file in groups.
+
+    Lines are encoded and buffered in memory; a group is written with one
+    write() on an O_APPEND descriptor once `flush_entries` lines are pending
+    or the oldest pending line is `flush_interval` seconds old (checked on
+    each write), and on flush()/close(). Only whole lines are ever written,
+    so concurrent appenders never interleave inside a line; if the file
+    ends in a torn line from an earlier crash, a newline is written first so
+    it cannot swallow the next entry.
+
+    fsync policy:
+      "none"  - leave durability to the OS
+      "batch" - fsync after every group
+      "entry" - write and fsync every line as it arrives (no buffering)
+
+    append_once() writes immediately and closes the file again, for callers
+    that log rarely and should not hold a descriptor open.
+
+    With a `lock_path`, each group is written holding a shared flock on it
+    and the file is reopened first if the path now names a different file,
+    so a rotator holding the lock exclusively can rename the file away
+    without losing lines to the old inode.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        flush_entries: int = 256,
+        flush_interval: float = 1.0,
+        fsync: str = "none",
+        lock_path: Optional[Path] = None,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'. Known: {', '.join(FSYNC_POLICIES)}")
+        self._path = path
+        self._flush_entries = max(1, flush_entries)
+        self._flush_interval = flush_interval
+        self._fsync = fsync
+        self._lock_path = lock_path
+        self._lock = threading.Lock()
+        self._pending: list[bytes] = []
+        self._oldest = 0.0
+        self._fd: Optional[int] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def write(self, lines: Iterable[str]) -> None:
+        """Queue lines (without trailing newline); writes a group once a threshold is hit."""
+        encoded = [(line + "\n").encode("utf-8") for line in lines]
+        if not encoded:
+            return
+        with self._lock:
+            if self._fsync == "entry":
+                for line in encoded:
+                    self._pending.append(line)
+                    self._flush_locked()
+                return
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.extend(encoded)
+            if (
+                len(self._pending) >= self._flush_entries
+                or time.monotonic() - self._oldest >= self._flush_interval
+            ):
+                self._flush_locked()
+
+    def append_once(self, lines: Iterable[str]) -> None:
+        """Write lines as one group right away and release the file handle."""
+        self.write(lines)
+        self.close()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> "GroupCommitWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _open(self) -> int:
+        if self._fd is not None and self._lock_path is not None and self._rotated():
+            os.close(self._fd)
+            self._fd = None
+        if self._fd is None:
+            fd = os.open(self._path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                _write_all(fd, b"\n")
+            self._fd = fd
+        return self._fd
+
+    def _rotated(self) -> bool:
+        try:
+            return os.stat(self._path).st_ino != os.fstat(self._fd).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        if self._lock_path is None:
+            self._write_pending()
+            return
+        with file_lock(self._lock_path, shared=True):
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        fd = self._open()
+        _write_all(fd, b"".join(self._pending))
+        self._pending.clear()
+        if self._fsync != "none":
+            os.fsync(fd)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.engine.audit_index import AuditIndex
+from app.engine.audit_rollups import AuditRollups
+from app.engine.audit_segments import AuditSegments
+from app.engine.identity import IdentityValidator
+from app.engine.locking import atomic_write_text, file_lock
+from app.engine.store import EntityRecord, EntityStore, StoreError
+
+
+@dataclass
+class MigrationState:
+    """
+    Progress of one ID migration, saved to the checkpoint file after every
+    batch so an interrupted run resumes where it stopped.
+    """
+
+    entity_type: str
+    phase: str = "store"  # "store" -> "audit" -> "swap" -> "done"
+    after: Optional[str] = None  # store cursor: key of the last entity scanned
+    # Legacy id -> canonical id of the batch being moved; cleared once the batch
+    # is committed. A non-empty map on load means the last run died mid-batch.
+    pending: Dict[str, str] = field(default_factory=dict)
+    audit_segment: int = 0  # last rotated audit segment already rewritten
+    audit_read: int = 0  # bytes of the active audit log consumed
+    audit_written: int = 0  # bytes of the rewritten log known to be on disk
+    scanned: int = 0
+    migrated: int = 0
+    audit_rewritten: int = 0
+    conflicts: list[str] = field(default_factory=list)  # legacy ids whose canonical id is taken
+    # Legacy ids updated while being moved; kept in place for the next run.
+    changed: list[str] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path, entity_type: str) -> "MigrationState":
+        if not path.exists():
+            return cls(entity_type)
+        state = cls(**json.loads(path.read_text(encoding="utf-8")))
+        if state.entity_type != entity_type:
+            raise StoreError(
+                f"Checkpoint {path} belongs to a {state.entity_type} migration, not {entity_type}."
+            )
+        return state
+
+    def save(self, path: Path) -> None:
+        atomic_write_text(path, json.dumps(asdict(self)))
+
+
+class IdMigration:
+    """
+    Rewrites one entity type's legacy IDs to their canonical form.
+
+    The store is walked in key order one page at a time (query + get_many),
+    so memory stays at one batch however large the store is. Each batch
+    copies its legacy records to their canonical keys and deletes the old
+    keys. The audit log is then streamed line by line into a sibling file,
+    rewriting the entity_id of matching entries; rotated audit segments are
+    recompressed one at a time the same way. That bulk pass runs alongside
+    audit writers. The final catch-up, the rename over the log and the
+    audit history index reset happen under the exclusive audit log lock, so
+    no append lands in between; the rollups are rebuilt afterwards.
+
+    Progress goes to the checkpoint file after every batch; running again
+    with the same checkpoint resumes, and a batch interrupted between its
+    copy and its delete is finished first. A legacy ID whose canonical ID
+    already exists is left alone and reported as a conflict. Old keys are
+    deleted with compare-and-swap against the version that was copied; one
+    updated in between keeps its key (its copy is removed again) and is
+    reported as changed, so a re-run moves the update too. The checkpoint
+    is removed once the migration completes.
+    """
+
+    def __init__(
+        self,
+        store: EntityStore,
+        ids: IdentityValidator,
+        entity_type: str,
+        *,
+        checkpoint: Path,
+        audit_path: Optional[Path] = None,
+        batch_size: int = 500,
+    ):
+        self._store = store
+        self._ids = ids
+        self._type = entity_type
+        self._checkpoint = checkpoint
+        self._audit_path = audit_path
+        self._batch_size = max(1, batch_size)
+
+    def _canonical(self, entity_id: str) -> Optional[str]:
+        result = self._ids.classify(self._type, entity_id)
+        if result is None or not result.is_legacy:
+            return None
+        return result.canonical_id
+
+    def run(self) -> MigrationState:
+        state = MigrationState.load(self._checkpoint, self._type)
+        if state.phase == "store":
+            self._migrate_store(state)
+            state.phase = "audit"
+            state.save(self._checkpoint)
+        if state.phase == "audit":
+            if self._audit_path is not None:
+                self._migrate_audit_segments(state)
+                if self._audit_path.exists():
+                    self._migrate_audit(state)
+            state.phase = "swap"
+            state.save(self._checkpoint)
+        if state.phase == "swap":
+            if self._audit_path is not None:
+                self._swap_audit(state)
+                self._rebuild_rollups()
+            state.phase = "done"
+        self._checkpoint.unlink(missing_ok=True)
+        return state
+
+    # --- store ---
+
+    def _migrate_store(self, state: MigrationState) -> None:
+        if state.pending:
+            self._finish(state)
+        while True:
+            page = list(
+                self._store.query(entity_type=self._type, after=state.after, limit=self._batch_size)
+            )
+            if not page:
+                return
+            moves = {}
+            for summary in page:
+                canonical = self._canonical(summary.entity_id)
+                if canonical is not None:
+                    moves[summary.entity_id] = canonical
+            if moves:
+                self._move(moves, state)
+            state.scanned += len(page)
+            state.after = page[-1].key
+            state.save(self._checkpoint)
+
+    def _move(self, moves: Dict[str, str], state: MigrationState) -> None:
+        t = self._type
+        records = self._store.get_many([(t, i) for i in moves] + [(t, i) for i in moves.values()])
+        copies = []
+        taken: set[str] = set()
+        for old_id, new_id in moves.items():
+            old = records.get((t, old_id))
+            if old is None:
+                continue  # deleted since the page was listed
+            if (t, new_id) in records or new_id in taken:
+                state.conflicts.append(old_id)
+                continue
+            taken.add(new_id)
+            copies.append(replace(old, entity_id=new_id, version=0))
+            state.pending[old_id] = new_id
+        if not copies:
+            return
+
+        # Record the intent before writing so a crash between the copy and the
+        # delete is finished, not reported as a conflict, on resume.
+        state.save(self._checkpoint)
+        self._store.upsert_many(copies, cas=True)
+        self._retire(
+            {old_id: records[(t, old_id)].version for old_id in state.pending},
+            {copy.entity_id: copy.version for copy in copies},
+            state,
+        )
+
+    def _finish(self, state: MigrationState) -> None:
+        t = self._type
+        pending = state.pending
+        records = self._store.get_many(
+            [(t, i) for i in pending] + [(t, i) for i in pending.values()]
+        )
+        copies = []
+        for old_id, new_id in pending.items():
+            old = records.get((t, old_id))
+            if old is not None and (t, new_id) not in records:
+                copies.append(replace(old, entity_id=new_id, version=0))
+        if copies:
+            self._store.upsert_many(copies, cas=True)
+        copy_versions = {copy.entity_id: copy.version for copy in copies}
+        old_versions = {}
+        for old_id, new_id in pending.items():
+            old = records.get((t, old_id))
+            if old is None:
+                continue  # deleted before the crash
+            if new_id not in copy_versions:
+                # Copied before the crash: the legacy record may have changed since.
+                copy = records[(t, new_id)]
+                if _content(copy) != _content(old):
+                    old_versions[old_id] = -1  # never matches, so the old key is kept
+                copy_versions[new_id] = copy.version
+            old_versions.setdefault(old_id, old.version)
+        self._retire(old_versions, copy_versions, state)
+        state.save(self._checkpoint)
+
+    def _retire(
+        self, old_versions: Dict[str, int], copy_versions: Dict[str, int], state: MigrationState
+    ) -> None:
+        """Delete the copied legacy keys unless they changed after the copy was taken."""
+        t = self._type
+        pending = state.pending
+        self._store.delete_many(
+            [(t, old_id) for old_id in old_versions],
+            versions={(t, old_id): v for old_id, v in old_versions.items()},
+        )
+        kept = self._store.get_many((t, old_id) for old_id in old_versions)
+        changed = [old_id for old_id in old_versions if (t, old_id) in kept]
+        if changed:
+            self._store.delete_many(
+                [(t, pending[old_id]) for old_id in changed],
+                versions={(t, pending[i]): copy_versions[pending[i]] for i in changed},
+            )
+            state.changed.extend(changed)
+        state.migrated += len(pending) - len(changed)
+        state.pending = {}
+
+    # --- audit log ---
+
+    def _audit_tmp(self) -> Optional[Path]:
+        if self._audit_path is None:
+            return None
+        return self._audit_path.with_name(self._audit_path.name + ".migrating")
+
+    def _swap_audit(self, state: MigrationState) -> None:
+        segments = AuditSegments(self._audit_path)
+        # Appends take this lock shared; rotation and our reads below need no other audit lock.
+        with file_lock(segments.lock_path):
+            if any(seq > state.audit_segment for seq in segments.segments()):
+                # The file we copied was rotated meanwhile; it is rewritten as a
+                # segment below, so copy its successor from the start.
+                self._audit_tmp().unlink(missing_ok=True)
+            self._migrate_audit_segments(state)
+            if self._audit_path.exists():
+                self._migrate_audit(state)
+                os.replace(self._audit_tmp(), self._audit_path)
+            # Rewritten lines change length, so every saved log position is stale.
+            index = AuditIndex(segments)
+            if index.path.exists():
+                index.reset()
+                index.close()
+            rollups = AuditRollups(segments)
+            if rollups.path.exists():
+                # Dropped rather than rebuilt here: rebuilding takes the lock we hold.
+                rollups.path.write_text("", encoding="utf-8")
+
+    def _rebuild_rollups(self) -> None:
+        rollups = AuditRollups(AuditSegments(self._audit_path))
+        if rollups.path.exists():
+            rollups.rebuild()
+
+    def _migrate_audit_segments(self, state: MigrationState) -> None:
+        segments = AuditSegments(self._audit_path)
+        conflicts = set(state.conflicts) | set(state.changed)  # ids that stay legacy
+        for seq in segments.segments():
+            if seq <= state.audit_segment:
+                continue
+            segments.rewrite(seq, lambda line: self._rewrite(line, conflicts, state))
+            state.audit_segment = seq
+            state.save(self._checkpoint)
+
+    def _migrate_audit(self, state: MigrationState) -> None:
+        tmp = self._audit_tmp()
+        conflicts = set(state.conflicts) | set(state.changed)  # ids that stay legacy
+        if not tmp.exists():
+            state.audit_read = state.audit_written = 0
+        with self._audit_path.open("rb") as src, tmp.open("r+b" if tmp.exists() else "wb") as out:
+            # Drop whatever the interrupted run wrote after its last checkpoint.
+            out.truncate(state.audit_written)
+            out.seek(state.audit_written)
+            src.seek(state.audit_read)
+            lines = 0
+            for line in src:
+                out.write(self._rewrite(line, conflicts, state))
+                state.audit_read += len(line)
+                lines += 1
+                if lines % self._batch_size == 0:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    state.audit_written = out.tell()
+                    state.save(self._checkpoint)
+            out.flush()
+            os.fsync(out.fileno())
+            state.audit_written = out.tell()
+
+    def _rewrite(self, line: bytes, conflicts: set[str], state: MigrationState) -> bytes:
+        # Anything that is not a complete entry for this type is copied verbatim.
+        if not line.endswith(b"\n"):
+            return line
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return line
+        if not isinstance(entry, dict) or entry.get("entity_type") != self._type:
+            return line
+        entity_id = entry.get("entity_id")
+        if not isinstance(entity_id, str) or entity_id in conflicts:
+            return line
+        canonical = self._canonical(entity_id)
+        if canonical is None:
+            return line
+        entry["entity_id"] = canonical
+        state.audit_rewritten += 1
+        return (json.dumps(entry) + "\n").encode("utf-8")
+
+
+def _content(record: EntityRecord) -> tuple:
+    return (record.risk_tier, record.state, record.data, record.completeness)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Optional
+import string
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional
 
 
 class IdentityError(ValueError):
@@ -15,37 +16,166 @@ class IdentityResult:
     raw_id: str
     canonical_id: Optional[str]
     is_legacy: bool
+    pattern: str = "canonical"  # "canonical" or "legacy_<n>" (index into legacy_regexes)
+    groups: Dict[str, str] = field(default_factory=dict)  # named groups of the matched pattern
+
+
+# Named groups and named backreferences inside a spec pattern; renamed per
+# alternative so several patterns can define the same group name.
+_NAMED_GROUP = re.compile(r"(?<!\\)\(\?P<([A-Za-z_][A-Za-z0-9_]*)>")
+_NAMED_BACKREF = re.compile(r"(?<!\\)\(\?P=([A-Za-z_][A-Za-z0-9_]*)\)")
+# Numbered backreferences and inline global flags do not survive being
+# embedded in an alternation.
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?[aiLmsux]+\)")
+
+
+def _namespaced(pattern: str, prefix: str) -> str:
+    pattern = _NAMED_GROUP.sub(lambda m: f"(?P<{prefix}__{m.group(1)}>", pattern)
+    return _NAMED_BACKREF.sub(lambda m: f"(?P={prefix}__{m.group(1)})", pattern)
 
 
 class IdentityValidator:
     """
     Validates IDs against canonical + legacy patterns defined in the spec.
-    For now, legacy IDs are detected (flagged) but not auto-converted.
+
+    Legacy IDs are always detected. With a `canonical_format` (a str.format
+    template over the legacy patterns' named groups, e.g. "TCKT-{num}") they
+    are also normalized: canonical_id is the filled-in template, provided it
+    matches the canonical pattern; otherwise canonical_id stays None.
+
+    The canonical and legacy patterns are compiled into one alternation of
+    named groups, canonical first, so a single fullmatch both classifies an
+    ID and extracts any named groups the matching pattern defines. Patterns
+    that cannot be embedded (numbered backreferences, global inline flags)
+    fall back to trying each pattern in turn, with the same results.
     """
 
-    def __init__(self, canonical_regex: str, legacy_regexes: list[str] | None = None):
+    def __init__(
+        self,
+        canonical_regex: str,
+        legacy_regexes: list[str] | None = None,
+        canonical_format: Optional[str] = None,
+    ):
         self._canonical = re.compile(canonical_regex)
         self._legacy = [re.compile(r) for r in (legacy_regexes or [])]
+        self._format = canonical_format
+        if canonical_format is not None:
+            parsed = string.Formatter().parse(canonical_format)
+            fields = {f for _, f, _, _ in parsed if f is not None}
+            for legacy_re in self._legacy:
+                missing = fields - set(legacy_re.groupindex)
+                if missing:
+                    raise IdentityError(
+                        f"Legacy pattern '{legacy_re.pattern}' has no group(s) "
+                        f"{sorted(missing)} used by canonical_format '{canonical_format}'."
+                    )
 
-    def validate(self, entity_type: str, id_value: str) -> IdentityResult:
-        if self._canonical.fullmatch(id_value):
+        sources = [("canonical", canonical_regex)]
+        sources += [(f"legacy_{i}", r) for i, r in enumerate(legacy_regexes or [])]
+        self._combined: Optional[re.Pattern[str]] = None
+        # Pattern name -> (combined group name, spec group name) of its named groups.
+        self._inner: Dict[str, tuple[tuple[str, str], ...]] = {}
+        if not any(_UNCOMBINABLE.search(src) for _, src in sources):
+            self._combined = re.compile(
+                "|".join(f"(?P<{name}>{_namespaced(src, name)})" for name, src in sources)
+            )
+            for name, src in sources:
+                self._inner[name] = tuple(
+                    (f"{name}__{g}", g) for g in dict.fromkeys(_NAMED_GROUP.findall(src))
+                )
+
+    def classify(self, entity_type: str, id_value: str) -> Optional[IdentityResult]:
+        """Like validate(), but returns None for invalid IDs instead of raising."""
+        if self._combined is None:
+            return self._classify_sequential(entity_type, id_value)
+
+        m = self._combined.fullmatch(id_value)
+        if m is None:
+            return None
+        # The outer group closes last, so lastgroup names the matched pattern.
+        pattern = m.lastgroup
+        groups = {}
+        for combined_name, name in self._inner[pattern]:
+            value = m.group(combined_name)
+            if value is not None:
+                groups[name] = value
+        if pattern == "canonical":
+            return IdentityResult(entity_type, id_value, id_value, False, pattern, groups)
+        canonical = self._normalized(groups)
+        return IdentityResult(entity_type, id_value, canonical, True, pattern, groups)
+
+    def _normalized(self, groups: Dict[str, str]) -> Optional[str]:
+        if self._format is None:
+            return None
+        try:
+            canonical = self._format.format_map(groups)
+        except KeyError:  # an optional group did not participate in the match
+            return None
+        return canonical if self._canonical.fullmatch(canonical) else None
+
+    def _classify_sequential(self, entity_type: str, id_value: str) -> Optional[IdentityResult]:
+        m = self._canonical.fullmatch(id_value)
+        if m:
             return IdentityResult(
                 entity_type=entity_type,
                 raw_id=id_value,
                 canonical_id=id_value,
                 is_legacy=False,
+                groups={k: v for k, v in m.groupdict().items() if v is not None},
             )
 
-        for legacy_re in self._legacy:
-            if legacy_re.fullmatch(id_value):
-                # Detected legacy format; in v2 we'll add optional normalization/conversion
+        for i, legacy_re in enumerate(self._legacy):
+            m = legacy_re.fullmatch(id_value)
+            if m:
+                groups = {k: v for k, v in m.groupdict().items() if v is not None}
                 return IdentityResult(
                     entity_type=entity_type,
                     raw_id=id_value,
-                    canonical_id=None,
+                    canonical_id=self._normalized(groups),
                     is_legacy=True,
+                    pattern=f"legacy_{i}",
+                    groups=groups,
                 )
+        return None
+
+    def validate(self, entity_type: str, id_value: str) -> IdentityResult:
+        result = self.classify(entity_type, id_value)
+        if result is None:
+            raise IdentityError(
+                f"Invalid {entity_type} id '{id_value}'. "
+                "Does not match canonical or legacy patterns."
+            )
+        return result
+
+    def format_number(self, number: int) -> Optional[str]:
+        """
+        The canonical ID for `number`, from a canonical_format with exactly one
+        field (e.g. "TCKT-{num}" -> "TCKT-42"); None if there is no such format.
+        """
+        if self._format is None:
+            return None
+        fields = {f for _, f, _, _ in string.Formatter().parse(self._format) if f is not None}
+        if len(fields) != 1:
+            return None
+        canonical = self._format.format_map({fields.pop(): str(number)})
+        return canonical if self._canonical.fullmatch(canonical) else None
+
+    def normalize(self, entity_type: str, id_value: str) -> str:
+        """The canonical form of a canonical or legacy ID; raises IdentityError otherwise."""
+        result = self.validate(entity_type, id_value)
+        if result.canonical_id is None:
+            raise IdentityError(
+                f"Legacy {entity_type} id '{id_value}' has no canonical form "
+                "(no canonical_format in the spec?)."
+            )
+        return result.canonical_id
 
-        raise IdentityError(
-            f"Invalid {entity_type} id '{id_value}'. Does not match canonical or legacy patterns."
-        )
+    def validate_many(
+        self, entity_type: str, ids: Iterable[str]
+    ) -> Iterator[tuple[str, Optional[IdentityResult]]]:
+        """Stream (id, result or None) pairs; blank lines are skipped, whitespace trimmed."""
+        classify = self.classify
+        for raw in ids:
+            id_value = raw.strip()
+            if id_value:
+                yield id_value, classify(entity_type, id_value)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+
+@contextmanager
+def file_lock(lock_path: Path, *, shared: bool = False) -> Iterator[None]:
+    """
+    Cross-process advisory lock on `lock_path` (created if missing).
+    Callers should hold it only around the read-modify-write itself.
+    On platforms without fcntl this degrades to a no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str, *, durable: bool = True) -> None:
+    """
+    Write `text` to a temp file in the same directory, fsync it and rename it
+    over `path`, so readers see either the old or the new content, never a
+    truncated file. durable=False skips the fsync, for files that can be
+    rebuilt if a crash leaves them empty.
+    """
+    atomic_write_bytes(path, text.encode("utf-8"), durable=durable)
+
+
+def atomic_write_bytes(path: Path, data: bytes, *, durable: bool = True) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if durable:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
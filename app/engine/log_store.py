@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.engine.locking import file_lock
+from app.engine.store import (
+    EntityRecord,
+    EntityStore,
+    StoreError,
+    check_versions,
+    entity_key,
+    summarize,
+)
+from app.engine.store_index import EntitySummary, FieldIndex
+
+_SEGMENT_RE = re.compile(r"^segment-(\d{6})\.log$")
+
+
+@dataclass(frozen=True)
+class _Location:
+    segment: int
+    offset: int
+    length: int
+
+
+class LogEntityStore(EntityStore):
+    """
+    Append-only, log-structured entity store.
+
+    Records are appended as one JSON line each to numbered segment files under a
+    directory. An in-memory key -> (segment, offset, length) index makes reads a
+    single seek and writes O(record); a FieldIndex built alongside it serves
+    query(). Deletes append a tombstone line for the key. Superseded records
+    and tombstones are reclaimed by compaction, which rewrites closed segments
+    in a background thread and leaves a .hint file next to the result so the
+    next open does not rescan it.
+
+    Appends and compaction swaps from any number of processes serialize on an
+    flock of the directory's LOCK file; other processes pick up appended records
+    on their next read. A whole compaction also holds COMPACT.LOCK, so only one
+    process rewrites closed segments at a time while appends carry on.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        segment_bytes: int = 4 * 1024 * 1024,
+        compact_after_segments: int = 4,
+    ):
+        self._dir = directory
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segment_bytes = segment_bytes
+        self._compact_after = compact_after_segments
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, _Location] = {}
+        self._fields = FieldIndex()
+        self._scanned: Dict[int, int] = {}  # segment -> bytes already indexed
+        self._compactor: Optional[threading.Thread] = None
+        self._load()
+
+    # --- paths ---
+
+    def _segment_path(self, segment: int) -> Path:
+        return self._dir / f"segment-{segment:06d}.log"
+
+    def _hint_path(self, segment: int) -> Path:
+        return self._dir / f"segment-{segment:06d}.hint"
+
+    def _list_segments(self) -> list[int]:
+        out = []
+        for p in self._dir.iterdir():
+            m = _SEGMENT_RE.match(p.name)
+            if m:
+                out.append(int(m.group(1)))
+        return sorted(out)
+
+    def _active_segment(self) -> int:
+        segments = self._list_segments()
+        return segments[-1] if segments else 1
+
+    # --- index maintenance ---
+
+    def _load(self) -> None:
+        with self._lock:
+            self._index.clear()
+            self._scanned.clear()
+            # Collected first and indexed in one go: inserting one by one is quadratic.
+            summaries: Dict[str, EntitySummary] = {}
+            for segment in self._list_segments():
+                if not self._load_hint(segment, summaries):
+                    self._scan(segment, 0, summaries)
+            self._fields = FieldIndex.build(summaries.values())
+
+    def _load_hint(self, segment: int, summaries: Dict[str, EntitySummary]) -> bool:
+        hint = self._hint_path(segment)
+        if not hint.exists():
+            return False
+        try:
+            payload = json.loads(hint.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return False
+        size = self._segment_path(segment).stat().st_size
+        if payload.get("size") != size:
+            return False
+        for key, (offset, length, *summary) in payload["entries"].items():
+            self._index[key] = _Location(segment, offset, length)
+            summaries[key] = EntitySummary(*summary)
+        self._scanned[segment] = size
+        return True
+
+    def _scan(
+        self, segment: int, start: int, summaries: Optional[Dict[str, EntitySummary]] = None
+    ) -> None:
+        """Index lines from `start` on: into `summaries` while loading, else into the live index."""
+        path = self._segment_path(segment)
+        offset = start
+        with path.open("rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn tail from an interrupted append; ignore until completed.
+                    break
+                entry = json.loads(line)
+                key = entry["key"]
+                if entry.get("deleted"):
+                    self._index.pop(key, None)
+                    if summaries is None:
+                        self._fields.remove(key)
+                    else:
+                        summaries.pop(key, None)
+                else:
+                    self._index[key] = _Location(segment, offset, len(line))
+                    summary = summarize(EntityRecord(**entry["record"]))
+                    if summaries is None:
+                        self._fields.put(summary)
+                    else:
+                        summaries[key] = summary
+                offset += len(line)
+        self._scanned[segment] = offset
+
+    def _refresh(self) -> None:
+        """Catch up with segments appended to by other processes."""
+        segments = self._list_segments()
+        if any(s not in segments for s in self._scanned):
+            # Segments were compacted away underneath us; rebuild from scratch.
+            self._load()
+            return
+        for segment in segments:
+            size = self._segment_path(segment).stat().st_size
+            if size != self._scanned.get(segment, 0):
+                self._scan(segment, self._scanned.get(segment, 0))
+
+    # --- EntityStore API ---
+
+    def get(self, entity_type: str, entity_id: str) -> Optional[EntityRecord]:
+        key = entity_key(entity_type, entity_id)
+        with self._lock:
+            self._refresh()
+            loc = self._index.get(key)
+            if loc is None:
+                return None
+            return self._read_at(loc)
+
+    def _read_at(self, loc: _Location) -> EntityRecord:
+        with self._segment_path(loc.segment).open("rb") as f:
+            f.seek(loc.offset)
+            line = f.read(loc.length)
+        return EntityRecord(**json.loads(line)["record"])
+
+    def upsert_many(self, records: Iterable[EntityRecord], *, cas: bool = False) -> None:
+        records = list(records)
+        with self._lock, file_lock(self._dir / "LOCK"):
+            self._refresh()
+            stored = {}
+            for r in records:
+                key = entity_key(r.entity_type, r.entity_id)
+                loc = self._index.get(key)
+                if loc is not None:
+                    stored[key] = self._read_at(loc).version
+            if cas:
+                check_versions(records, stored)
+
+            segment = self._active_segment()
+            path = self._segment_path(segment)
+            offset = path.stat().st_size if path.exists() else 0
+
+            chunk = bytearray()
+            pending: list[tuple[str, int, int]] = []
+            summaries: list[EntitySummary] = []
+            versions = []
+            for record in records:
+                key = entity_key(record.entity_type, record.entity_id)
+                row = asdict(record)
+                row["version"] = stored[key] = max(stored.get(key, 0), record.version) + 1
+                versions.append(row["version"])
+                line = (json.dumps({"key": key, "record": row}) + "\n").encode("utf-8")
+                pending.append((key, offset + len(chunk), len(line)))
+                summaries.append(summarize(record))
+                chunk += line
+
+            self._append(segment, offset, chunk)
+
+            for key, off, length in pending:
+                self._index[key] = _Location(segment, off, length)
+            for summary in summaries:
+                self._fields.put(summary)
+            for record, version in zip(records, versions):
+                record.version = version
+            self._roll(segment)
+
+    def delete_many(
+        self,
+        keys: Iterable[tuple[str, str]],
+        *,
+        versions: Optional[Dict[tuple[str, str], int]] = None,
+    ) -> int:
+        versions = versions or {}
+        with self._lock, file_lock(self._dir / "LOCK"):
+            self._refresh()
+            removed = []
+            for t, i in dict.fromkeys(keys):
+                key = entity_key(t, i)
+                loc = self._index.get(key)
+                if loc is None:
+                    continue
+                expected = versions.get((t, i))
+                if expected is not None and self._read_at(loc).version != expected:
+                    continue
+                removed.append(key)
+            if not removed:
+                return 0
+
+            segment = self._active_segment()
+            path = self._segment_path(segment)
+            offset = path.stat().st_size if path.exists() else 0
+            chunk = "".join(json.dumps({"key": key, "deleted": True}) + "\n" for key in removed)
+            self._append(segment, offset, chunk.encode("utf-8"))
+
+            for key in removed:
+                del self._index[key]
+                self._fields.remove(key)
+            self._roll(segment)
+            return len(removed)
+
+    def _append(self, segment: int, offset: int, chunk: bytes) -> None:
+        with self._segment_path(segment).open("ab") as f:
+            f.write(chunk)
+        self._scanned[segment] = offset + len(chunk)
+
+    def _roll(self, segment: int) -> None:
+        """Start a new segment once the active one is full, compacting if enough have closed."""
+        if self._scanned[segment] >= self._segment_bytes:
+            self._segment_path(segment + 1).touch()
+            self._scanned[segment + 1] = 0
+            if len(self._list_segments()) - 1 >= self._compact_after:
+                self.compact(background=True)
+
+    def query(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        state: Optional[str] = None,
+        risk_tier: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        with self._lock:
+            self._refresh()
+            matches = list(islice(
+                self._fields.select(
+                    entity_type=entity_type, state=state, risk_tier=risk_tier, after=after
+                ),
+                limit,
+            ))
+        yield from matches
+
+    def id_range(
+        self,
+        entity_type: str,
+        prefix: str,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        with self._lock:
+            self._refresh()
+            ids = self._fields.id_range(entity_type, prefix, start=start, end=end)
+            matches = list(islice(ids, limit))
+        yield from matches
+
+    def last_number(self, entity_type: str, prefix: str) -> Optional[int]:
+        with self._lock:
+            self._refresh()
+            return self._fields.last_number(entity_type, prefix)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    # --- compaction ---
+
+    def compact(self, *, background: bool = False) -> None:
+        """
+        Rewrite every closed segment into one, keeping only live records.
+        The active (last) segment is never touched, so appends can continue.
+        """
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            if not background:
+                self._compact()
+                return
+            self._compactor = threading.Thread(target=self._compact, name="log-store-compactor")
+            self._compactor.start()
+
+    def wait_for_compaction(self) -> None:
+        thread = self._compactor
+        if thread is not None:
+            thread.join()
+
+    def _compact(self) -> None:
+        # Taken before the snapshot, so a compactor never works from segments
+        # another process is rewriting or has already merged away.
+        with file_lock(self._dir / "COMPACT.LOCK"):
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        with self._lock:
+            self._refresh()
+            closed = self._list_segments()[:-1]
+            if len(closed) < 2:
+                return
+            closed_set = set(closed)
+            live = {k: loc for k, loc in self._index.items() if loc.segment in closed_set}
+
+        # Copy live records outside the append lock; closed segments are immutable.
+        target = closed[-1]
+        tmp = self._dir / f"segment-{target:06d}.compacting"
+        entries: Dict[str, list[Any]] = {}
+        offset = 0
+        handles: Dict[int, Any] = {}
+        try:
+            with tmp.open("wb") as out:
+                for key, loc in sorted(live.items(), key=lambda kv: (kv[1].segment, kv[1].offset)):
+                    src = handles.get(loc.segment)
+                    if src is None:
+                        src = handles[loc.segment] = self._segment_path(loc.segment).open("rb")
+                    src.seek(loc.offset)
+                    line = src.read(loc.length)
+                    out.write(line)
+                    s = summarize(EntityRecord(**json.loads(line)["record"]))
+                    entries[key] = [
+                        offset, loc.length, s.entity_type, s.entity_id, s.state, s.risk_tier
+                    ]
+                    offset += loc.length
+                out.flush()
+                os.fsync(out.fileno())
+        finally:
+            for h in handles.values():
+                h.close()
+
+        hint_tmp = self._dir / f"segment-{target:06d}.hint.tmp"
+        hint_tmp.write_text(json.dumps({"size": offset, "entries": entries}), encoding="utf-8")
+
+        with self._lock, file_lock(self._dir / "LOCK"):
+            os.replace(tmp, self._segment_path(target))
+            os.replace(hint_tmp, self._hint_path(target))
+            for segment in closed[:-1]:
+                self._segment_path(segment).unlink(missing_ok=True)
+                self._hint_path(segment).unlink(missing_ok=True)
+                self._scanned.pop(segment, None)
+            for key, (off, length, *_) in entries.items():
+                if self._index.get(key) == live[key]:
+                    self._index[key] = _Location(target, off, length)
+            self._scanned[target] = offset
+
+    def close(self) -> None:
+        self.wait_for_compaction()
+
+
+def migrate_json_store(json_path: Path, target: LogEntityStore) -> int:
+    """
+    One-shot copy of a FileEntityStore entities.json into a log-structured store.
+    Returns the number of records migrated.
+    """
+    if not json_path.exists():
+        raise StoreError(f"Store file not found: {json_path}")
+    payload: Dict[str, Dict[str, Any]] = json.loads(json_path.read_text(encoding="utf-8"))
+    records = [EntityRecord(**rec) for rec in payload.values()]
+    target.upsert_many(records)
+    return len(records)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.engine.compiled_spec import CompiledEntity
+from app.engine.gates import GateDecision, GateEngine
+from app.engine.store import EntityRecord
+
+
+@dataclass(frozen=True)
+class HopPrediction:
+    from_state: str
+    to_state: str
+    decision: GateDecision  # predicted from the entity's current data
+    # Checklist items still unsatisfied, if the gate checks completeness.
+    missing_items: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class PathPlan:
+    entity_type: str
+    from_state: str
+    to_state: str
+    hops: Optional[tuple[HopPrediction, ...]]  # None = target unreachable
+
+    @property
+    def reachable(self) -> bool:
+        return self.hops is not None
+
+    @property
+    def blocked_hops(self) -> tuple[HopPrediction, ...]:
+        return tuple(h for h in self.hops or () if not h.decision.allowed)
+
+
+def plan_path(
+    entity: CompiledEntity,
+    record: EntityRecord,
+    to_state: str,
+    *,
+    human_approved: bool = False,
+    engine: Optional[GateEngine] = None,
+) -> PathPlan:
+    """
+    Shortest transition path from the record's state to `to_state`, with each
+    hop's gate evaluated against the record as it is now. Data does not change
+    along a path, so a hop predicted blocked stays blocked until someone
+    updates the entity.
+    """
+    engine = engine or GateEngine()
+    states = entity.graph.shortest_path(record.state, to_state)
+    if states is None:
+        return PathPlan(entity.name, record.state, to_state, None)
+
+    completeness = entity.checklist.result(entity.completeness_mask(record))
+    hops = []
+    for from_state, next_state in zip(states, states[1:]):
+        decision = engine.evaluate_plan(
+            entity.resolve(from_state, next_state).plan,
+            entity_data=record.data,
+            risk_tier=record.risk_tier,
+            human_approved=human_approved,
+            completeness=completeness,
+        )
+        missing = decision.completeness.missing_items if decision.completeness else ()
+        hops.append(HopPrediction(from_state, next_state, decision, missing))
+    return PathPlan(entity.name, record.state, to_state, tuple(hops))
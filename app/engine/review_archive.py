@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import hashlib
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
+from app.engine.group_commit import GroupCommitWriter
+
+
 @dataclass(frozen=True)
 class ReviewLogEntry:
     timestamp: str
@@ -17,19 +20,38 @@ class ReviewLogEntry:
 
 
 class ReviewArchive:
-    def __init__(self, path: Path):
+    """
+    JSONL archive of AI review responses.
+    Writes each entry immediately unless buffered, in which case entries are
+    committed in groups like a buffered AuditLogger; close() (or leaving a
+    `with` block) writes the last group.
+    """
+
+    def __init__(self, path: Path, *, buffered: bool = False, fsync: str = "none"):
         self._path = path
+        self._buffered = buffered
+        self._writer = GroupCommitWriter(path, fsync=fsync)
 
     @staticmethod
     def now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
-    
+
     @staticmethod
     def sha256_text(text: str) -> str:
         return hashlib.sha256(text.encode("utf-8")).hexdigest()
-    
+
     def append(self, entry: ReviewLogEntry) -> None:
-        with self._path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(asdict(entry)))
-            f.write("\n")
+        line = json.dumps(asdict(entry))
+        if self._buffered:
+            self._writer.write([line])
+        else:
+            self._writer.append_once([line])
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self) -> "ReviewArchive":
+        return self
 
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Mapping, Optional
+
+from app.engine.completeness import CompletenessResult
+from app.engine.expressions import EVALUATION_ERRORS, compile_expression
+from app.models import GateRule
+
+
+class RuleError(ValueError):
+    pass
+
+
+class RuleContext:
+    """
+    What a rule check can look at for one entity.
+    completeness() is computed on first use and shared by every rule of the gate.
+    """
+
+    __slots__ = ("entity_data", "risk_tier", "_compute", "_completeness")
+
+    def __init__(
+        self,
+        entity_data: Mapping[str, object],
+        risk_tier: str,
+        compute_completeness: Callable[[], CompletenessResult],
+    ):
+        self.entity_data = entity_data
+        self.risk_tier = risk_tier
+        self._compute = compute_completeness
+        self._completeness: Optional[CompletenessResult] = None
+
+    def completeness(self) -> CompletenessResult:
+        if self._completeness is None:
+            self._completeness = self._compute()
+        return self._completeness
+
+    @property
+    def computed_completeness(self) -> Optional[CompletenessResult]:
+        """The completeness result if some rule asked for it, else None."""
+        return self._completeness
+
+
+# A lowered rule: given the entity context, return (reason or None, stop).
+# `stop` ends evaluation immediately (always_block semantics).
+RuleCheck = Callable[[RuleContext], tuple[Optional[str], bool]]
+
+
+def _no_fields(rule: GateRule) -> tuple[str, ...]:
+    return ()
+
+
+@dataclass(frozen=True)
+class RuleType:
+    name: str
+    lower: Callable[[GateRule], RuleCheck]
+    cost: float = 1.0  # relative estimate; fail-fast evaluation runs cheaper rules first
+    # Entity data fields the rule reads besides the checklist, for the decision
+    # cache digest. None = may read anything, including external state, so
+    # gates using the rule are never cached.
+    fields: Optional[Callable[[GateRule], Iterable[str]]] = None
+
+
+@dataclass(frozen=True)
+class LoweredRule:
+    rule_type: str
+    check: RuleCheck
+    cost: float
+    fields: Optional[tuple[str, ...]]  # None = not cacheable
+
+
+class RuleRegistry:
+    """
+    Maps rule type names (GateRule.type) to their lowering and cost.
+
+    Register a custom rule with a lowering function, or use register() as a
+    decorator:
+
+        @default_rule_registry().register("linked_pr_merged", cost=50)
+        def lower_linked_pr(rule):
+            def check(ctx):
+                return (None, False) if merged(ctx.entity_data) else ("PR not merged.", False)
+
+            return check
+    """
+
+    def __init__(self):
+        self._types: Dict[str, RuleType] = {}
+
+    def register(
+        self,
+        name: str,
+        lower: Optional[Callable[[GateRule], RuleCheck]] = None,
+        *,
+        cost: float = 1.0,
+        fields: Optional[Callable[[GateRule], Iterable[str]]] = None,
+        replace: bool = False,
+    ):
+        if lower is None:
+            def decorator(fn: Callable[[GateRule], RuleCheck]) -> Callable[[GateRule], RuleCheck]:
+                self.register(name, fn, cost=cost, fields=fields, replace=replace)
+                return fn
+
+            return decorator
+
+        if name in self._types and not replace:
+            raise RuleError(f"Rule type already registered: {name}")
+        self._types[name] = RuleType(name=name, lower=lower, cost=float(cost), fields=fields)
+        return lower
+
+    def get(self, name: str) -> Optional[RuleType]:
+        return self._types.get(name)
+
+    def names(self) -> list[str]:
+        return sorted(self._types)
+
+    def lower(self, rule: GateRule) -> LoweredRule:
+        name = (getattr(rule, "type", "") or "").strip()
+        rule_type = self._types.get(name)
+        if rule_type is None:
+            reason = f"Unsupported rule type: {name}"
+            return LoweredRule(
+                rule_type=name, check=lambda _ctx: (reason, False), cost=0.0, fields=()
+            )
+        fields = tuple(rule_type.fields(rule)) if rule_type.fields is not None else None
+        return LoweredRule(
+            rule_type=name, check=rule_type.lower(rule), cost=rule_type.cost, fields=fields
+        )
+
+
+# --- built-in rules ---
+
+
+def _lower_completeness_min(rule: GateRule) -> RuleCheck:
+    if rule.percent is None:
+        reason = "Rule completeness_min missing required 'percent'."
+        return lambda _ctx: (reason, False)
+
+    required = int(rule.percent)
+
+    def check(ctx: RuleContext) -> tuple[Optional[str], bool]:
+        percent = ctx.completeness().percent
+        if percent < required:
+            return f"Completeness {percent}% is below required {required}%.", False
+        return None, False
+
+    return check
+
+
+def _lower_always_block(rule: GateRule) -> RuleCheck:
+    return lambda _ctx: ("Rule always_block triggered.", True)
+
+
+# Names an `expr` rule resolves from the gate context instead of entity data.
+EXPR_CONTEXT_NAMES = ("risk_tier", "completeness")
+
+
+class _ExprEnv:
+    """Name lookup for expr rules: entity data plus risk_tier and completeness (percent)."""
+
+    __slots__ = ("_ctx",)
+
+    def __init__(self, ctx: RuleContext):
+        self._ctx = ctx
+
+    def get(self, name: str, default: object = None) -> object:
+        if name == "risk_tier":
+            return self._ctx.risk_tier
+        if name == "completeness":
+            return self._ctx.completeness().percent
+        return self._ctx.entity_data.get(name, default)
+
+
+def _lower_expr(rule: GateRule) -> RuleCheck:
+    if not rule.expr:
+        reason = "Rule expr missing required 'expr'."
+        return lambda _ctx: (reason, False)
+
+    expression = compile_expression(rule.expr)
+    reason = f"Rule expr not satisfied: {rule.expr}"
+
+    def check(ctx: RuleContext) -> tuple[Optional[str], bool]:
+        try:
+            ok = expression(_ExprEnv(ctx))
+        except EVALUATION_ERRORS as e:
+            return f"Rule expr could not be evaluated ({type(e).__name__}): {rule.expr}", False
+        return (None, False) if ok else (reason, False)
+
+    return check
+
+
+def _expr_fields(rule: GateRule) -> tuple[str, ...]:
+    if not rule.expr:
+        return ()
+    names = compile_expression(rule.expr).names
+    return tuple(sorted(n for n in names if n not in EXPR_CONTEXT_NAMES))
+
+
+_DEFAULT: Optional[RuleRegistry] = None
+
+
+def default_rule_registry() -> RuleRegistry:
+    """The process-wide registry, with the built-in rule types registered."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        registry = RuleRegistry()
+        registry.register("always_block", _lower_always_block, cost=0, fields=_no_fields)
+        registry.register("completeness_min", _lower_completeness_min, cost=1, fields=_no_fields)
+        registry.register("expr", _lower_expr, cost=1, fields=_expr_fields)
+        _DEFAULT = registry
+    return _DEFAULT
+
+
+def load_rule_plugins(modules: Iterable[str]) -> None:
+    """Import plugin modules; each registers its rule types on import."""
+    for name in modules:
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            raise RuleError(f"Cannot load rule plugin '{name}': {e}") from e
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import heapq
+import json
+import zlib
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.engine.changefeed import ChangeFeed
+from app.engine.store import EntityRecord, EntityStore, FileEntityStore, StoreError
+from app.engine.store_index import EntitySummary, numeric_id
+
+
+def shard_of(entity_id: str, shards: int) -> int:
+    # crc32 is stable across processes and Python versions, unlike hash().
+    return zlib.crc32(entity_id.encode("utf-8")) % shards
+
+
+class ShardedFileEntityStore(EntityStore):
+    """
+    Hash-partitioned variant of FileEntityStore.
+
+    Entities live in <dir>/<entity_type>/shard-NNN.json, picked by crc32 of the
+    entity id. Each shard is an ordinary FileEntityStore with its own lock and
+    index, so an upsert rewrites one small file and writers touching different
+    shards proceed in parallel. Compare-and-swap is atomic per shard only. A
+    shared ChangeFeed, if given, still assigns one global sequence.
+
+    The shard count is fixed when the directory is created (layout.json);
+    changing it requires resharding.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        shards: int = 16,
+        cache_size: int = 0,
+        feed: Optional[ChangeFeed] = None,
+    ):
+        self._dir = directory
+        self._feed = feed
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._shards = self._load_layout(shards)
+        self._cache_size = cache_size
+        self._open: Dict[tuple[str, int], FileEntityStore] = {}
+
+    def _load_layout(self, shards: int) -> int:
+        layout = self._dir / "layout.json"
+        if layout.exists():
+            existing = int(json.loads(layout.read_text(encoding="utf-8"))["shards"])
+            if existing != shards:
+                raise StoreError(
+                    f"Store at {self._dir} has {existing} shards, not {shards}; reshard first."
+                )
+            return existing
+        if shards <= 0:
+            raise StoreError("Shard count must be positive.")
+        layout.write_text(json.dumps({"shards": shards}), encoding="utf-8")
+        return shards
+
+    @property
+    def shards(self) -> int:
+        return self._shards
+
+    def _shard_path(self, entity_type: str, n: int) -> Path:
+        return self._dir / entity_type / f"shard-{n:03d}.json"
+
+    def _shard_at(self, entity_type: str, n: int, *, create: bool = False) -> FileEntityStore:
+        """Open shard `n`; only writers (`create`) may add the entity type's directory."""
+        store = self._open.get((entity_type, n))
+        if store is None:
+            path = self._shard_path(entity_type, n)
+            if create:
+                path.parent.mkdir(exist_ok=True)
+            store = FileEntityStore(path, cache_size=self._cache_size, feed=self._feed)
+            self._open[(entity_type, n)] = store
+        return store
+
+    def _existing_shard(self, entity_type: str, n: int) -> Optional[FileEntityStore]:
+        if not self._shard_path(entity_type, n).exists():
+            return None
+        return self._shard_at(entity_type, n)
+
+    def _entity_types(self) -> list[str]:
+        return sorted(p.name for p in self._dir.iterdir() if p.is_dir())
+
+    def get(self, entity_type: str, entity_id: str) -> Optional[EntityRecord]:
+        shard = self._existing_shard(entity_type, shard_of(entity_id, self._shards))
+        return shard.get(entity_type, entity_id) if shard is not None else None
+
+    def _group(
+        self, records: Iterable[EntityRecord]
+    ) -> Dict[tuple[str, int], list[EntityRecord]]:
+        groups: Dict[tuple[str, int], list[EntityRecord]] = {}
+        for record in records:
+            n = shard_of(record.entity_id, self._shards)
+            groups.setdefault((record.entity_type, n), []).append(record)
+        return groups
+
+    def upsert_many(self, records: Iterable[EntityRecord], *, cas: bool = False) -> None:
+        for (entity_type, n), group in sorted(self._group(records).items()):
+            self._shard_at(entity_type, n, create=True).upsert_many(group, cas=cas)
+
+    def restore_many(self, records: Iterable[EntityRecord]) -> None:
+        """Write records with their versions as given (copying a store); no CAS."""
+        for (entity_type, n), group in sorted(self._group(records).items()):
+            self._shard_at(entity_type, n, create=True).restore_many(group)
+
+    def delete_many(
+        self,
+        keys: Iterable[tuple[str, str]],
+        *,
+        versions: Optional[Dict[tuple[str, str], int]] = None,
+    ) -> int:
+        groups: Dict[tuple[str, int], list[tuple[str, str]]] = {}
+        for entity_type, entity_id in keys:
+            n = shard_of(entity_id, self._shards)
+            groups.setdefault((entity_type, n), []).append((entity_type, entity_id))
+        deleted = 0
+        for (entity_type, n), group in sorted(groups.items()):
+            shard = self._existing_shard(entity_type, n)
+            if shard is not None:
+                deleted += shard.delete_many(group, versions=versions)
+        return deleted
+
+    def get_many(self, keys: Iterable[tuple[str, str]]) -> Dict[tuple[str, str], EntityRecord]:
+        groups: Dict[tuple[str, int], list[tuple[str, str]]] = {}
+        for entity_type, entity_id in keys:
+            n = shard_of(entity_id, self._shards)
+            groups.setdefault((entity_type, n), []).append((entity_type, entity_id))
+        out: Dict[tuple[str, str], EntityRecord] = {}
+        for (entity_type, n), group in groups.items():
+            shard = self._existing_shard(entity_type, n)
+            if shard is not None:
+                out.update(shard.get_many(group))
+        return out
+
+    def query(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        state: Optional[str] = None,
+        risk_tier: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        types = [entity_type] if entity_type is not None else self._entity_types()
+        streams = [
+            shard.query(entity_type=t, state=state, risk_tier=risk_tier, after=after, limit=limit)
+            for t in types
+            for shard in self._type_shards(t)
+        ]
+        # Every shard yields in (entity_type, entity_id) order, so a k-way merge
+        # keeps the global order the other backends page by.
+        merged = heapq.merge(*streams, key=lambda s: (s.entity_type, s.entity_id))
+        yield from islice(merged, limit)
+
+    def _type_shards(self, entity_type: str) -> list[FileEntityStore]:
+        shards = (self._existing_shard(entity_type, n) for n in range(self._shards))
+        return [shard for shard in shards if shard is not None]
+
+    def id_range(
+        self,
+        entity_type: str,
+        prefix: str,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        streams = [
+            shard.id_range(entity_type, prefix, start=start, end=end, limit=limit)
+            for shard in self._type_shards(entity_type)
+        ]
+        merged = heapq.merge(*streams, key=lambda s: (numeric_id(s.entity_id)[1], s.entity_id))
+        yield from islice(merged, limit)
+
+    def last_number(self, entity_type: str, prefix: str) -> Optional[int]:
+        shards = self._type_shards(entity_type)
+        numbers = [shard.last_number(entity_type, prefix) for shard in shards]
+        return max((n for n in numbers if n is not None), default=None)
+
+    def close(self) -> None:
+        for store in self._open.values():
+            store.close()
+
+
+def reshard_json_store(json_path: Path, target: ShardedFileEntityStore) -> int:
+    """
+    Copy a single-file entities.json into a sharded layout, keeping record
+    versions. Each shard file is written exactly once. Returns the record count.
+    """
+    if not json_path.exists():
+        raise StoreError(f"Store file not found: {json_path}")
+    payload: Dict[str, Dict[str, Any]] = json.loads(json_path.read_text(encoding="utf-8"))
+
+    records = [EntityRecord(**row) for row in payload.values()]
+    target.restore_many(records)
+    return len(records)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from app.engine.store import EntityRecord, EntityStore, check_versions, entity_key
+from app.engine.store_index import EntitySummary, id_columns
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    entity_type TEXT NOT NULL,
+    entity_id   TEXT NOT NULL,
+    risk_tier   TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    version     INTEGER NOT NULL DEFAULT 0,
+    completeness TEXT,
+    id_prefix   TEXT,
+    id_num      INTEGER,
+    PRIMARY KEY (entity_type, entity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entities_type_state ON entities (entity_type, state);
+CREATE INDEX IF NOT EXISTS idx_entities_risk_tier ON entities (risk_tier);
+"""
+
+# Created after the column migration so older databases get it too.
+_ID_NUM_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_entities_id_num ON entities (entity_type, id_prefix, id_num)"
+)
+
+
+class SqliteEntityStore(EntityStore):
+    """
+    SQLite-backed store.
+    Runs in WAL mode so any number of CLI processes can read while one writes.
+    Point lookups go through the primary key; (entity_type, state) and risk_tier
+    have secondary indexes for listing queries, and ids ending in digits are
+    split into (id_prefix, id_num) columns indexed for numeric range scans.
+    Compare-and-swap upserts check versions inside a BEGIN IMMEDIATE transaction.
+    """
+
+    def __init__(self, path: Path, *, busy_timeout_ms: int = 5000):
+        self._path = path
+        self._conn = sqlite3.connect(str(path), timeout=busy_timeout_ms / 1000)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entities)")}
+        if "version" not in columns:
+            self._conn.execute("ALTER TABLE entities ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        if "completeness" not in columns:
+            self._conn.execute("ALTER TABLE entities ADD COLUMN completeness TEXT")
+        if "id_num" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE entities ADD COLUMN id_prefix TEXT")
+                self._conn.execute("ALTER TABLE entities ADD COLUMN id_num INTEGER")
+                keys = self._conn.execute("SELECT entity_type, entity_id FROM entities").fetchall()
+                self._conn.executemany(
+                    "UPDATE entities SET id_prefix = ?, id_num = ? "
+                    "WHERE entity_type = ? AND entity_id = ?",
+                    [(*id_columns(entity_id), type_, entity_id) for type_, entity_id in keys],
+                )
+        self._conn.execute(_ID_NUM_INDEX)
+
+    def get(self, entity_type: str, entity_id: str) -> Optional[EntityRecord]:
+        row = self._conn.execute(
+            "SELECT entity_type, entity_id, risk_tier, state, data, version, completeness "
+            "FROM entities WHERE entity_type = ? AND entity_id = ?",
+            (entity_type, entity_id),
+        ).fetchone()
+        if row is None:
+            return None
+        return self._to_record(row)
+
+    def upsert_many(self, records: Iterable[EntityRecord], *, cas: bool = False) -> None:
+        records = list(records)
+        # BEGIN IMMEDIATE takes the write lock up front so the version check and
+        # the write see the same snapshot.
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored = {}
+            for r in records:
+                row = self._conn.execute(
+                    "SELECT version FROM entities WHERE entity_type = ? AND entity_id = ?",
+                    (r.entity_type, r.entity_id),
+                ).fetchone()
+                if row is not None:
+                    stored[entity_key(r.entity_type, r.entity_id)] = row[0]
+            if cas:
+                check_versions(records, stored)
+            versions = []
+            for r in records:
+                key = entity_key(r.entity_type, r.entity_id)
+                stored[key] = max(stored.get(key, 0), r.version) + 1
+                versions.append(stored[key])
+            self._conn.executemany(
+                "INSERT INTO entities "
+                "(entity_type, entity_id, risk_tier, state, data, version, completeness, "
+                "id_prefix, id_num) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (entity_type, entity_id) DO UPDATE SET "
+                "risk_tier = excluded.risk_tier, state = excluded.state, data = excluded.data, "
+                "version = excluded.version, completeness = excluded.completeness",
+                [
+                    (
+                        r.entity_type,
+                        r.entity_id,
+                        r.risk_tier,
+                        r.state,
+                        json.dumps(r.data, sort_keys=True),
+                        version,
+                        json.dumps(r.completeness) if r.completeness is not None else None,
+                        *id_columns(r.entity_id),
+                    )
+                    for r, version in zip(records, versions)
+                ],
+            )
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+        for r, version in zip(records, versions):
+            r.version = version
+
+    def delete_many(
+        self,
+        keys: Iterable[tuple[str, str]],
+        *,
+        versions: Optional[Dict[tuple[str, str], int]] = None,
+    ) -> int:
+        versions = versions or {}
+        keys = list(keys)
+        before = self._conn.total_changes
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM entities WHERE entity_type = ? AND entity_id = ?",
+                [key for key in keys if key not in versions],
+            )
+            self._conn.executemany(
+                "DELETE FROM entities WHERE entity_type = ? AND entity_id = ? AND version = ?",
+                [(*key, versions[key]) for key in keys if key in versions],
+            )
+        return self._conn.total_changes - before
+
+    def query(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        state: Optional[str] = None,
+        risk_tier: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        clauses: list[str] = []
+        params: list[object] = []
+        filters = (("entity_type", entity_type), ("state", state), ("risk_tier", risk_tier))
+        for column, value in filters:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if after is not None:
+            after_type, _, after_id = after.partition(":")
+            clauses.append("(entity_type, entity_id) > (?, ?)")
+            params.extend([after_type, after_id])
+
+        sql = "SELECT entity_type, entity_id, state, risk_tier FROM entities"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY entity_type, entity_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        for row in self._conn.execute(sql, params):
+            yield EntitySummary(*row)
+
+    def id_range(
+        self,
+        entity_type: str,
+        prefix: str,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        sql = (
+            "SELECT entity_type, entity_id, state, risk_tier FROM entities "
+            "WHERE entity_type = ? AND id_prefix = ?"
+        )
+        params: list[object] = [entity_type, prefix]
+        if start is not None:
+            sql += " AND id_num >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND id_num <= ?"
+            params.append(end)
+        sql += " ORDER BY id_num, entity_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        for row in self._conn.execute(sql, params):
+            yield EntitySummary(*row)
+
+    def last_number(self, entity_type: str, prefix: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT MAX(id_num) FROM entities WHERE entity_type = ? AND id_prefix = ?",
+            (entity_type, prefix),
+        ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @staticmethod
+    def _to_record(row: tuple) -> EntityRecord:
+        entity_type, entity_id, risk_tier, state, data, version, completeness = row
+        return EntityRecord(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            risk_tier=risk_tier,
+            state=state,
+            data=json.loads(data),
+            version=version,
+            completeness=json.loads(completeness) if completeness is not None else None,
+        )
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import copy
 import json
-from dataclasses import dataclass, asdict
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.engine.cache import CacheStats, LRUCache, cache_stats
+from app.engine.changefeed import ChangeFeed
+from app.engine.locking import atomic_write_text, file_lock
+from app.engine.store_index import EntitySummary, SidecarIndex
 
 
 class StoreError(ValueError):
     pass
 
 
+class ConcurrencyError(StoreError):
+    """Raised when a compare-and-swap upsert finds a newer stored version."""
+
+
 @dataclass
 class EntityRecord:
     entity_type: str
@@ -17,16 +28,194 @@ class EntityRecord:
     risk_tier: str
     state: str
     data: Dict[str, Any]
+    version: int = 0  # 0 = never stored; bumped by every successful upsert
+    # CompletenessMask.to_json() for the entity's checklist; None = not tracked yet
+    completeness: Optional[Dict[str, Any]] = None
+
+
+def entity_key(entity_type: str, entity_id: str) -> str:
+    return f"{entity_type}:{entity_id}"
+
+
+def summarize(record: EntityRecord) -> EntitySummary:
+    return EntitySummary(
+        entity_type=record.entity_type,
+        entity_id=record.entity_id,
+        state=record.state,
+        risk_tier=record.risk_tier,
+    )
+
+
+def check_versions(records: Iterable[EntityRecord], stored: Dict[str, int]) -> None:
+    """
+    Compare-and-swap check: every record must carry the version currently stored
+    under its key (0 when absent). Raises ConcurrencyError naming the conflicts.
+    """
+    conflicts = [
+        entity_key(r.entity_type, r.entity_id)
+        for r in records
+        if stored.get(entity_key(r.entity_type, r.entity_id), 0) != r.version
+    ]
+    if conflicts:
+        raise ConcurrencyError(f"Concurrent update detected for: {', '.join(conflicts)}")
+
+
+# (before, after) rows of one record as ChangeFeed.append takes them; None = absent.
+_Change = tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class EntityStore(ABC):
+    """
+    Contract shared by every entity store backend.
+    Backends implement get/upsert_many/delete_many/query/id_range/last_number;
+    require is derived from get.
+
+    Every successful write stores one more than the higher of the stored version
+    and `record.version`, so versions never go backwards, and updates the record
+    in place. With cas=True the write only happens if the stored version still
+    equals `record.version`; otherwise ConcurrencyError is raised and nothing is
+    written.
+    """
+
+    @abstractmethod
+    def get(self, entity_type: str, entity_id: str) -> Optional[EntityRecord]:
+        """The stored record, or None."""
+
+    def upsert(self, record: EntityRecord, *, cas: bool = False) -> None:
+        self.upsert_many([record], cas=cas)
+
+    @abstractmethod
+    def upsert_many(self, records: Iterable[EntityRecord], *, cas: bool = False) -> None:
+        """Write all records in one commit (see the class docstring for versions and cas)."""
+
+    @abstractmethod
+    def delete_many(
+        self,
+        keys: Iterable[tuple[str, str]],
+        *,
+        versions: Optional[Dict[tuple[str, str], int]] = None,
+    ) -> int:
+        """
+        Remove the given (entity_type, entity_id) keys; returns how many were
+        removed. A key listed in `versions` is only removed while its stored
+        version still equals the given one (compare-and-swap); otherwise it is
+        left in place.
+        """
+
+    def get_many(self, keys: Iterable[tuple[str, str]]) -> Dict[tuple[str, str], EntityRecord]:
+        out: Dict[tuple[str, str], EntityRecord] = {}
+        for entity_type, entity_id in keys:
+            rec = self.get(entity_type, entity_id)
+            if rec is not None:
+                out[(entity_type, entity_id)] = rec
+        return out
+
+    @abstractmethod
+    def query(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        state: Optional[str] = None,
+        risk_tier: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        """
+        Yield entity summaries matching every given filter, ordered by
+        (entity_type, entity_id). `after` is the key ("Type:Id") of the last
+        summary of the previous page.
+        """
+
+    @abstractmethod
+    def id_range(
+        self,
+        entity_type: str,
+        prefix: str,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        """
+        Yield summaries of `entity_type` whose id is `prefix` followed by a
+        number between start and end (inclusive), ordered by that number.
+        """
+
+    @abstractmethod
+    def last_number(self, entity_type: str, prefix: str) -> Optional[int]:
+        """Highest number among `prefix` + digits ids of `entity_type`, or None."""
+
+    def require(self, entity_type: str, entity_id: str) -> EntityRecord:
+        rec = self.get(entity_type, entity_id)
+        if rec is None:
+            raise StoreError(f"Entity not found: {entity_type} {entity_id}")
+        return rec
+
+    def close(self) -> None:
+        pass
 
 
-class FileEntityStore:
+class FileEntityStore(EntityStore):
     """
     Simple file-backed store.
     Writes entities into a single JSON file: entities.json
+
+    Writers serialize on an flock of entities.json.lock held only for the
+    read-modify-write, and replace the file by atomic rename so readers never
+    see a truncated store and need no lock. A SQLite sidecar
+    entities.json.index.db holds the listing index (see SidecarIndex). Writes
+    update only the changed rows and tag it with the store file's stat
+    fingerprint, so query() reads just the rows it pages through and never
+    decodes entities.json unless the index is stale.
+
+    With cache_size > 0, decoded records are kept in a bounded LRU cache keyed
+    by entity key. The cache is dropped whenever the file's inode/size/mtime
+    changes, so repeated get()/require() calls skip the JSON parse until some
+    writer (in any process) replaces the file.
+
+    With a ChangeFeed attached, every committed write also appends one
+    before/after event per record, inside the same lock so feed order matches
+    commit order. The batch's changes are saved to entities.json.feed-pending
+    before the file swap. The next writer finds that file if a crash came
+    between the swap and the feed append, and appends the events then. It
+    drops them if the swap never happened.
     """
 
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, *, cache_size: int = 0, feed: Optional[ChangeFeed] = None):
         self._path = path
+        self._feed = feed
+        self._index = SidecarIndex(path.with_name(path.name + ".index.db"))
+        self._lock_path = path.with_name(path.name + ".lock")
+        self._feed_pending_path = path.with_name(path.name + ".feed-pending")
+        self._cache: Optional[LRUCache[Dict[str, Any]]] = None
+        self._cache_fingerprint: Optional[list[int]] = None
+        if cache_size > 0:
+            self._cache = LRUCache(cache_size, cache_stats("store.records"))
+
+    @property
+    def cache_stats(self) -> Optional[CacheStats]:
+        return self._cache.stats if self._cache is not None else None
+
+    def _validate_cache(self) -> Optional[LRUCache[Dict[str, Any]]]:
+        if self._cache is None:
+            return None
+        fingerprint = self._fingerprint()
+        if fingerprint != self._cache_fingerprint:
+            self._cache.clear()
+            self._cache_fingerprint = fingerprint
+        return self._cache
+
+    def _refresh_cache(self, payload: Dict[str, Dict[str, Any]]) -> None:
+        """After our own write, re-seed cached keys from the payload we just wrote."""
+        if self._cache is None:
+            return
+        for key in self._cache.keys():
+            row = payload.get(key)
+            if row is not None:
+                self._cache.put(key, row)
+            else:
+                self._cache.discard(key)
+        self._cache_fingerprint = self._fingerprint()
 
     def _read_all(self) -> Dict[str, Dict[str, Any]]:
         if not self._path.exists():
@@ -34,24 +223,196 @@ class FileEntityStore:
         return json.loads(self._path.read_text(encoding="utf-8"))
 
     def _write_all(self, payload: Dict[str, Dict[str, Any]]) -> None:
-        self._path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        atomic_write_text(self._path, json.dumps(payload, indent=2, sort_keys=True))
+
+    def _fingerprint(self) -> Optional[list[int]]:
+        if not self._path.exists():
+            return None
+        st = self._path.stat()
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    @staticmethod
+    def _summaries(payload: Dict[str, Dict[str, Any]]) -> Iterator[EntitySummary]:
+        for rec in payload.values():
+            yield summarize(EntityRecord(**rec))
+
+    def _commit(
+        self,
+        payload: Dict[str, Dict[str, Any]],
+        changed: Iterable[EntityRecord],
+        removed: Iterable[str] = (),
+    ) -> None:
+        # Called under the writer lock. A crash after the file swap leaves the
+        # index stamped with the old fingerprint, so the next reader rebuilds it.
+        in_sync = self._index.fingerprint() == self._fingerprint()
+        self._write_all(payload)
+        if in_sync:
+            self._index.update((summarize(r) for r in changed), removed, self._fingerprint())
+        else:
+            self._index.rebuild(self._summaries(payload), self._fingerprint())
+
+    # --- change feed (all called under the writer lock) ---
+
+    def _prepare_feed(self, changes: list[_Change]) -> None:
+        if self._feed is None:
+            return
+        pending = {"after_seq": self._feed.last_seq(), "changes": changes}
+        atomic_write_text(self._feed_pending_path, json.dumps(pending))
+
+    def _publish(self, changes: list[_Change]) -> None:
+        if self._feed is None:
+            return
+        self._feed.append(changes)
+        self._feed_pending_path.unlink(missing_ok=True)
+
+    def _recover_feed(self, payload: Dict[str, Dict[str, Any]]) -> None:
+        """Publish a batch whose writer died after the file swap but before the feed append."""
+        if self._feed is None:
+            return
+        try:
+            pending = json.loads(self._feed_pending_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        changes = [tuple(change) for change in pending["changes"]]
+        # The swap is atomic, so the batch is all in the store or not at all;
+        # its last change for a key is that key's final state.
+        before, after = changes[-1]
+        row = after if after is not None else before
+        applied = payload.get(entity_key(row["entity_type"], row["entity_id"])) == after
+        if applied and not any(
+            e.before == before and e.after == after for e in self._feed.read(pending["after_seq"])
+        ):
+            self._feed.append(changes)
+        self._feed_pending_path.unlink(missing_ok=True)
 
     def get(self, entity_type: str, entity_id: str) -> Optional[EntityRecord]:
+        key = entity_key(entity_type, entity_id)
+        cache = self._validate_cache()
+        if cache is not None:
+            row = cache.get(key)
+            if row is not None:
+                return EntityRecord(**copy.deepcopy(row))
+
         payload = self._read_all()
-        key = f"{entity_type}:{entity_id}"
         if key not in payload:
             return None
         rec = payload[key]
+        if cache is not None:
+            cache.put(key, rec)
+            rec = copy.deepcopy(rec)
         return EntityRecord(**rec)
 
-    def upsert(self, record: EntityRecord) -> None:
-        payload = self._read_all()
-        key = f"{record.entity_type}:{record.entity_id}"
-        payload[key] = asdict(record)
-        self._write_all(payload)
+    def upsert_many(self, records: Iterable[EntityRecord], *, cas: bool = False) -> None:
+        self._upsert(records, cas=cas, keep_versions=False)
 
-    def require(self, entity_type: str, entity_id: str) -> EntityRecord:
-        rec = self.get(entity_type, entity_id)
-        if rec is None:
-            raise StoreError(f"Entity not found: {entity_type} {entity_id}")
-        return rec
+    def restore_many(self, records: Iterable[EntityRecord]) -> None:
+        """Write records with their versions as given (copying a store); no CAS."""
+        self._upsert(records, cas=False, keep_versions=True)
+
+    def _upsert(self, records: Iterable[EntityRecord], *, cas: bool, keep_versions: bool) -> None:
+        # One read and one rewrite for the whole batch instead of one per record.
+        records = list(records)
+        with file_lock(self._lock_path):
+            payload = self._read_all()
+            self._recover_feed(payload)
+            if cas:
+                stored = {k: v.get("version", 0) for k, v in payload.items()}
+                check_versions(records, stored)
+            changes = []
+            versions = []
+            for record in records:
+                key = entity_key(record.entity_type, record.entity_id)
+                prior = payload.get(key)
+                row = asdict(record)
+                if not keep_versions:
+                    stored_version = prior.get("version", 0) if prior is not None else 0
+                    row["version"] = max(stored_version, record.version) + 1
+                versions.append(row["version"])
+                changes.append((prior, row))
+                payload[key] = row
+            self._prepare_feed(changes)
+            self._commit(payload, records)
+            self._refresh_cache(payload)
+            self._publish(changes)
+        for record, version in zip(records, versions):
+            record.version = version
+
+    def delete_many(
+        self,
+        keys: Iterable[tuple[str, str]],
+        *,
+        versions: Optional[Dict[tuple[str, str], int]] = None,
+    ) -> int:
+        versions = versions or {}
+        with file_lock(self._lock_path):
+            payload = self._read_all()
+            self._recover_feed(payload)
+            changes = []
+            removed = []
+            for entity_type, entity_id in keys:
+                key = entity_key(entity_type, entity_id)
+                row = payload.get(key)
+                if row is None:
+                    continue
+                expected = versions.get((entity_type, entity_id))
+                if expected is not None and row.get("version", 0) != expected:
+                    continue
+                del payload[key]
+                changes.append((row, None))
+                removed.append(key)
+            if not removed:
+                return 0
+            self._prepare_feed(changes)
+            self._commit(payload, (), removed)
+            self._refresh_cache(payload)
+            self._publish(changes)
+        return len(removed)
+
+    def query(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        state: Optional[str] = None,
+        risk_tier: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        yield from self._current_index().select(
+            entity_type=entity_type, state=state, risk_tier=risk_tier, after=after, limit=limit
+        )
+
+    def id_range(
+        self,
+        entity_type: str,
+        prefix: str,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        yield from self._current_index().id_range(
+            entity_type, prefix, start=start, end=end, limit=limit
+        )
+
+    def last_number(self, entity_type: str, prefix: str) -> Optional[int]:
+        return self._current_index().last_number(entity_type, prefix)
+
+    def _current_index(self) -> SidecarIndex:
+        fingerprint = self._fingerprint()
+        if self._index.fingerprint() != fingerprint:
+            # Fingerprint before reading: if a writer swaps the file meanwhile,
+            # the rebuilt index simply looks stale next time.
+            self._index.rebuild(self._summaries(self._read_all()), fingerprint)
+        return self._index
+
+    def close(self) -> None:
+        self._index.close()
+
+    def get_many(self, keys: Iterable[tuple[str, str]]) -> Dict[tuple[str, str], EntityRecord]:
+        payload = self._read_all()
+        out: Dict[tuple[str, str], EntityRecord] = {}
+        for entity_type, entity_id in keys:
+            rec = payload.get(entity_key(entity_type, entity_id))
+            if rec is not None:
+                out[(entity_type, entity_id)] = EntityRecord(**rec)
+        return out
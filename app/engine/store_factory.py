@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.engine.changefeed import ChangeFeed
+from app.engine.log_store import LogEntityStore
+from app.engine.sharded_store import ShardedFileEntityStore
+from app.engine.sqlite_store import SqliteEntityStore
+from app.engine.store import EntityStore, FileEntityStore, StoreError
+
+# Backends whose writes publish to GUARDIAN_CHANGE_FEED.
+_FEED_BACKENDS = ("json", "sharded")
+
+_DEFAULT_PATHS = {
+    "json": "entities.json",
+    "log": "entities.log",
+    "sqlite": "entities.db",
+    "sharded": "entities.shards",
+}
+
+
+@dataclass(frozen=True)
+class StoreConfig:
+    backend: str  # "json" | "log" | "sqlite" | "sharded"
+    path: Path
+    cache_size: int = 0  # json/sharded backends only; 0 disables the record cache
+    shards: int = 16  # sharded backend only
+    feed_path: Optional[Path] = None  # json/sharded backends only; None disables the change feed
+
+
+def get_store_config() -> StoreConfig:
+    backend = os.getenv("GUARDIAN_STORE_BACKEND", "json").strip().lower()
+    if backend not in _DEFAULT_PATHS:
+        raise StoreError(
+            f"Unknown GUARDIAN_STORE_BACKEND '{backend}'. Known: {', '.join(_DEFAULT_PATHS)}"
+        )
+    path = Path(os.getenv("GUARDIAN_STORE_PATH", _DEFAULT_PATHS[backend]))
+    cache_size = int(os.getenv("GUARDIAN_STORE_CACHE_SIZE", "0"))
+    shards = int(os.getenv("GUARDIAN_STORE_SHARDS", "16"))
+    feed = os.getenv("GUARDIAN_CHANGE_FEED")
+    return StoreConfig(
+        backend=backend,
+        path=path,
+        cache_size=cache_size,
+        shards=shards,
+        feed_path=Path(feed) if feed else None,
+    )
+
+
+def open_store(config: StoreConfig | None = None) -> EntityStore:
+    cfg = config or get_store_config()
+    if cfg.feed_path is not None and cfg.backend not in _FEED_BACKENDS:
+        # Refuse rather than run with a feed that silently misses every write.
+        raise StoreError(
+            f"GUARDIAN_CHANGE_FEED is not supported by the {cfg.backend} backend "
+            f"(only {', '.join(_FEED_BACKENDS)}); unset it or switch backends."
+        )
+    feed = ChangeFeed(cfg.feed_path) if cfg.feed_path is not None else None
+    if cfg.backend == "sqlite":
+        return SqliteEntityStore(cfg.path)
+    if cfg.backend == "log":
+        return LogEntityStore(cfg.path)
+    if cfg.backend == "sharded":
+        return ShardedFileEntityStore(
+            cfg.path, shards=cfg.shards, cache_size=cfg.cache_size, feed=feed
+        )
+    return FileEntityStore(cfg.path, cache_size=cfg.cache_size, feed=feed)
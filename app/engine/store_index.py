@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+INDEXED_FIELDS = ("entity_type", "state", "risk_tier")
+
+_NUMERIC_ID = re.compile(r"(.*?)([0-9]+)")
+
+
+def numeric_id(entity_id: str) -> Optional[tuple[str, int]]:
+    """Split an id ending in digits into (prefix, number): "TCKT-1024" -> ("TCKT-", 1024)."""
+    m = _NUMERIC_ID.fullmatch(entity_id)
+    if m is None:
+        return None
+    return m.group(1), int(m.group(2))
+
+
+def id_columns(entity_id: str) -> tuple[Optional[str], Optional[int]]:
+    """(prefix, number) for SQLite's indexed id columns; (None, None) if not numeric."""
+    split = numeric_id(entity_id)
+    if split is None or split[1] >= 1 << 63:  # beyond SQLite's INTEGER range
+        return (None, None)
+    return split
+
+
+@dataclass(frozen=True)
+class EntitySummary:
+    entity_type: str
+    entity_id: str
+    state: str
+    risk_tier: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.entity_type}:{self.entity_id}"
+
+
+def _order(key: str) -> tuple[str, str]:
+    # Keys sort by (entity_type, entity_id) so every backend pages in the same order.
+    entity_type, _, entity_id = key.partition(":")
+    return (entity_type, entity_id)
+
+
+class FieldIndex:
+    """
+    In-memory secondary index over the listing fields of every entity.
+
+    Holds one summary per key plus, for each indexed field value, a posting list
+    of keys kept sorted by (entity_type, entity_id). A query walks the shortest
+    matching posting list from the cursor and checks the other filters against
+    the summary, so a page costs O(log n + page) rather than a store scan.
+
+    IDs that end in digits are also listed per (entity_type, prefix) as
+    (number, entity_id) pairs in numeric order, so numeric ranges and the
+    highest number in use are a bisect away.
+    """
+
+    def __init__(self) -> None:
+        self._summaries: Dict[str, EntitySummary] = {}
+        self._all: list[str] = []
+        self._postings: Dict[str, Dict[str, list[str]]] = {f: {} for f in INDEXED_FIELDS}
+        self._numbers: Dict[str, list[tuple[int, str]]] = {}  # "Type:prefix" -> sorted (number, id)
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    @classmethod
+    def build(cls, summaries: Iterable[EntitySummary]) -> "FieldIndex":
+        """Index many summaries at once, sorting each list once instead of inserting one by one."""
+        index = cls()
+        index._summaries = {s.key: s for s in summaries}
+        index._all = sorted(index._summaries, key=_order)
+        for key in index._all:
+            summary = index._summaries[key]
+            for field in INDEXED_FIELDS:
+                index._postings[field].setdefault(getattr(summary, field), []).append(key)
+            index._number(summary, list.append)
+        for entries in index._numbers.values():
+            entries.sort()
+        return index
+
+    def put(self, summary: EntitySummary) -> None:
+        key = summary.key
+        prior = self._summaries.get(key)
+        if prior == summary:
+            return
+        if prior is None:
+            insort(self._all, key, key=_order)
+            self._number(summary, insort)
+        else:
+            self._unpost(prior)
+        self._summaries[key] = summary
+        for field in INDEXED_FIELDS:
+            insort(self._postings[field].setdefault(getattr(summary, field), []), key, key=_order)
+
+    def remove(self, key: str) -> None:
+        prior = self._summaries.pop(key, None)
+        if prior is None:
+            return
+        self._all.pop(self._position(self._all, key))
+        self._unpost(prior)
+        self._number(prior, lambda entries, entry: entries.pop(bisect_left(entries, entry)))
+
+    def _number(self, summary: EntitySummary, update) -> None:
+        split = numeric_id(summary.entity_id)
+        if split is None:
+            return
+        prefix, number = split
+        name = f"{summary.entity_type}:{prefix}"
+        entries = self._numbers.setdefault(name, [])
+        update(entries, (number, summary.entity_id))
+        if not entries:
+            del self._numbers[name]
+
+    def _unpost(self, summary: EntitySummary) -> None:
+        for field in INDEXED_FIELDS:
+            value = getattr(summary, field)
+            keys = self._postings[field][value]
+            keys.pop(self._position(keys, summary.key))
+            if not keys:
+                del self._postings[field][value]
+
+    @staticmethod
+    def _position(keys: list[str], key: str) -> int:
+        return bisect_right(keys, _order(key), key=_order) - 1
+
+    def select(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        state: Optional[str] = None,
+        risk_tier: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> Iterator[EntitySummary]:
+        filters = {
+            f: v
+            for f, v in (("entity_type", entity_type), ("state", state), ("risk_tier", risk_tier))
+            if v is not None
+        }
+        candidates = [self._postings[f].get(v, []) for f, v in filters.items()] or [self._all]
+        keys = min(candidates, key=len)
+
+        start = bisect_right(keys, _order(after), key=_order) if after is not None else 0
+        for key in keys[start:]:
+            summary = self._summaries[key]
+            if all(getattr(summary, f) == v for f, v in filters.items()):
+                yield summary
+
+    def id_range(
+        self,
+        entity_type: str,
+        prefix: str,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        """Summaries whose id is `prefix` + a number in [start, end], in numeric order."""
+        entries = self._numbers.get(f"{entity_type}:{prefix}", [])
+        lo = bisect_left(entries, (start,)) if start is not None else 0
+        for number, entity_id in entries[lo:]:
+            if end is not None and number > end:
+                return
+            yield self._summaries[f"{entity_type}:{entity_id}"]
+
+    def last_number(self, entity_type: str, prefix: str) -> Optional[int]:
+        entries = self._numbers.get(f"{entity_type}:{prefix}")
+        return entries[-1][0] if entries else None
+
+
+_SIDECAR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    entity_type TEXT NOT NULL,
+    entity_id   TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    risk_tier   TEXT NOT NULL,
+    id_prefix   TEXT,
+    id_num      INTEGER,
+    PRIMARY KEY (entity_type, entity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_summaries_state ON summaries (state, entity_type, entity_id);
+CREATE INDEX IF NOT EXISTS idx_summaries_risk ON summaries (risk_tier, entity_type, entity_id);
+CREATE INDEX IF NOT EXISTS idx_summaries_id_num ON summaries (entity_type, id_prefix, id_num);
+CREATE TABLE IF NOT EXISTS source (
+    id          INTEGER PRIMARY KEY CHECK (id = 0),
+    fingerprint TEXT NOT NULL
+);
+"""
+
+
+class SidecarIndex:
+    """
+    Persistent listing index of a file-backed store, kept in a SQLite file.
+
+    Holds one summary row per entity with the same secondary indexes as
+    SqliteEntityStore, plus the stat fingerprint of the store file it
+    describes. A query reads only the index range it pages through, and a
+    write touches only the changed rows, so neither costs O(store size).
+    """
+
+    def __init__(self, path: Path, *, busy_timeout_ms: int = 5000):
+        self._path = path
+        self._busy_timeout_ms = busy_timeout_ms
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Opened on first use; an unreadable file is only a cache, so start over.
+        if self._conn is None:
+            try:
+                conn = self._connect()
+            except sqlite3.DatabaseError:
+                self._path.unlink(missing_ok=True)
+                conn = self._connect()
+            self._conn = conn
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self._path), timeout=self._busy_timeout_ms / 1000)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SIDECAR_SCHEMA)
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def fingerprint(self) -> Optional[list[int]]:
+        """Fingerprint of the store file the index was last brought up to date with."""
+        row = self._db().execute("SELECT fingerprint FROM source WHERE id = 0").fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def rebuild(self, summaries: Iterable[EntitySummary], fingerprint: Optional[list[int]]) -> None:
+        conn = self._db()
+        with conn:
+            conn.execute("DELETE FROM summaries")
+            self._put(conn, summaries)
+            self._stamp(conn, fingerprint)
+
+    def update(
+        self,
+        changed: Iterable[EntitySummary],
+        removed: Iterable[str],
+        fingerprint: Optional[list[int]],
+    ) -> None:
+        conn = self._db()
+        with conn:
+            self._put(conn, changed)
+            conn.executemany(
+                "DELETE FROM summaries WHERE entity_type = ? AND entity_id = ?",
+                [key.split(":", 1) for key in removed],
+            )
+            self._stamp(conn, fingerprint)
+
+    @staticmethod
+    def _put(conn: sqlite3.Connection, summaries: Iterable[EntitySummary]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO summaries "
+            "(entity_type, entity_id, state, risk_tier, id_prefix, id_num) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (s.entity_type, s.entity_id, s.state, s.risk_tier, *id_columns(s.entity_id))
+                for s in summaries
+            ),
+        )
+
+    @staticmethod
+    def _stamp(conn: sqlite3.Connection, fingerprint: Optional[list[int]]) -> None:
+        if fingerprint is None:
+            conn.execute("DELETE FROM source")
+            return
+        conn.execute(
+            "INSERT INTO source (id, fingerprint) VALUES (0, ?) "
+            "ON CONFLICT (id) DO UPDATE SET fingerprint = excluded.fingerprint",
+            (json.dumps(fingerprint),),
+        )
+
+    def select(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        state: Optional[str] = None,
+        risk_tier: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        clauses: list[str] = []
+        params: list[object] = []
+        filters = (("entity_type", entity_type), ("state", state), ("risk_tier", risk_tier))
+        for column, value in filters:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if after is not None:
+            clauses.append("(entity_type, entity_id) > (?, ?)")
+            params.extend(_order(after))
+
+        sql = "SELECT entity_type, entity_id, state, risk_tier FROM summaries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY entity_type, entity_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        for row in self._db().execute(sql, params):
+            yield EntitySummary(*row)
+
+    def id_range(
+        self,
+        entity_type: str,
+        prefix: str,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[EntitySummary]:
+        sql = (
+            "SELECT entity_type, entity_id, state, risk_tier FROM summaries "
+            "WHERE entity_type = ? AND id_prefix = ?"
+        )
+        params: list[object] = [entity_type, prefix]
+        if start is not None:
+            sql += " AND id_num >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND id_num <= ?"
+            params.append(end)
+        sql += " ORDER BY id_num, entity_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        for row in self._db().execute(sql, params):
+            yield EntitySummary(*row)
+
+    def last_number(self, entity_type: str, prefix: str) -> Optional[int]:
+        row = self._db().execute(
+            "SELECT MAX(id_num) FROM summaries WHERE entity_type = ? AND id_prefix = ?",
+            (entity_type, prefix),
+        ).fetchone()
+        return row[0]
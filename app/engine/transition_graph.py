@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable, Optional
+
+from app.engine.cache import LRUCache, cache_stats
+from app.engine.state_machine import TransitionError
+
+# Shortest paths by (spec hash, entity type, from, to), shared by every
+# TransitionGraph in the process so reloading the spec keeps warm entries.
+_PATHS: LRUCache[tuple[str, ...]] = LRUCache(4096, cache_stats("graph.paths"))
+
+
+class TransitionGraph:
+    """
+    An entity type's states and transitions as a directed graph.
+
+    States are numbered in spec order; `successors[i]` lists the states
+    reachable in one hop from state i (in spec transition order), and
+    `reachable[i]` is a bitset of every state reachable from i in one or
+    more hops. Both are built once; shortest paths come from a BFS over the
+    adjacency arrays and are cached per (spec hash, from, to).
+    """
+
+    def __init__(
+        self,
+        entity_type: str,
+        states: Iterable[str],
+        edges: Iterable[tuple[str, str]],
+        *,
+        spec_hash: str = "",
+    ):
+        self.entity_type = entity_type
+        self.spec_hash = spec_hash
+        self.states = tuple(states)
+        self.index = {state: i for i, state in enumerate(self.states)}
+
+        successors: list[list[int]] = [[] for _ in self.states]
+        for from_state, to_state in edges:
+            if from_state not in self.index or to_state not in self.index:
+                continue  # resolve() rejects such transitions too
+            i, j = self.index[from_state], self.index[to_state]
+            if j not in successors[i]:
+                successors[i].append(j)
+        self.successors = tuple(tuple(s) for s in successors)
+        self.reachable = tuple(self._closure(i) for i in range(len(self.states)))
+
+    def _closure(self, start: int) -> int:
+        seen = 0
+        stack = list(self.successors[start])
+        while stack:
+            j = stack.pop()
+            if seen >> j & 1:
+                continue
+            seen |= 1 << j
+            stack.extend(self.successors[j])
+        return seen
+
+    def _require(self, state: str) -> int:
+        i = self.index.get(state)
+        if i is None:
+            raise TransitionError(f"Unknown state '{state}'. Known: {list(self.states)}")
+        return i
+
+    def can_reach(self, from_state: str, to_state: str) -> bool:
+        i, j = self._require(from_state), self._require(to_state)
+        return i == j or bool(self.reachable[i] >> j & 1)
+
+    def shortest_path(self, from_state: str, to_state: str) -> Optional[tuple[str, ...]]:
+        """States from `from_state` to `to_state` inclusive, or None if unreachable."""
+        start, goal = self._require(from_state), self._require(to_state)
+        if start == goal:
+            return (from_state,)
+        if not self.reachable[start] >> goal & 1:
+            return None
+
+        key = (self.spec_hash, self.entity_type, from_state, to_state)
+        cached = _PATHS.get(key)
+        if cached is not None:
+            return cached
+
+        parent = {start: start}
+        queue = deque([start])
+        while queue and goal not in parent:
+            i = queue.popleft()
+            for j in self.successors[i]:
+                if j not in parent:
+                    parent[j] = i
+                    queue.append(j)
+
+        path = [goal]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        result = tuple(self.states[i] for i in reversed(path))
+        _PATHS.put(key, result)
+        return result
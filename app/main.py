@@ -1,28 +1,41 @@
 from __future__ import annotations
 
 import json
+import os
 import sys
+from dataclasses import asdict
+from itertools import islice
 from pathlib import Path
+from typing import Optional
 
 from app.agents.registry import default_registry
-from app.engine.audit import AuditLogger, AuditLogEntry
-from app.engine.completeness import CompletenessEngine
+from app.engine.audit import AuditLogEntry, AuditLogger
+from app.engine.audit_rollups import AuditRollups
+from app.engine.audit_segments import AuditSegments
+from app.engine.batch_transitions import BatchTransitioner
+from app.engine.bulk_gates import BulkGateEvaluator
+from app.engine.bulk_import import EntityImporter
+from app.engine.changefeed import ChangeFeed
+from app.engine.columnar_export import ColumnarExporter, ExportError
 from app.engine.gates import GateEngine
-from app.engine.identity import IdentityError, IdentityValidator
-from app.spec_loader import load_spec
+from app.engine.id_migration import IdMigration
+from app.engine.identity import IdentityError
+from app.engine.log_store import LogEntityStore, migrate_json_store
+from app.engine.path_planner import plan_path
 from app.engine.review_archive import ReviewArchive, ReviewLogEntry
-from app.engine.state_machine import resolve_transition, TransitionError
-from app.engine.store import FileEntityStore, EntityRecord, StoreError
-
+from app.engine.rules import RuleError, load_rule_plugins
+from app.engine.sharded_store import ShardedFileEntityStore, reshard_json_store
+from app.engine.state_machine import TransitionError
+from app.engine.store import ConcurrencyError, EntityRecord, StoreError
+from app.engine.store_factory import get_store_config, open_store
+from app.engine.store_index import EntitySummary, numeric_id
 from app.llm.client import get_config
 from app.llm.reviewer import review_code
 from app.llm.testgen import generate_tests
-
 from app.runtime.orchestrator import run_pipeline
+from app.spec_loader import load_compiled_spec
 
 
-STORE_PATH = Path("entities.json")
-
 def cmd_ai_review(file_path: str) -> int:
     path = Path(file_path)
     code = path.read_text(encoding="utf-8")
@@ -59,6 +72,7 @@ def cmd_ai_testgen(file_path: str) -> int:
 def usage() -> None:
     print("Commands:")
     print("  python -m app.main validate-id <EntityType> <IdValue>")
+    print("  python -m app.main validate-ids <EntityType> <ids.txt|->")
     print('  python -m app.main completeness <EntityType> \'<json>\'')
     print("")
     print("Examples:")
@@ -67,18 +81,87 @@ def usage() -> None:
         "  python -m app.main completeness Ticket "
         "'{\"has_title\": true, \"has_acceptance_criteria\": false, \"has_risk_tier\": true}'"
     )
-    print("  python -m app.main transition <EntityType> <FromState> <ToState> <risk_tier> '<json>' [--human-approved]")
+    print(
+        "  python -m app.main transition <EntityType> <FromState> <ToState> <risk_tier> '<json>' "
+        "[--human-approved] [--fail-fast]"
+    )
     print("  python -m app.main create <EntityType> <EntityId> <risk_tier> '<json>'")
     print("  python -m app.main show <EntityType> <EntityId>")
-    print("  python -m app.main apply-transition <EntityType> <EntityId> <ToState> [--human-approved]")
+    print("  python -m app.main update <EntityType> <EntityId> '<json changes>'")
+    print(
+        "  python -m app.main apply-transition <EntityType> <EntityId> <ToState> "
+        "[--human-approved] [--fail-fast]"
+    )
+    print("  python -m app.main path <EntityType> <EntityId> <ToState> [--human-approved]")
+    print(
+        "  python -m app.main apply-transitions <EntityType> <ToState> "
+        "(--ids ID,ID,... | --file <ids.txt|-> | --state S [--risk R]) [--human-approved]"
+    )
+    print(
+        "  python -m app.main list [--type T] [--state S] [--risk R] "
+        "[--after <Type:Id>] [--limit N]"
+    )
+    print("  python -m app.main range <EntityType> <FromId> <ToId> [--limit N] [--gaps]")
+    print("  python -m app.main next-id <EntityType>")
+    print("  python -m app.main import <entities.jsonl|-> [--batch-size N]")
+    print(
+        "  python -m app.main gate-report <EntityType> <FromState> <ToState> [--human-approved] "
+        "[--show allowed|blocked] [--limit N]"
+    )
+    print("  python -m app.main feed [--after SEQ] [--follow]")
+    print("  python -m app.main audit read [--since <ISO time>] [--until <ISO time>]")
+    print(
+        "  python -m app.main audit query [<EntityType> [<EntityId>]] [--from S] [--to S] "
+        "[--show allowed|blocked] [--since <ISO time>] [--until <ISO time>] [--limit N]"
+    )
+    print("  python -m app.main audit rotate")
+    print("  python -m app.main stats [--type T] [--from S] [--to S] [--risk R] [--rebuild]")
+    print(
+        "  python -m app.main export <out_dir> [--what audit|entities|all] "
+        "[--format npz|parquet] [--chunk-rows N]"
+    )
+    print("  python -m app.main migrate-store <entities.json> <log_store_dir>")
+    print("  python -m app.main reshard-store <entities.json> <shard_dir> [--shards N]")
+    print("  python -m app.main migrate-ids <EntityType> [--checkpoint <path>] [--batch N]")
     print("  python -m app.main ai-review <path-to_py_file>")
     print("  python -m app.main ai-testgen <path_to_py_file>")
     print("  python -m app.main run-pipeline <project_pack_path> \"<task text>\"")
-    print("  python -m app.main run-pipeline projects/workflow_guardian/project.yaml \"Add a new gate rule\"")
-
-
-def cmd_create(spec_path: Path, entity_type: str, entity_id: str, risk_tier: str, json_payload: str) -> int:
-    spec = load_spec(spec_path)
+    print(
+        "  python -m app.main run-pipeline projects/workflow_guardian/project.yaml "
+        "\"Add a new gate rule\""
+    )
+    print("")
+    print("Entity store: GUARDIAN_STORE_BACKEND=json|log|sqlite|sharded (default json),")
+    print("              GUARDIAN_STORE_PATH=<path>,")
+    print("              GUARDIAN_STORE_CACHE_SIZE=<records> (json/sharded read cache,")
+    print("              default off),")
+    print("              GUARDIAN_STORE_SHARDS=<n> (sharded layout, default 16),")
+    print("              GUARDIAN_CHANGE_FEED=<path> (change feed, json/sharded backends only,")
+    print("              default off)")
+    print("Gate decisions: GUARDIAN_GATE_CACHE_SIZE=<decisions> (in-process cache; only")
+    print("                helps long-lived embedders, each CLI call starts empty,")
+    print("                default off),")
+    print("                GUARDIAN_GATE_CACHE_PATH=<file> (decision cache shared across CLI runs,")
+    print("                default off),")
+    print("                GUARDIAN_RULE_PLUGINS=<module,...> (modules registering custom")
+    print("                rule types)")
+    print("                --fail-fast runs cheap rules first and reports only the first")
+    print("                blocking reason")
+    print("Audit log: GUARDIAN_AUDIT_BUFFER=<entries> (keep the log open and commit in groups,")
+    print("           default off),")
+    print("           GUARDIAN_AUDIT_FSYNC=none|batch|entry (default none),")
+    print("           GUARDIAN_AUDIT_SEGMENT_BYTES=<bytes> / GUARDIAN_AUDIT_SEGMENT_AGE=<seconds>")
+    print("           (rotate into compressed, time-indexed segments; default off),")
+    print("           GUARDIAN_AUDIT_INDEX=0 (stop updating the per-entity history index")
+    print("           on write),")
+    print("           GUARDIAN_AUDIT_ROLLUPS=0 (stop updating the stats rollups on write)")
+
+
+def cmd_create(
+    spec_path: Path, entity_type: str, entity_id: str, risk_tier: str, json_payload: str
+) -> int:
+    compiled = load_compiled_spec(spec_path)
+    spec = compiled.spec
     if entity_type not in spec.entities:
         print(f"Unknown entity type: {entity_type}. Known: {', '.join(spec.entities.keys())}")
         return 2
@@ -95,81 +178,169 @@ def cmd_create(spec_path: Path, entity_type: str, entity_id: str, risk_tier: str
         return 2
 
     # Validate ID
-    validator = IdentityValidator(
-        canonical_regex=entity_spec.id.canonical_regex,
-        legacy_regexes=entity_spec.id.legacy_regexes,
-    )
     try:
-        id_result = validator.validate(entity_type, entity_id)
-        if id_result.is_legacy:
-            print(f"⚠️ Legacy ID detected, refusing create until normalized: {entity_id}")
-            return 1
+        id_result = compiled.entities[entity_type].ids.validate(entity_type, entity_id)
     except IdentityError as e:
         print(f"❌ {e}")
         return 1
+    if id_result.is_legacy:
+        if id_result.canonical_id is None:
+            print(f"⚠️ Legacy ID detected, refusing create until normalized: {entity_id}")
+            return 1
+        print(f"⚠️ Legacy ID {entity_id} normalized to {id_result.canonical_id}")
+        entity_id = id_result.canonical_id
 
-    store = FileEntityStore(STORE_PATH)
-    existing = store.get(entity_type, entity_id)
-    if existing is not None:
-        print(f"❌ Entity already exists: {entity_type} {entity_id}")
-        return 1
+    store = open_store()
+    try:
+        existing = store.get(entity_type, entity_id)
+        if existing is not None:
+            print(f"❌ Entity already exists: {entity_type} {entity_id}")
+            return 1
 
-    initial_state = entity_spec.states[0]
-    rec = EntityRecord(
-        entity_type=entity_type,
-        entity_id=entity_id,
-        risk_tier=risk_tier,
-        state=initial_state,
-        data=data,
-    )
-    store.upsert(rec)
-    print(f"✅ Created {entity_type} {entity_id} in state {initial_state}")
-    return 0
+        initial_state = entity_spec.states[0]
+        rec = EntityRecord(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            risk_tier=risk_tier,
+            state=initial_state,
+            data=data,
+        )
+        compiled.entities[entity_type].completeness_mask(rec)
+        try:
+            store.upsert(rec, cas=True)
+        except ConcurrencyError:
+            print(f"❌ Entity already exists: {entity_type} {entity_id}")
+            return 1
+        print(f"✅ Created {entity_type} {entity_id} in state {initial_state}")
+        return 0
+    finally:
+        store.close()
 
 
 def cmd_show(spec_path: Path, entity_type: str, entity_id: str) -> int:
-    store = FileEntityStore(STORE_PATH)
-    rec = store.get(entity_type, entity_id)
+    store = open_store()
+    try:
+        rec = store.get(entity_type, entity_id)
+    finally:
+        store.close()
     if rec is None:
         print(f"❌ Not found: {entity_type} {entity_id}")
         return 1
-    
+
     print(f"{rec.entity_type} {rec.entity_id}")
     print(f"Risk: {rec.risk_tier}")
     print(f"State: {rec.state}")
+    print(f"Version: {rec.version}")
+    compiled = load_compiled_spec(spec_path)
+    if entity_type in compiled.entities:
+        tracker = compiled.entities[entity_type].checklist
+        c = tracker.result(compiled.entities[entity_type].completeness_mask(rec))
+        print(f"Completeness: {c.percent}% ({c.satisfied_items}/{c.total_items})")
     print(json.dumps(rec.data, indent=2, sort_keys=True))
     return 0
 
 
 
-def cmd_validate_id(spec_path: Path, entity_type: str, id_value: str) -> int:
-    spec = load_spec(spec_path)
-    if entity_type not in spec.entities:
-        print(f"Unknown entity type: {entity_type}. Known: {', '.join(spec.entities.keys())}")
+def cmd_update(spec_path: Path, entity_type: str, entity_id: str, json_payload: str) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
         return 2
 
-    entity_spec = spec.entities[entity_type]
-    validator = IdentityValidator(
-        canonical_regex=entity_spec.id.canonical_regex,
-        legacy_regexes=entity_spec.id.legacy_regexes,
-    )
+    try:
+        changes = json.loads(json_payload)
+    except json.JSONDecodeError as e:
+        print(f"❌ Invalid JSON payload: {e}")
+        return 2
+    if not isinstance(changes, dict):
+        print("❌ Changes must be a JSON object.")
+        return 2
+
+    store = open_store()
+    try:
+        rec = store.require(entity_type, entity_id)
+    except StoreError as e:
+        print(f"❌ {e}")
+        store.close()
+        return 1
 
+    entity = compiled.entities[entity_type]
+    mask = entity.update_data(rec, changes)
     try:
-        result = validator.validate(entity_type, id_value)
+        store.upsert(rec, cas=True)
+    except ConcurrencyError as e:
+        print(f"❌ {e} Re-run the update against the current data.")
+        return 1
+    finally:
+        store.close()
+
+    c = entity.checklist.result(mask)
+    print(f"✅ Updated {entity_type} {entity_id} (version {rec.version})")
+    print(f"Completeness: {c.percent}% ({c.satisfied_items}/{c.total_items})")
+    return 0
+
+
+def cmd_validate_id(spec_path: Path, entity_type: str, id_value: str) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
+
+    try:
+        result = compiled.entities[entity_type].ids.validate(entity_type, id_value)
     except IdentityError as e:
         print(f"❌ {e}")
         return 1
 
     if result.is_legacy:
         print(f"⚠️ Legacy ID detected for {entity_type}: {result.raw_id}")
+        if result.canonical_id is not None:
+            print(f"Canonical form: {result.canonical_id}")
         return 0
 
     print(f"✅ Canonical ID OK: {result.canonical_id}")
     return 0
 
 
+def cmd_validate_ids(spec_path: Path, entity_type: str, source: str) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
+
+    validator = compiled.entities[entity_type].ids
+    counts = {"canonical": 0, "legacy": 0, "invalid": 0}
+    stream = sys.stdin if source == "-" else Path(source).open("r", encoding="utf-8")
+    out = sys.stdout
+    try:
+        for id_value, result in validator.validate_many(entity_type, stream):
+            if result is None:
+                status, row = "invalid", {"id": id_value, "status": "invalid"}
+            else:
+                status = "legacy" if result.is_legacy else "canonical"
+                row = {"id": id_value, "status": status, "pattern": result.pattern}
+                if result.is_legacy and result.canonical_id is not None:
+                    row["canonical_id"] = result.canonical_id
+                if result.groups:
+                    row["groups"] = result.groups
+            counts[status] += 1
+            out.write(json.dumps(row) + "\n")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    # Summary goes to stderr so stdout stays pure JSONL.
+    print(
+        f"Validated {sum(counts.values())} ids: {counts['canonical']} canonical, "
+        f"{counts['legacy']} legacy, {counts['invalid']} invalid",
+        file=sys.stderr,
+    )
+    return 0 if counts["invalid"] == 0 else 1
+
+
 def cmd_completeness(spec_path: Path, entity_type: str, json_payload: str) -> int:
-    spec = load_spec(spec_path)
+    compiled = load_compiled_spec(spec_path)
+    spec = compiled.spec
     if entity_type not in spec.entities:
         print(f"Unknown entity type: {entity_type}. Known: {', '.join(spec.entities.keys())}")
         return 2
@@ -184,9 +355,9 @@ def cmd_completeness(spec_path: Path, entity_type: str, json_payload: str) -> in
         print("❌ JSON payload must be an object/dict.")
         return 2
 
-    checklist = spec.entities[entity_type].checklist
-    engine = CompletenessEngine()
-    result = engine.compute(checklist=checklist, entity_data=entity_data)
+    # The compiled checklist carries the spec's predicates, as the gates use it.
+    checklist = compiled.entities[entity_type].checklist
+    result = checklist.result(checklist.track(entity_data))
 
     print(f"Completeness: {result.percent}% ({result.satisfied_items}/{result.total_items})")
     if result.missing_items:
@@ -203,14 +374,15 @@ def cmd_transition(
     risk_tier: str,
     json_payload: str,
     human_approved: bool,
+    fail_fast: bool = False,
 ) -> int:
-    spec = load_spec(spec_path)
-    if entity_type not in spec.entities:
-        print(f"Unknown entity type: {entity_type}. Known: {', '.join(spec.entities.keys())}")
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
         return 2
 
-    if risk_tier not in spec.risk_tiers:
-        print(f"Unknown risk tier '{risk_tier}'. Known: {spec.risk_tiers}")
+    if risk_tier not in compiled.risk_tiers:
+        print(f"Unknown risk tier '{risk_tier}'. Known: {compiled.spec.risk_tiers}")
         return 2
 
     try:
@@ -219,27 +391,26 @@ def cmd_transition(
         print(f"❌ Invalid JSON payload: {e}")
         return 2
 
-    entity = spec.entities[entity_type]
+    entity = compiled.entities[entity_type]
 
     try:
-        resolved = resolve_transition(entity, from_state, to_state)
-        gate = resolved.transition.gate
+        resolved = entity.resolve(from_state, to_state)
     except TransitionError as e:
         print(f"❌ {e}")
         return 1
 
-    engine = GateEngine()
-    decision = engine.evaluate(
-        checklist=entity.checklist,
+    engine = GateEngine.from_env()
+    decision = engine.evaluate_plan(
+        resolved.plan,
         entity_data=entity_data,
-        rules=gate.rules,
-        require_human_approval=gate.require_human_approval,
         risk_tier=risk_tier,
         human_approved=human_approved,
+        fail_fast=fail_fast,
     )
+    engine.close()
 
     # --- Audit Logging ---
-    logger = AuditLogger(Path("audit_log.jsonl"))
+    logger = AuditLogger.from_env(Path("audit_log.jsonl"))
     entry = AuditLogEntry(
         timestamp=AuditLogger.now_iso(),
         entity_type=entity_type,
@@ -251,9 +422,11 @@ def cmd_transition(
         reasons=decision.reasons,
         completeness_percent=decision.completeness.percent
         if decision.completeness
-        else None
+        else None,
+        cache_hit=decision.cache_hit,
         )
-    logger.log(entry)
+    with logger:
+        logger.log(entry)
 
     if decision.allowed:
         print(f"✅ Transition allowed: {entity_type} {from_state} -> {to_state}")
@@ -283,69 +456,558 @@ def cmd_apply_transition(
     entity_id: str,
     to_state: str,
     human_approved: bool,
+    fail_fast: bool = False,
 ) -> int:
-    spec = load_spec(spec_path)
-    if entity_type not in spec.entities:
-        print(f"Unknown entity type: {entity_type}. Known: {', '.join(spec.entities.keys())}")
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
         return 2
 
-    store = FileEntityStore(STORE_PATH)
+    store = open_store()
+    try:
+        try:
+            rec = store.require(entity_type, entity_id)
+        except StoreError as e:
+            print(f"❌ {e}")
+            return 1
+
+        entity = compiled.entities[entity_type]
+
+        from_state = rec.state
+        risk_tier = rec.risk_tier
+
+        try:
+            resolved = entity.resolve(from_state, to_state)
+        except TransitionError as e:
+            print(f"❌ {e}")
+            return 1
+
+        engine = GateEngine.from_env()
+        decision = engine.evaluate_plan(
+            resolved.plan,
+            entity_data=rec.data,
+            risk_tier=risk_tier,
+            human_approved=human_approved,
+            completeness=entity.checklist.result(entity.completeness_mask(rec)),
+            fail_fast=fail_fast,
+        )
+        engine.close()
+
+        # Audit
+        logger = AuditLogger.from_env(Path("audit_log.jsonl"))
+        entry = AuditLogEntry(
+            timestamp=AuditLogger.now_iso(),
+            entity_type=entity_type,
+            from_state=from_state,
+            to_state=to_state,
+            risk_tier=risk_tier,
+            human_approved=human_approved,
+            allowed=decision.allowed,
+            reasons=decision.reasons,
+            completeness_percent=decision.completeness.percent if decision.completeness else None,
+            cache_hit=decision.cache_hit,
+            entity_id=entity_id,
+        )
+        with logger:
+            logger.log(entry)
+
+        if not decision.allowed:
+            print(f"⛔ Transition blocked: {entity_type} {entity_id} {from_state} -> {to_state}")
+            for r in decision.reasons:
+                print(f"  - {r}")
+            return 1
+
+        # Apply state update; the gate ran without holding any lock, so only
+        # commit if nobody else changed the entity in the meantime.
+        rec.state = to_state
+        try:
+            store.upsert(rec, cas=True)
+        except ConcurrencyError as e:
+            print(f"❌ {e} Re-run the transition against the current state.")
+            return 1
+        print(f"✅ Transition applied: {entity_type} {entity_id} {from_state} -> {to_state}")
+        return 0
+    finally:
+        store.close()
+
+
+def cmd_path(
+    spec_path: Path, entity_type: str, entity_id: str, to_state: str, human_approved: bool
+) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
+
+    store = open_store()
     try:
         rec = store.require(entity_type, entity_id)
     except StoreError as e:
         print(f"❌ {e}")
         return 1
+    finally:
+        store.close()
+
+    engine = GateEngine.from_env()
+    try:
+        plan = plan_path(
+            compiled.entities[entity_type],
+            rec,
+            to_state,
+            human_approved=human_approved,
+            engine=engine,
+        )
+    except TransitionError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        engine.close()
+
+    if plan.hops is None:
+        print(f"⛔ No path: {entity_type} {entity_id} {rec.state} -> {to_state}")
+        return 1
+    if not plan.hops:
+        print(f"✅ {entity_type} {entity_id} is already in {to_state}")
+        return 0
+
+    print(f"{entity_type} {entity_id}: {rec.state} -> {to_state} ({len(plan.hops)} hops)")
+    for n, hop in enumerate(plan.hops, start=1):
+        mark = "✅ allowed" if hop.decision.allowed else "⛔ blocked"
+        print(f"  {n}. {hop.from_state} -> {hop.to_state}  {mark}")
+        for r in hop.decision.reasons:
+            print(f"     - {r}")
+        if hop.missing_items:
+            print(f"     Missing: {', '.join(hop.missing_items)}")
+    return 0 if not plan.blocked_hops else 1
+
+
+def cmd_apply_transitions(
+    spec_path: Path,
+    entity_type: str,
+    to_state: str,
+    entity_ids: list[str],
+    human_approved: bool,
+) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
+
+    store = open_store()
+    # One audit commit for the whole batch, whatever GUARDIAN_AUDIT_BUFFER says.
+    audit = AuditLogger.from_env(Path("audit_log.jsonl"))
+    batch = BatchTransitioner(compiled, store, audit)
+    try:
+        with audit:
+            report = batch.run(entity_type, entity_ids, to_state, human_approved=human_approved)
+    finally:
+        store.close()
+
+    for outcome in report.blocked:
+        print(f"⛔ {entity_type} {outcome.entity_id} {outcome.from_state or '?'} -> {to_state}")
+        for r in outcome.reasons:
+            print(f"  - {r}")
+    print(f"✅ applied: {len(report.allowed)}  ⛔ blocked: {len(report.blocked)}  (-> {to_state})")
+    if report.conflict:
+        print("❌ Transitions marked 'Not applied' hit a concurrent update; re-run them.")
+    return 0 if not report.blocked else 1
+
+
+def _summary_line(summary: EntitySummary) -> str:
+    return (
+        f"{summary.entity_type} {summary.entity_id}  "
+        f"state={summary.state}  risk={summary.risk_tier}"
+    )
+
+
+def cmd_list(
+    entity_type: Optional[str],
+    state: Optional[str],
+    risk_tier: Optional[str],
+    after: Optional[str],
+    limit: int,
+) -> int:
+    store = open_store()
+    last = None
+    count = 0
+    try:
+        for summary in store.query(
+            entity_type=entity_type, state=state, risk_tier=risk_tier, after=after, limit=limit
+        ):
+            print(_summary_line(summary))
+            last = summary
+            count += 1
+    finally:
+        store.close()
+
+    if last is not None and count == limit:
+        print(f"Next cursor: {last.key}")
+    return 0
+
+
+def cmd_range(
+    spec_path: Path, entity_type: str, from_id: str, to_id: str, limit: int, gaps: bool
+) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
+
+    ids = compiled.entities[entity_type].ids
+    try:
+        bounds = [numeric_id(ids.normalize(entity_type, i)) for i in (from_id, to_id)]
+    except IdentityError as e:
+        print(f"❌ {e}")
+        return 1
+    if None in bounds or bounds[0][0] != bounds[1][0]:
+        print(f"❌ {from_id} and {to_id} must share a prefix and end in a number.")
+        return 2
+    (prefix, start), (_, end) = bounds
+
+    store = open_store()
+    try:
+        if not gaps:
+            count = 0
+            for summary in store.id_range(entity_type, prefix, start=start, end=end, limit=limit):
+                print(_summary_line(summary))
+                count += 1
+            if count == limit:
+                print(f"... (stopped at --limit {limit})")
+            return 0
+
+        # Walk the numbers in order and report the holes between them.
+        missing = 0
+        shown = 0
+        expected = start
+        listed = store.id_range(entity_type, prefix, start=start, end=end)
+        numbers = (numeric_id(s.entity_id)[1] for s in listed)
+        for number in [*numbers, end + 1]:
+            if number > expected:
+                missing += number - expected
+                if shown < limit:
+                    last = number - 1
+                    span = f"{prefix}{expected}"
+                    if last != expected:
+                        span += f" .. {prefix}{last}"
+                    print(f"{span}  ({number - expected} missing)")
+                    shown += 1
+            expected = max(expected, number + 1)
+        print(f"{missing} of {end - start + 1} ids free in {prefix}{start} .. {prefix}{end}")
+        return 0
+    finally:
+        store.close()
+
+
+def cmd_next_id(spec_path: Path, entity_type: str) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
+
+    ids = compiled.entities[entity_type].ids
+    sample = ids.format_number(1)
+    split = numeric_id(sample) if sample is not None else None
+    if split is None:
+        print(f"❌ {entity_type} needs a canonical_format with one numeric field to allocate ids.")
+        return 2
+
+    store = open_store()
+    try:
+        last = store.last_number(entity_type, split[0])
+    finally:
+        store.close()
+    # Not reserved: create's compare-and-swap rejects it if someone takes it first.
+    print(ids.format_number((last or 0) + 1))
+    return 0
+
+
+def cmd_import(spec_path: Path, source: str, batch_size: int) -> int:
+    compiled = load_compiled_spec(spec_path)
+    store = open_store()
+    importer = EntityImporter(compiled, store, batch_size=batch_size)
+    try:
+        if source == "-":
+            report = importer.run(sys.stdin)
+        else:
+            with Path(source).open("r", encoding="utf-8") as f:
+                report = importer.run(f)
+    finally:
+        store.close()
+
+    for failure in report.failures:
+        print(f"❌ line {failure.line_no}: {failure.reason}")
+    print(
+        f"Imported: {report.created} created, {report.updated} updated, "
+        f"{len(report.failures)} failed"
+    )
+    return 0 if report.ok else 1
 
-    entity_spec = spec.entities[entity_type]
 
-    from_state = rec.state
-    risk_tier = rec.risk_tier
+def cmd_gate_report(
+    spec_path: Path,
+    entity_type: str,
+    from_state: str,
+    to_state: str,
+    human_approved: bool,
+    show: Optional[str],
+    limit: int,
+) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
 
+    entity = compiled.entities[entity_type]
     try:
-        resolved = resolve_transition(entity_spec, from_state, to_state)
+        resolved = entity.resolve(from_state, to_state)
     except TransitionError as e:
         print(f"❌ {e}")
         return 1
 
-    engine = GateEngine()
-    decision = engine.evaluate(
-        checklist=entity_spec.checklist,
-        entity_data=rec.data,
-        rules=resolved.gate.rules,
-        require_human_approval=resolved.gate.require_human_approval,
-        risk_tier=risk_tier,
+    store = open_store()
+    try:
+        listed = store.query(entity_type=entity_type, state=from_state)
+        keys = [(s.entity_type, s.entity_id) for s in listed]
+        found = store.get_many(keys)
+    finally:
+        store.close()
+    records = [found[k] for k in keys if k in found]
+
+    report = BulkGateEvaluator(resolved.plan).evaluate(
+        entity_data=[r.data for r in records],
+        risk_tiers=[r.risk_tier for r in records],
         human_approved=human_approved,
+        masks=[entity.completeness_mask(r).bits for r in records],
     )
 
-    # Audit
-    logger = AuditLogger(Path("audit_log.jsonl"))
-    entry = AuditLogEntry(
-        timestamp=AuditLogger.now_iso(),
+    print(f"Gate {entity_type} {from_state} -> {to_state}: {len(report)} entities in {from_state}")
+    print(f"  ✅ allowed: {report.allowed_count}")
+    print(f"  ⛔ blocked: {report.blocked_count}")
+
+    if show is not None:
+        want = show == "allowed"
+        shown = 0
+        for i, rec in enumerate(records):
+            if bool(report.allowed[i]) != want:
+                continue
+            if shown >= limit:
+                matching = report.allowed_count if want else report.blocked_count
+                print(f"  ... ({matching - shown} more)")
+                break
+            print(f"{rec.entity_id}  risk={rec.risk_tier}  completeness={int(report.percent[i])}%")
+            for r in report.decision(i).reasons:
+                print(f"  - {r}")
+            shown += 1
+    return 0
+
+
+def cmd_feed(after_seq: int, follow: bool) -> int:
+    cfg = get_store_config()
+    if cfg.feed_path is None:
+        print("❌ Change feed is disabled. Set GUARDIAN_CHANGE_FEED=<path> to enable it.")
+        return 2
+
+    feed = ChangeFeed(cfg.feed_path)
+    events = feed.follow(after_seq) if follow else feed.read(after_seq)
+    try:
+        for event in events:
+            print(json.dumps(asdict(event)), flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_audit_read(since: Optional[str], until: Optional[str]) -> int:
+    logger = AuditLogger.from_env(Path("audit_log.jsonl"))
+    try:
+        for entry in logger.read(since=since, until=until):
+            print(json.dumps(asdict(entry)))
+    except BrokenPipeError:
+        pass
+    return 0
+
+
+def cmd_audit_query(
+    entity_type: Optional[str],
+    entity_id: Optional[str],
+    opts: dict[str, str],
+) -> int:
+    logger = AuditLogger.from_env(Path("audit_log.jsonl"))
+    show = opts.get("--show")
+    limit = int(opts["--limit"]) if "--limit" in opts else None
+    entries = logger.query(
         entity_type=entity_type,
-        from_state=from_state,
-        to_state=to_state,
-        risk_tier=risk_tier,
-        human_approved=human_approved,
-        allowed=decision.allowed,
-        reasons=decision.reasons,
-        completeness_percent=decision.completeness.percent if decision.completeness else None,
+        entity_id=entity_id,
+        from_state=opts.get("--from"),
+        to_state=opts.get("--to"),
+        allowed=None if show is None else show == "allowed",
+        since=opts.get("--since"),
+        until=opts.get("--until"),
     )
-    logger.log(entry)
+    try:
+        for entry in islice(entries, limit):
+            print(json.dumps(asdict(entry)))
+    except BrokenPipeError:
+        pass
+    return 0
 
-    if not decision.allowed:
-        print(f"⛔ Transition blocked: {entity_type} {entity_id} {from_state} -> {to_state}")
-        for r in decision.reasons:
-            print(f"  - {r}")
+
+def cmd_audit_rotate() -> int:
+    logger = AuditLogger.from_env(Path("audit_log.jsonl"))
+    seq = logger.segments.rotate()
+    if seq is None:
+        print("Nothing to rotate: the active audit log is empty.")
+        return 0
+    print(f"✅ Rotated audit log into segment {seq:06d}")
+    return 0
+
+
+def cmd_stats(opts: dict[str, str], rebuild: bool) -> int:
+    rollups = AuditRollups(AuditSegments(Path("audit_log.jsonl")))
+    if rebuild:
+        read = rollups.rebuild()
+        print(f"✅ Rebuilt audit rollups from {read} log lines")
+
+    wanted = (opts.get("--type"), opts.get("--from"), opts.get("--to"), opts.get("--risk"))
+    shown = 0
+    for key, r in sorted(rollups.read().items()):
+        if any(w is not None and w != k for w, k in zip(wanted, key)):
+            continue
+        entity_type, from_state, to_state, risk_tier = key
+        print(
+            f"{entity_type} {from_state} -> {to_state} [{risk_tier}]: {r.attempts} attempts, "
+            f"✅ {r.allowed} allowed, ⛔ {r.blocked} blocked ({r.block_rate:.1%})"
+        )
+        for reason, count in r.reasons.most_common():
+            print(f"  - {count / r.attempts:.1%} of attempts: {reason}")
+        print("  completeness: " + ", ".join(f"{label}: {n}" for label, n in r.histogram()))
+        shown += 1
+    if not shown:
+        print("No audited transitions match.")
+
+    engine = GateEngine.from_env()
+    if engine.persistent is not None:
+        cached = engine.persistent.stats()
+        print(
+            f"Gate decision cache ({engine.persistent.path}): {cached.hits} hits, "
+            f"{cached.misses} misses ({cached.hit_rate:.1%} hit rate)"
+        )
+    engine.close()
+    return 0
+
+
+def cmd_export(out_dir: str, what: str, fmt: str, chunk_rows: int) -> int:
+    try:
+        exporter = ColumnarExporter(Path(out_dir), chunk_rows=chunk_rows, format=fmt)
+        if what in ("audit", "all"):
+            rows = exporter.export_audit(AuditSegments(Path("audit_log.jsonl")))
+            print(f"✅ Exported {rows} new audit entries to {out_dir}")
+        if what in ("entities", "all"):
+            store = open_store()
+            try:
+                rows = exporter.export_entities(store)
+            finally:
+                store.close()
+            print(f"✅ Exported a snapshot of {rows} entities to {out_dir}")
+    except (ExportError, StoreError) as e:
+        print(f"❌ {e}")
         return 1
+    return 0
+
 
-    # Apply state update
-    rec.state = to_state
-    store.upsert(rec)
-    print(f"✅ Transition applied: {entity_type} {entity_id} {from_state} -> {to_state}")
+def cmd_migrate_store(json_path: str, log_dir: str) -> int:
+    store = LogEntityStore(Path(log_dir))
+    try:
+        count = migrate_json_store(Path(json_path), store)
+    except StoreError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        store.close()
+
+    print(f"✅ Migrated {count} entities into {log_dir}")
     return 0
 
 
-def main() -> int:
+def cmd_reshard_store(json_path: str, shard_dir: str, shards: int) -> int:
+    try:
+        store = ShardedFileEntityStore(Path(shard_dir), shards=shards)
+    except StoreError as e:
+        print(f"❌ {e}")
+        return 1
+    try:
+        count = reshard_json_store(Path(json_path), store)
+    except StoreError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        store.close()
+
+    print(f"✅ Resharded {count} entities into {shard_dir} ({shards} shards per entity type)")
+    return 0
+
+
+def cmd_migrate_ids(
+    spec_path: Path, entity_type: str, checkpoint: Optional[str], batch_size: int
+) -> int:
+    compiled = load_compiled_spec(spec_path)
+    if entity_type not in compiled.entities:
+        print(f"Unknown entity type: {entity_type}. Known: {', '.join(compiled.entities.keys())}")
+        return 2
+    if compiled.entities[entity_type].spec.id.canonical_format is None:
+        print(f"❌ No canonical_format for {entity_type} ids in the spec; nothing to normalize to.")
+        return 2
+
+    cfg = get_store_config()
+    if checkpoint:
+        checkpoint_path = Path(checkpoint)
+    else:
+        checkpoint_path = cfg.path.with_name(f"{cfg.path.name}.migrate-ids-{entity_type}.json")
+    resuming = checkpoint_path.exists()
+    store = open_store(cfg)
+    migration = IdMigration(
+        store,
+        compiled.entities[entity_type].ids,
+        entity_type,
+        checkpoint=checkpoint_path,
+        audit_path=Path("audit_log.jsonl"),
+        batch_size=batch_size,
+    )
+    try:
+        state = migration.run()
+    except (StoreError, OSError) as e:
+        print(f"❌ {e}")
+        print(f"Progress is saved in {checkpoint_path}; re-run the command to resume.")
+        return 1
+    finally:
+        store.close()
+
+    if resuming:
+        print(f"Resumed from {checkpoint_path}")
+    print(
+        f"✅ Migrated {state.migrated} {entity_type} ids to canonical form "
+        f"({state.scanned} scanned, {state.audit_rewritten} audit entries rewritten)"
+    )
+    for legacy_id in state.conflicts:
+        print(f"⚠️ Kept {legacy_id}: its canonical id already exists")
+    for legacy_id in state.changed:
+        print(f"⚠️ Kept {legacy_id}: it was updated during the migration; re-run to move it")
+    return 0 if not state.conflicts and not state.changed else 1
+
+
+def _parse_options(args: list[str], known: tuple[str, ...]) -> Optional[dict[str, str]]:
+    """Parse `--name value` pairs; returns None on unknown or dangling options."""
+    opts: dict[str, str] = {}
+    i = 0
+    while i < len(args):
+        if args[i] not in known or i + 1 >= len(args):
+            return None
+        opts[args[i]] = args[i + 1]
+        i += 2
+    return opts
+
+
+def _main() -> int:
     if len(sys.argv) < 2:
         usage()
         return 2
@@ -353,6 +1015,12 @@ def main() -> int:
     spec_path = Path("guardian_spec.yaml")
     cmd = sys.argv[1]
 
+    try:
+        load_rule_plugins(os.getenv("GUARDIAN_RULE_PLUGINS", "").split(","))
+    except RuleError as e:
+        print(f"❌ {e}")
+        return 2
+
     if cmd == "ai-review":
         if len(sys.argv) != 3:
             usage()
@@ -371,12 +1039,18 @@ def main() -> int:
             return 2
         return cmd_validate_id(spec_path, sys.argv[2], sys.argv[3])
 
+    if cmd == "validate-ids":
+        if len(sys.argv) != 4:
+            usage()
+            return 2
+        return cmd_validate_ids(spec_path, sys.argv[2], sys.argv[3])
+
     if cmd == "completeness":
         if len(sys.argv) != 4:
             usage()
             return 2
         return cmd_completeness(spec_path, sys.argv[2], sys.argv[3])
-    
+
     if cmd == "create":
         if len(sys.argv) != 6:
             usage()
@@ -389,12 +1063,202 @@ def main() -> int:
             return 2
         return cmd_show(spec_path, sys.argv[2], sys.argv[3])
 
+    if cmd == "update":
+        if len(sys.argv) != 5:
+            usage()
+            return 2
+        return cmd_update(spec_path, sys.argv[2], sys.argv[3], sys.argv[4])
+
     if cmd == "apply-transition":
         if len(sys.argv) < 5:
             usage()
             return 2
         human_approved = "--human-approved" in sys.argv[5:]
-        return cmd_apply_transition(spec_path, sys.argv[2], sys.argv[3], sys.argv[4], human_approved)
+        fail_fast = "--fail-fast" in sys.argv[5:]
+        return cmd_apply_transition(
+            spec_path, sys.argv[2], sys.argv[3], sys.argv[4], human_approved, fail_fast
+        )
+
+    if cmd == "path":
+        if len(sys.argv) < 5 or any(a != "--human-approved" for a in sys.argv[5:]):
+            usage()
+            return 2
+        human_approved = "--human-approved" in sys.argv[5:]
+        return cmd_path(spec_path, sys.argv[2], sys.argv[3], sys.argv[4], human_approved)
+
+    if cmd == "apply-transitions":
+        human_approved = "--human-approved" in sys.argv[4:]
+        opts = _parse_options(
+            [a for a in sys.argv[4:] if a != "--human-approved"],
+            ("--ids", "--file", "--state", "--risk"),
+        )
+        sources = [o for o in ("--ids", "--file", "--state") if opts and o in opts]
+        if len(sys.argv) < 4 or opts is None or len(sources) != 1:
+            usage()
+            return 2
+        entity_type = sys.argv[2]
+        if "--ids" in opts:
+            entity_ids = [i for i in opts["--ids"].split(",") if i]
+        elif "--file" in opts:
+            source = opts["--file"]
+            lines = sys.stdin.read() if source == "-" else Path(source).read_text(encoding="utf-8")
+            entity_ids = [line.strip() for line in lines.splitlines() if line.strip()]
+        else:
+            store = open_store()
+            try:
+                listed = store.query(
+                    entity_type=entity_type, state=opts["--state"], risk_tier=opts.get("--risk")
+                )
+                entity_ids = [s.entity_id for s in listed]
+            finally:
+                store.close()
+        return cmd_apply_transitions(
+            spec_path, entity_type, sys.argv[3], entity_ids, human_approved
+        )
+
+    if cmd == "list":
+        opts = _parse_options(sys.argv[2:], ("--type", "--state", "--risk", "--after", "--limit"))
+        if opts is None or not opts.get("--limit", "50").isdigit():
+            usage()
+            return 2
+        return cmd_list(
+            opts.get("--type"),
+            opts.get("--state"),
+            opts.get("--risk"),
+            opts.get("--after"),
+            int(opts.get("--limit", "50")),
+        )
+
+    if cmd == "range":
+        args = [a for a in sys.argv[2:] if a != "--gaps"]
+        opts = _parse_options(args[3:], ("--limit",))
+        if len(args) < 3 or opts is None or not opts.get("--limit", "50").isdigit():
+            usage()
+            return 2
+        limit = int(opts.get("--limit", "50"))
+        gaps = "--gaps" in sys.argv[2:]
+        return cmd_range(spec_path, args[0], args[1], args[2], limit, gaps)
+
+    if cmd == "next-id":
+        if len(sys.argv) != 3:
+            usage()
+            return 2
+        return cmd_next_id(spec_path, sys.argv[2])
+
+    if cmd == "import":
+        opts = _parse_options(sys.argv[3:], ("--batch-size",))
+        if len(sys.argv) < 3 or opts is None or not opts.get("--batch-size", "1000").isdigit():
+            usage()
+            return 2
+        return cmd_import(spec_path, sys.argv[2], int(opts.get("--batch-size", "1000")))
+
+    if cmd == "gate-report":
+        human_approved = "--human-approved" in sys.argv[5:]
+        opts = _parse_options(
+            [a for a in sys.argv[5:] if a != "--human-approved"], ("--show", "--limit")
+        )
+        if (
+            len(sys.argv) < 5
+            or opts is None
+            or opts.get("--show", "allowed") not in ("allowed", "blocked")
+            or not opts.get("--limit", "50").isdigit()
+        ):
+            usage()
+            return 2
+        return cmd_gate_report(
+            spec_path,
+            sys.argv[2],
+            sys.argv[3],
+            sys.argv[4],
+            human_approved,
+            opts.get("--show"),
+            int(opts.get("--limit", "50")),
+        )
+
+    if cmd == "feed":
+        follow = "--follow" in sys.argv[2:]
+        opts = _parse_options([a for a in sys.argv[2:] if a != "--follow"], ("--after",))
+        if opts is None or not opts.get("--after", "0").isdigit():
+            usage()
+            return 2
+        return cmd_feed(int(opts.get("--after", "0")), follow)
+
+    if cmd == "audit":
+        sub = sys.argv[2] if len(sys.argv) > 2 else ""
+        if sub == "read":
+            opts = _parse_options(sys.argv[3:], ("--since", "--until"))
+            if opts is None:
+                usage()
+                return 2
+            return cmd_audit_read(opts.get("--since"), opts.get("--until"))
+        if sub == "query":
+            positional = []
+            rest = sys.argv[3:]
+            while rest and not rest[0].startswith("--") and len(positional) < 2:
+                positional.append(rest.pop(0))
+            opts = _parse_options(
+                rest, ("--from", "--to", "--show", "--since", "--until", "--limit")
+            )
+            if (
+                opts is None
+                or opts.get("--show", "allowed") not in ("allowed", "blocked")
+                or not opts.get("--limit", "0").isdigit()
+            ):
+                usage()
+                return 2
+            return cmd_audit_query(*(positional + [None, None])[:2], opts)
+        if sub == "rotate" and len(sys.argv) == 3:
+            return cmd_audit_rotate()
+        usage()
+        return 2
+
+    if cmd == "stats":
+        rebuild = "--rebuild" in sys.argv[2:]
+        opts = _parse_options(
+            [a for a in sys.argv[2:] if a != "--rebuild"], ("--type", "--from", "--to", "--risk")
+        )
+        if opts is None:
+            usage()
+            return 2
+        return cmd_stats(opts, rebuild)
+
+    if cmd == "export":
+        opts = _parse_options(sys.argv[3:], ("--what", "--format", "--chunk-rows"))
+        if (
+            len(sys.argv) < 3
+            or opts is None
+            or opts.get("--what", "all") not in ("audit", "entities", "all")
+            or not opts.get("--chunk-rows", "1").isdigit()
+        ):
+            usage()
+            return 2
+        return cmd_export(
+            sys.argv[2],
+            opts.get("--what", "all"),
+            opts.get("--format", "npz"),
+            int(opts.get("--chunk-rows", "65536")),
+        )
+
+    if cmd == "migrate-store":
+        if len(sys.argv) != 4:
+            usage()
+            return 2
+        return cmd_migrate_store(sys.argv[2], sys.argv[3])
+
+    if cmd == "migrate-ids":
+        opts = _parse_options(sys.argv[3:], ("--checkpoint", "--batch"))
+        if len(sys.argv) < 3 or opts is None or not opts.get("--batch", "500").isdigit():
+            usage()
+            return 2
+        batch_size = int(opts.get("--batch", "500"))
+        return cmd_migrate_ids(spec_path, sys.argv[2], opts.get("--checkpoint"), batch_size)
+
+    if cmd == "reshard-store":
+        opts = _parse_options(sys.argv[4:], ("--shards",))
+        if len(sys.argv) < 4 or opts is None or not opts.get("--shards", "16").isdigit():
+            usage()
+            return 2
+        return cmd_reshard_store(sys.argv[2], sys.argv[3], int(opts.get("--shards", "16")))
 
     if cmd == "run-pipeline":
         if len(sys.argv) != 4:
@@ -402,7 +1266,9 @@ def main() -> int:
             return 2
         pack_path = Path(sys.argv[2])
         task = sys.argv[3]
-        run_dir = run_pipeline(project_pack_path=pack_path, task=task, agent_registry=default_registry())
+        run_dir = run_pipeline(
+            project_pack_path=pack_path, task=task, agent_registry=default_registry()
+        )
         print(f"✅ Pipeline completed. Run dir: {run_dir}")
         return 0
 
@@ -419,6 +1285,7 @@ def main() -> int:
         risk_tier = sys.argv[5]
         json_payload = sys.argv[6]
         human_approved = "--human-approved" in sys.argv[7:]
+        fail_fast = "--fail-fast" in sys.argv[7:]
 
 
         return cmd_transition(
@@ -428,12 +1295,22 @@ def main() -> int:
             to_state,
             risk_tier,
             json_payload,
-             human_approved, )
+             human_approved,
+             fail_fast, )
 
 
     usage()
     return 2
 
 
+def main() -> int:
+    try:
+        return _main()
+    except StoreError as e:
+        # e.g. an unknown GUARDIAN_STORE_BACKEND or a layout mismatch from open_store()
+        print(f"❌ {e}")
+        return 1
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
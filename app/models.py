@@ -1,16 +1,25 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field, ConfigDict
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
 
 class IdSpec(BaseModel):
     canonical_regex: str
     legacy_regexes: List[str] = []
+    # str.format template over the legacy patterns' named groups that builds
+    # the canonical ID, e.g. "TCKT-{num}". None = legacy IDs are only flagged.
+    canonical_format: Optional[str] = None
     examples: List[str] = []
 
 class GateRule(BaseModel):
     type: str
     percent: Optional[int] = None
+    expr: Optional[str] = None  # type: expr
+
+    # Custom rule types (see app.engine.rules) take their own parameters.
+    model_config = ConfigDict(extra="allow")
 
 class GateSpec(BaseModel):
     require_human_approval: bool | str
@@ -26,10 +35,33 @@ class TransitionSpec(BaseModel):
 class EntitySpec(BaseModel):
     id: IdSpec
     checklist: List[str]
+    # Checklist item -> predicate expression. In YAML, write the item as
+    # `- item_name: "<expression>"`; plain `- item_name` items stay truthy lookups.
+    checklist_expressions: Dict[str, str] = {}
     states: List[str]
     transitions: List[TransitionSpec]
 
+    @model_validator(mode="before")
+    @classmethod
+    def _split_checklist_expressions(cls, raw: Any) -> Any:
+        if not isinstance(raw, dict) or not isinstance(raw.get("checklist"), list):
+            return raw
+        names: List[Any] = []
+        expressions = dict(raw.get("checklist_expressions") or {})
+        for entry in raw["checklist"]:
+            if isinstance(entry, dict):
+                if len(entry) != 1:
+                    raise ValueError(
+                        f"Checklist entry must map one item name to an expression: {entry}"
+                    )
+                (name, expression), = entry.items()
+                names.append(name)
+                expressions[name] = expression
+            else:
+                names.append(entry)
+        return {**raw, "checklist": names, "checklist_expressions": expressions}
+
 class GuardianSpec(BaseModel):
     risk_tiers: List[str]
     entities: Dict[str, EntitySpec]
-    rules: Dict[str, Dict[str, Any]] = {}
\ No newline at end of file
+    rules: Dict[str, Dict[str, Any]] = {}
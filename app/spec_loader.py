@@ -1,13 +1,85 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import os
+import pickle
+import sys
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import pydantic
 import yaml
 
+from app.engine.compiled_spec import CompiledSpec, compile_spec
+from app.engine.locking import atomic_write_bytes
 from app.models import GuardianSpec
 
+# Bump when CompiledSpec/GuardianSpec change shape so stale caches are ignored.
+SPEC_CACHE_FORMAT = 3
+
+
 def load_spec(spec_path: str | Path) -> GuardianSpec:
     path = Path(spec_path)
     raw: Dict[str, Any] = yaml.safe_load(path.read_text(encoding="utf-8"))
     return GuardianSpec.model_validate(raw)
+
+
+def spec_cache_path(spec_path: str | Path) -> Path:
+    path = Path(spec_path)
+    return path.with_name(f".{path.name}.cache")
+
+
+def _cache_key(content: bytes) -> Dict[str, Any]:
+    return {
+        "format": SPEC_CACHE_FORMAT,
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "python": list(sys.version_info[:2]),
+        "pydantic": pydantic.VERSION,
+        "yaml": yaml.__version__,
+    }
+
+
+def _read_cache(cache_path: Path, key: Dict[str, Any]) -> Optional[CompiledSpec]:
+    try:
+        with cache_path.open("rb") as f:
+            if pickle.load(f) != key:
+                return None
+            compiled = pickle.load(f)
+    except Exception:
+        # Missing, truncated or written by incompatible code: rebuild.
+        return None
+    return compiled if isinstance(compiled, CompiledSpec) else None
+
+
+def load_compiled_spec(spec_path: str | Path, *, use_cache: Optional[bool] = None) -> CompiledSpec:
+    """
+    Load and compile the spec, reusing a pickled CompiledSpec stored next to the
+    spec file (.<name>.cache) when it was built from byte-identical YAML with
+    the same Python/pydantic/PyYAML versions. A cache hit skips YAML parsing and
+    pydantic validation; any mismatch or unreadable cache falls back to a full
+    load and rewrites the cache. GUARDIAN_SPEC_CACHE=0 disables it.
+    """
+    if use_cache is None:
+        use_cache = os.getenv("GUARDIAN_SPEC_CACHE", "1") != "0"
+
+    path = Path(spec_path)
+    content = path.read_bytes()
+    if not use_cache:
+        return compile_spec(GuardianSpec.model_validate(yaml.safe_load(content)))
+
+    cache_path = spec_cache_path(path)
+    key = _cache_key(content)
+    compiled = _read_cache(cache_path, key)
+    if compiled is not None:
+        return compiled
+
+    compiled = compile_spec(GuardianSpec.model_validate(yaml.safe_load(content)))
+    buf = io.BytesIO()
+    pickle.dump(key, buf, protocol=pickle.HIGHEST_PROTOCOL)
+    pickle.dump(compiled, buf, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        atomic_write_bytes(cache_path, buf.getvalue())
+    except OSError:
+        pass  # read-only checkout: still correct, just uncached
+    return compiled
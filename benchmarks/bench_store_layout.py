@@ -0,0 +1,85 @@
+"""
+Compare single-record upsert latency of the single-file and hash-sharded
+FileEntityStore layouts.
+
+    python -m benchmarks.bench_store_layout            # 10k, 100k, 1M records
+    python -m benchmarks.bench_store_layout 10000 --writes 50 --shards 64
+
+Each size seeds both layouts with one bulk write, then times `--writes`
+individual upserts of random existing entities.
+"""
+from __future__ import annotations
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.engine.sharded_store import ShardedFileEntityStore
+from app.engine.store import EntityRecord, EntityStore, FileEntityStore
+
+
+def _records(n: int) -> list[EntityRecord]:
+    tiers = ("low", "medium", "high")
+    return [
+        EntityRecord(
+            entity_type="Ticket",
+            entity_id=f"TCKT-{i}",
+            risk_tier=tiers[i % 3],
+            state="Draft",
+            data={"has_title": True, "has_acceptance_criteria": i % 2 == 0},
+        )
+        for i in range(n)
+    ]
+
+
+def _time_writes(store: EntityStore, n: int, writes: int) -> list[float]:
+    rng = random.Random(1234)
+    samples = []
+    for _ in range(writes):
+        entity_id = f"TCKT-{rng.randrange(n)}"
+        rec = EntityRecord("Ticket", entity_id, "low", "Planned", {"has_title": True})
+        start = time.perf_counter()
+        store.upsert(rec)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"  {label:<14} median {statistics.median(samples):9.2f} ms   p95 {p95:9.2f} ms")
+
+
+def main(argv: list[str]) -> int:
+    sizes: list[int] = []
+    writes = 20
+    shards = 16
+    args = iter(argv)
+    for arg in args:
+        if arg == "--writes":
+            writes = int(next(args))
+        elif arg == "--shards":
+            shards = int(next(args))
+        else:
+            sizes.append(int(arg))
+    sizes = sizes or [10_000, 100_000, 1_000_000]
+
+    for n in sizes:
+        print(f"{n:,} records, {writes} single upserts, {shards} shards")
+        records = _records(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            single = FileEntityStore(Path(tmp) / "entities.json")
+            single.upsert_many(records)
+            _report("single-file", _time_writes(single, n, writes))
+
+            sharded = ShardedFileEntityStore(Path(tmp) / "shards", shards=shards)
+            sharded.upsert_many(records)
+            _report("sharded", _time_writes(sharded, n, writes))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,7 +1,10 @@
 import json
+import os
 from pathlib import Path
 
-from app.engine.audit import AuditLogger, AuditLogEntry
+import pytest
+
+from app.engine.audit import AuditLogEntry, AuditLogger
 
 
 def test_audit_logger_writes_entry(tmp_path: Path):
@@ -19,7 +22,7 @@ def test_audit_logger_writes_entry(tmp_path: Path):
         reasons=(),
         completeness_percent=100,
     )
-    
+
     logger.log(entry)
 
     content = log_path.read_text().strip()
@@ -27,4 +30,100 @@ def test_audit_logger_writes_entry(tmp_path: Path):
 
     assert record["entity_type"] =="Ticket"
     assert record["allowed"] is True
-    assert record["completeness_percent"] == 100
\ No newline at end of file
+    assert record["completeness_percent"] == 100
+
+def test_audit_logger_log_many_appends_in_order(tmp_path: Path):
+    log_path = tmp_path / "audit.jsonl"
+    logger = AuditLogger(log_path)
+    entries = [
+        AuditLogEntry(
+            timestamp="2024-01-01T00:00:00Z",
+            entity_type="Ticket",
+            from_state="Draft",
+            to_state=to_state,
+            risk_tier="low",
+            human_approved=False,
+            allowed=False,
+            reasons=("nope",),
+            completeness_percent=None,
+        )
+        for to_state in ("Planned", "Done")
+    ]
+
+    logger.log_many(entries)
+    logger.log_many([])
+
+    rows = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [r["to_state"] for r in rows] == ["Planned", "Done"]
+    assert rows[0]["reasons"] == ["nope"]
+
+
+def _entry(to_state: str = "Planned") -> AuditLogEntry:
+    return AuditLogEntry(
+        timestamp="2024-01-01T00:00:00Z",
+        entity_type="Ticket",
+        from_state="Draft",
+        to_state=to_state,
+        risk_tier="low",
+        human_approved=False,
+        allowed=True,
+        reasons=(),
+        completeness_percent=100,
+    )
+
+
+def test_buffered_logger_commits_in_groups(tmp_path: Path, monkeypatch):
+    log_path = tmp_path / "audit.jsonl"
+    writes = []
+    real_write = os.write
+    monkeypatch.setattr(
+        os, "write", lambda fd, data: writes.append(len(data)) or real_write(fd, data)
+    )
+
+    with AuditLogger(log_path, buffered=True, flush_entries=3, flush_interval=60) as logger:
+        for i in range(7):
+            logger.log(_entry(f"S{i}"))
+        assert len(log_path.read_text().splitlines()) == 6  # two full groups written
+
+    assert len(writes) == 3
+    rows = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [r["to_state"] for r in rows] == [f"S{i}" for i in range(7)]
+
+
+def test_context_manager_holds_unbuffered_entries_until_exit(tmp_path: Path):
+    log_path = tmp_path / "audit.jsonl"
+    logger = AuditLogger(log_path)
+    with logger:
+        logger.log(_entry())
+        logger.log(_entry("Done"))
+        assert not log_path.exists()
+    assert len(log_path.read_text().splitlines()) == 2
+
+
+def test_fsync_policies(tmp_path: Path, monkeypatch):
+    syncs = []
+    monkeypatch.setattr(os, "fsync", syncs.append)
+
+    with AuditLogger(
+        tmp_path / "a.jsonl", buffered=True, fsync="batch", flush_entries=10
+    ) as logger:
+        logger.log_many([_entry()] * 25)
+    assert len(syncs) == 1  # one group of 25 queued at once
+
+    syncs.clear()
+    AuditLogger(tmp_path / "b.jsonl", fsync="entry").log_many([_entry()] * 4)
+    assert len(syncs) == 4
+
+    with pytest.raises(ValueError):
+        AuditLogger(tmp_path / "c.jsonl", fsync="sometimes")
+
+
+def test_torn_tail_is_terminated_before_appending(tmp_path: Path):
+    log_path = tmp_path / "audit.jsonl"
+    log_path.write_text('{"entity_type": "Ticket"}\n{"entity_ty', encoding="utf-8")
+
+    AuditLogger(log_path).log(_entry())
+
+    lines = log_path.read_text().splitlines()
+    assert lines[1] == '{"entity_ty'
+    assert json.loads(lines[2])["to_state"] == "Planned"
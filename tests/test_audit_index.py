@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+from app.engine.audit import AuditLogEntry, AuditLogger
+
+
+def _entry(
+    i: int, entity_id: str, *, allowed: bool = True, to_state: str = "Planned"
+) -> AuditLogEntry:
+    return AuditLogEntry(
+        timestamp=f"2026-10-01T{i // 60:02d}:{i % 60:02d}:00+00:00",
+        entity_type="Ticket",
+        from_state="Draft",
+        to_state=to_state,
+        risk_tier="low",
+        human_approved=False,
+        allowed=allowed,
+        reasons=(),
+        completeness_percent=100,
+        entity_id=entity_id,
+    )
+
+
+def test_entity_history_survives_rotation_and_compression(tmp_path: Path):
+    logger = AuditLogger(tmp_path / "audit_log.jsonl", segment_bytes=4000)
+    for i in range(200):
+        logger.log(_entry(i, f"TCKT-{i % 20}"))
+
+    assert len(logger.segments.segments()) >= 3
+    history = list(logger.query(entity_type="Ticket", entity_id="TCKT-7"))
+    assert [e.timestamp for e in history] == [_entry(i, "x").timestamp for i in range(7, 200, 20)]
+    assert all(e.entity_id == "TCKT-7" for e in history)
+
+
+def test_catch_up_reads_only_new_lines(tmp_path: Path):
+    logger = AuditLogger(tmp_path / "audit_log.jsonl")
+    logger.log_many([_entry(i, "TCKT-1") for i in range(50)])
+
+    assert logger.index.catch_up() == 0  # already indexed by the write
+    logger.log(_entry(50, "TCKT-2"))
+    with (tmp_path / "audit_log.jsonl").open("a") as f:
+        f.write(json.dumps({"entity_type": "Ticket", "entity_id": "TCKT-2"}))  # torn tail
+    assert logger.index.catch_up() == 0
+    assert [e.timestamp for e in logger.query(entity_type="Ticket", entity_id="TCKT-2")] == [
+        _entry(50, "x").timestamp
+    ]
+
+
+def test_index_is_rebuilt_when_the_log_is_replaced(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    logger = AuditLogger(path)
+    logger.log_many([_entry(i, "TCKT-1") for i in range(10)])
+    path.unlink()
+    logger.log(_entry(99, "TCKT-9"))
+
+    assert list(logger.query(entity_type="Ticket", entity_id="TCKT-1")) == []
+    assert [e.entity_id for e in logger.query(entity_type="Ticket")] == ["TCKT-9"]
+
+
+def test_query_filters_with_and_without_index(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    entries = [
+        _entry(0, "TCKT-1", allowed=False),
+        _entry(1, "TCKT-1", to_state="Done"),
+        _entry(2, "TCKT-2"),
+        _entry(3, "TCKT-1"),
+    ]
+    AuditLogger(path).log_many(entries)
+
+    for logger in (AuditLogger(path), AuditLogger(path, index=False)):
+        assert list(
+            logger.query(entity_type="Ticket", entity_id="TCKT-1", allowed=True, to_state="Planned")
+        ) == [entries[3]]
+        assert list(logger.query(allowed=False)) == [entries[0]]
+        assert list(
+            logger.query(
+                entity_type="Ticket", since=entries[1].timestamp, until=entries[2].timestamp
+            )
+        ) == [
+            entries[1],
+            entries[2],
+        ]
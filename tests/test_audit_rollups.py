@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from app.engine.audit import AuditLogEntry, AuditLogger
+from app.engine.audit_rollups import completeness_bucket, reason_kind
+
+
+def _entry(allowed: bool, risk_tier: str = "low", percent=40, reasons=()) -> AuditLogEntry:
+    return AuditLogEntry(
+        timestamp=AuditLogger.now_iso(),
+        entity_type="Ticket",
+        from_state="Draft",
+        to_state="Planned",
+        risk_tier=risk_tier,
+        human_approved=False,
+        allowed=allowed,
+        reasons=tuple(reasons),
+        completeness_percent=percent,
+        entity_id="TCKT-1",
+    )
+
+
+BELOW = ("Completeness 33% is below required 60%.", "Human approval required but not provided.")
+
+
+def test_helpers():
+    assert (
+        reason_kind("Completeness 7% is below required 60%.")
+        == "Completeness #% is below required #%."
+    )
+    buckets = [completeness_bucket(p) for p in (0, 9, 10, 99, 100, None)]
+    assert buckets == ["0", "0", "10", "90", "100", "none"]
+
+
+def test_rollups_count_per_transition_and_tier(tmp_path: Path):
+    logger = AuditLogger(tmp_path / "audit_log.jsonl")
+    logger.log_many([_entry(False, reasons=BELOW[:1], percent=33)] * 3)
+    logger.log(_entry(False, reasons=BELOW, percent=5))
+    logger.log(_entry(True, percent=100))
+    logger.log(_entry(True, risk_tier="high", percent=None))
+
+    rollups = logger.rollups.read()
+    low = rollups[("Ticket", "Draft", "Planned", "low")]
+    assert (low.attempts, low.allowed, low.blocked) == (5, 1, 4)
+    assert low.block_rate == 0.8
+    assert low.reasons == {
+        "Completeness #% is below required #%.": 4,
+        "Human approval required but not provided.": 1,
+    }
+    assert low.histogram() == [("0-9%", 1), ("30-39%", 3), ("100%", 1)]
+    assert rollups[("Ticket", "Draft", "Planned", "high")].histogram() == [("n/a", 1)]
+
+
+def test_rollups_are_incremental_across_rotation(tmp_path: Path):
+    logger = AuditLogger(tmp_path / "audit_log.jsonl", segment_bytes=2000)
+    for i in range(30):
+        logger.log(_entry(i % 3 == 0))
+
+    assert logger.segments.segments()
+    assert logger.rollups.catch_up() == 0  # nothing new since the last write
+    low = logger.rollups.read()[("Ticket", "Draft", "Planned", "low")]
+    assert (low.allowed, low.blocked) == (10, 20)
+
+    assert logger.rollups.rebuild() == 30
+    assert logger.rollups.read()[("Ticket", "Draft", "Planned", "low")] == low
+
+
+def test_lost_or_stale_sidecar_is_rebuilt(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    logger = AuditLogger(path)
+    logger.log_many([_entry(False, reasons=BELOW)] * 4)
+
+    logger.rollups.path.write_text("")  # e.g. torn by a crash
+    logger.log(_entry(True))
+    assert logger.rollups.read()[("Ticket", "Draft", "Planned", "low")].attempts == 5
+
+    path.unlink()  # log replaced: the saved position is past its end
+    logger.log(_entry(True))
+    assert logger.rollups.read()[("Ticket", "Draft", "Planned", "low")].attempts == 1
@@ -0,0 +1,114 @@
+import gzip
+import json
+from pathlib import Path
+
+from app.engine import audit_segments
+from app.engine.audit import AuditLogEntry, AuditLogger
+from app.engine.audit_segments import AuditSegments
+
+
+def _entry(ts: str, to_state: str = "Planned") -> AuditLogEntry:
+    return AuditLogEntry(
+        timestamp=ts,
+        entity_type="Ticket",
+        from_state="Draft",
+        to_state=to_state,
+        risk_tier="low",
+        human_approved=False,
+        allowed=True,
+        reasons=(),
+        completeness_percent=100,
+    )
+
+
+def _hours(n: int, per_hour: int = 5) -> list[AuditLogEntry]:
+    return [
+        _entry(f"2026-10-01T{h:02d}:{m:02d}:00+00:00", f"S{h}-{m}")
+        for h in range(n)
+        for m in range(per_hour)
+    ]
+
+
+def test_rotation_compresses_segments_and_reads_transparently(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    logger = AuditLogger(path, segment_bytes=2000)
+    entries = _hours(6)
+    for e in entries:
+        logger.log(e)
+
+    segments = logger.segments.segments()
+    assert len(segments) >= 2
+    assert all((tmp_path / f"audit_log.jsonl.{s:06d}.gz").exists() for s in segments)
+    assert not (tmp_path / f"audit_log.jsonl.{segments[0]:06d}").exists()  # raw removed
+
+    assert list(logger.read()) == entries
+    # A closed segment is still one readable gzip file.
+    first = gzip.decompress((tmp_path / f"audit_log.jsonl.{segments[0]:06d}.gz").read_bytes())
+    assert json.loads(first.splitlines()[0])["to_state"] == "S0-0"
+
+
+def test_time_window_only_decompresses_matching_blocks(tmp_path: Path, monkeypatch):
+    path = tmp_path / "audit_log.jsonl"
+    logger = AuditLogger(path)
+    logger.log_many(_hours(24))
+    logger.segments.rotate()
+
+    blocks = logger.segments.index(1)
+    assert len(blocks) == 24  # one block per hour bucket
+    assert blocks[3].first_ts == "2026-10-01T03:00:00+00:00"
+
+    calls = []
+    real = audit_segments.gzip.decompress
+    monkeypatch.setattr(
+        audit_segments.gzip, "decompress", lambda data: calls.append(1) or real(data)
+    )
+
+    got = list(logger.read(since="2026-10-01T05:00", until="2026-10-01T06:59"))
+    assert [e.to_state for e in got] == [f"S{h}-{m}" for h in (5, 6) for m in range(5)]
+    assert len(calls) == 2
+
+
+def test_stale_index_is_rebuilt_from_members(tmp_path: Path):
+    segments = AuditSegments(tmp_path / "audit_log.jsonl", block_bytes=300)
+    path = tmp_path / "audit_log.jsonl"
+    AuditLogger(path).log_many(_hours(2))
+    segments.rotate()
+    expected = segments.index(1)
+
+    (tmp_path / "audit_log.jsonl.000001.idx").write_text('{"size": 1, "blocks": []}')
+    assert segments.index(1) == expected
+    (tmp_path / "audit_log.jsonl.000001.idx").unlink()
+    assert segments.index(1) == expected
+
+
+def test_raw_segment_left_by_crash_is_read_and_compressed(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    AuditLogger(path).log_many(_hours(1))
+    path.rename(tmp_path / "audit_log.jsonl.000001")  # rotated, never compressed
+    logger = AuditLogger(path)
+    logger.log(_entry("2026-10-02T00:00:00+00:00", "later"))
+
+    assert [e.to_state for e in logger.read()][-2:] == ["S0-4", "later"]
+    logger.segments.compress_pending()
+    assert (tmp_path / "audit_log.jsonl.000001.gz").exists()
+    assert len(list(logger.read())) == 6
+
+
+def test_buffered_writer_follows_rotation(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    with AuditLogger(path, buffered=True, flush_entries=1) as logger:
+        logger.log(_entry("2026-10-01T00:00:00+00:00", "before"))
+        AuditSegments(path).rotate()  # e.g. another process
+        logger.log(_entry("2026-10-01T00:00:01+00:00", "after"))
+
+    assert json.loads(path.read_text())["to_state"] == "after"
+    assert [e.to_state for e in logger.read()] == ["before", "after"]
+
+
+def test_age_based_rotation(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    logger = AuditLogger(path, segment_age=3600)
+    logger.log(_entry("2000-01-01T00:00:00+00:00"))  # first entry long ago
+    assert logger.segments.segments() == [1]
+    logger.log(_entry(AuditLogger.now_iso()))
+    assert logger.segments.segments() == [1]
@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+from app.engine.audit import AuditLogger
+from app.engine.batch_transitions import BatchTransitioner
+from app.engine.compiled_spec import compile_spec
+from app.engine.sharded_store import ShardedFileEntityStore, shard_of
+from app.engine.store import EntityRecord, FileEntityStore
+from app.spec_loader import load_spec
+
+FULL = {"has_title": True, "has_acceptance_criteria": True, "has_risk_tier": True}
+
+
+def _setup(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json")
+    store.upsert_many([
+        EntityRecord("Ticket", "TCKT-1", "low", "Draft", FULL),
+        EntityRecord("Ticket", "TCKT-2", "high", "Draft", {"has_title": True}),
+        EntityRecord("Ticket", "TCKT-3", "low", "Planned", FULL),
+    ])
+    audit = AuditLogger(tmp_path / "audit.jsonl")
+    return (
+        store,
+        audit,
+        BatchTransitioner(compile_spec(load_spec("guardian_spec.yaml")), store, audit),
+    )
+
+
+def test_batch_applies_allowed_and_audits_all(tmp_path: Path):
+    store, audit, batch = _setup(tmp_path)
+
+    report = batch.run(
+        "Ticket", ["TCKT-1", "TCKT-2", "TCKT-3", "TCKT-404"], "Planned", human_approved=True
+    )
+
+    assert [o.entity_id for o in report.allowed] == ["TCKT-1"]
+    assert {o.entity_id for o in report.blocked} == {"TCKT-2", "TCKT-3", "TCKT-404"}
+    assert store.require("Ticket", "TCKT-1").state == "Planned"
+    assert store.require("Ticket", "TCKT-1").version == 2
+    assert store.require("Ticket", "TCKT-2").state == "Draft"
+
+    # Only gate evaluations are audited, not unresolvable transitions.
+    rows = [json.loads(line) for line in (tmp_path / "audit.jsonl").read_text().splitlines()]
+    assert [(r["entity_id"], r["from_state"], r["allowed"]) for r in rows] == [
+        ("TCKT-1", "Draft", True),
+        ("TCKT-2", "Draft", False),
+    ]
+
+
+def test_batch_commit_is_compare_and_swap(tmp_path: Path, monkeypatch):
+    store, _audit, batch = _setup(tmp_path)
+    real_get_many = store.get_many
+
+    def stale_get_many(keys):
+        found = real_get_many(keys)
+        # Someone else edits TCKT-1 between our read and our commit.
+        other = FileEntityStore(tmp_path / "entities.json")
+        other.upsert(other.require("Ticket", "TCKT-1"))
+        return found
+
+    monkeypatch.setattr(store, "get_many", stale_get_many)
+    report = batch.run("Ticket", ["TCKT-1", "TCKT-2"], "Planned", human_approved=True)
+    assert report.conflict.startswith("Concurrent update detected")
+    assert report.allowed == []
+    assert store.require("Ticket", "TCKT-1").state == "Draft"
+
+    # The gate allowed TCKT-1, but the commit did not happen, so it is audited as blocked.
+    rows = [json.loads(line) for line in (tmp_path / "audit.jsonl").read_text().splitlines()]
+    assert [(r["entity_id"], r["allowed"]) for r in rows] == [("TCKT-1", False), ("TCKT-2", False)]
+    assert rows[0]["reasons"][0].startswith("Not applied: Concurrent update detected")
+
+
+def test_sharded_conflict_audits_shards_that_committed(tmp_path: Path, monkeypatch):
+    store = ShardedFileEntityStore(tmp_path / "shards", shards=4)
+    ids = [f"TCKT-{i}" for i in range(1, 9)]
+    store.upsert_many(EntityRecord("Ticket", i, "low", "Draft", FULL) for i in ids)
+    last_shard = max(shard_of(i, 4) for i in ids)
+    raced = [i for i in ids if shard_of(i, 4) == last_shard]
+    audit = AuditLogger(tmp_path / "audit.jsonl")
+    batch = BatchTransitioner(compile_spec(load_spec("guardian_spec.yaml")), store, audit)
+    real_get_many = store.get_many
+
+    def stale_get_many(keys):
+        found = real_get_many(keys)
+        # Someone edits the entities of the shard committed last.
+        other = ShardedFileEntityStore(tmp_path / "shards", shards=4)
+        other.upsert_many(other.require("Ticket", i) for i in raced)
+        return found
+
+    monkeypatch.setattr(store, "get_many", stale_get_many)
+    report = batch.run("Ticket", ids, "Planned", human_approved=True)
+
+    applied = sorted(set(ids) - set(raced))
+    assert report.conflict is not None
+    assert sorted(o.entity_id for o in report.allowed) == applied
+    assert sorted(o.entity_id for o in report.blocked) == sorted(raced)
+    assert [store.require("Ticket", i).state for i in applied] == ["Planned"] * len(applied)
+    assert [store.require("Ticket", i).state for i in raced] == ["Draft"] * len(raced)
+    rows = [json.loads(line) for line in (tmp_path / "audit.jsonl").read_text().splitlines()]
+    assert sorted(r["entity_id"] for r in rows if r["allowed"]) == applied
@@ -0,0 +1,86 @@
+import itertools
+
+import numpy as np
+
+from app.engine.bulk_gates import BulkGateEvaluator
+from app.engine.completeness import ChecklistTracker
+from app.engine.gates import GateEngine, compile_gate
+from app.models import GateRule
+
+CHECKLIST = ["a", "b", "c"]
+
+
+def _all_data():
+    for values in itertools.product([False, True], repeat=3):
+        yield dict(zip(CHECKLIST, values))
+
+
+def test_bulk_matches_single_entity_engine():
+    engine = GateEngine()
+    rule_sets = [
+        [],
+        [GateRule(type="completeness_min", percent=60)],
+        [GateRule(type="completeness_min", percent=100), GateRule(type="always_block")],
+        [GateRule(type="always_block"), GateRule(type="completeness_min", percent=10)],
+        [GateRule(type="completeness_min"), GateRule(type="mystery")],
+        # expr rules run through the per-entity fallback; only the first reads completeness.
+        [GateRule(type="expr", expr="completeness >= 50 and risk_tier != 'high'")],
+        [GateRule(type="expr", expr="a or b")],
+        [GateRule(type="expr", expr="a or completeness > 60"), GateRule(type="always_block")],
+    ]
+    data = list(_all_data())
+    tiers = [["low", "medium", "high"][i % 3] for i in range(len(data))]
+
+    for rules, policy, approved in itertools.product(
+        rule_sets, [True, False, "medium_or_high"], [True, False]
+    ):
+        plan = compile_gate(checklist=CHECKLIST, rules=rules, require_human_approval=policy)
+        report = BulkGateEvaluator(plan).evaluate(
+            entity_data=data, risk_tiers=tiers, human_approved=approved
+        )
+        for i, (d, tier) in enumerate(zip(data, tiers)):
+            expected = engine.evaluate_plan(
+                plan, entity_data=d, risk_tier=tier, human_approved=approved
+            )
+            assert report.decision(i) == expected
+            assert bool(report.allowed[i]) is expected.allowed
+
+        tracker = ChecklistTracker(CHECKLIST)
+        from_masks = BulkGateEvaluator(plan).evaluate(
+            entity_data=data,
+            risk_tiers=tiers,
+            human_approved=approved,
+            masks=[tracker.track(d).bits for d in data],
+        )
+        assert (from_masks.satisfied == report.satisfied).all()
+        assert (from_masks.allowed == report.allowed).all()
+
+
+def test_bulk_percent_and_counts():
+    plan = compile_gate(
+        checklist=CHECKLIST,
+        rules=[GateRule(type="completeness_min", percent=60)],
+        require_human_approval=False,
+    )
+    report = BulkGateEvaluator(plan).evaluate(
+        entity_data=[{"a": 1, "b": 1}, {"a": 1}, {}],
+        risk_tiers=["low", "low", "low"],
+    )
+    assert report.percent.tolist() == [66, 33, 0]
+    assert report.satisfied.dtype == np.bool_
+    assert report.allowed_count == 1
+    assert report.blocked_count == 2
+    assert report.completeness(1).missing_items == ("b", "c")
+
+
+def test_empty_batch_and_empty_checklist():
+    plan = compile_gate(
+        checklist=[],
+        rules=[GateRule(type="completeness_min", percent=100)],
+        require_human_approval=False,
+    )
+    evaluator = BulkGateEvaluator(plan)
+    assert len(evaluator.evaluate(entity_data=[], risk_tiers=[])) == 0
+    report = evaluator.evaluate(entity_data=[{}], risk_tiers=["low"])
+    assert report.percent.tolist() == [100]
+    assert report.allowed_count == 1
@@ -0,0 +1,128 @@
+import json
+from pathlib import Path
+
+from app.engine.bulk_import import EntityImporter
+from app.engine.compiled_spec import compile_spec
+from app.engine.store import EntityRecord, FileEntityStore
+from app.spec_loader import load_spec
+
+
+def _row(entity_id: str, **overrides) -> str:
+    row = {
+        "entity_type": "Ticket",
+        "entity_id": entity_id,
+        "risk_tier": "low",
+        "data": {"has_title": True},
+    }
+    row.update(overrides)
+    return json.dumps(row)
+
+
+def test_import_reports_failures_without_aborting(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json")
+    importer = EntityImporter(compile_spec(load_spec("guardian_spec.yaml")), store, batch_size=2)
+
+    report = importer.run([
+        _row("TCKT-1"),
+        "not json",
+        _row("TICKET_2"),
+        _row("TCKT-3", risk_tier="extreme"),
+        "",
+        _row("TCKT-4"),
+        _row("TCKT-5"),
+    ])
+
+    assert report.created == 4
+    assert [f.line_no for f in report.failures] == [2, 4]
+    assert store.require("Ticket", "TCKT-5").state == "Draft"
+    # Legacy ids are stored under their canonical form.
+    assert store.get("Ticket", "TICKET_2") is None
+    assert store.require("Ticket", "TCKT-2").data == {"has_title": True}
+
+
+def test_import_refuses_legacy_ids_without_canonical_format(tmp_path: Path):
+    spec = load_spec("guardian_spec.yaml").model_copy(deep=True)
+    spec.entities["Ticket"].id.canonical_format = None
+    importer = EntityImporter(compile_spec(spec), FileEntityStore(tmp_path / "entities.json"))
+
+    report = importer.run([_row("TICKET_2")])
+
+    assert report.created == 0
+    assert "Legacy ID" in report.failures[0].reason
+
+
+def test_import_keeps_state_of_existing_entities(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json")
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Planned", {}))
+    importer = EntityImporter(compile_spec(load_spec("guardian_spec.yaml")), store)
+
+    report = importer.run([_row("TCKT-1", risk_tier="high")])
+
+    assert report.updated == 1
+    rec = store.require("Ticket", "TCKT-1")
+    assert rec.state == "Planned"
+    assert rec.risk_tier == "high"
+    assert rec.data == {"has_title": True}
+
+
+def test_reimport_bumps_the_stored_version(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json")
+    rec = EntityRecord("Ticket", "TCKT-1", "low", "Draft", {})
+    for _ in range(5):
+        store.upsert(rec, cas=True)
+    importer = EntityImporter(compile_spec(load_spec("guardian_spec.yaml")), store)
+
+    importer.run([_row("TCKT-1")])
+
+    assert store.require("Ticket", "TCKT-1").version == 6
+
+
+class _RacingStore(FileEntityStore):
+    """Commits a transition of TCKT-1 from another writer right after each read."""
+
+    def __init__(self, path: Path, races: int):
+        super().__init__(path)
+        self._other = FileEntityStore(path)
+        self._races = races
+
+    def get_many(self, keys):
+        found = super().get_many(keys)
+        if self._races and ("Ticket", "TCKT-1") in found:
+            self._races -= 1
+            rec = self._other.require("Ticket", "TCKT-1")
+            rec.state = "Planned"
+            self._other.upsert(rec, cas=True)
+        return found
+
+
+def test_import_does_not_overwrite_a_concurrent_transition(tmp_path: Path):
+    store = _RacingStore(tmp_path / "entities.json", races=1)
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+    importer = EntityImporter(compile_spec(load_spec("guardian_spec.yaml")), store)
+
+    report = importer.run([_row("TCKT-1", risk_tier="high"), _row("TCKT-2")])
+
+    assert report.ok and (report.created, report.updated) == (1, 1)
+    rec = store.require("Ticket", "TCKT-1")
+    assert (rec.state, rec.risk_tier, rec.version) == ("Planned", "high", 3)
+
+
+def test_import_reports_entities_that_keep_conflicting(tmp_path: Path):
+    store = _RacingStore(tmp_path / "entities.json", races=100)
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+    importer = EntityImporter(compile_spec(load_spec("guardian_spec.yaml")), store)
+
+    report = importer.run([_row("TCKT-1", risk_tier="high"), _row("TCKT-2")])
+
+    assert [f.line_no for f in report.failures] == [1]
+    assert "Concurrent update" in report.failures[0].reason
+    assert report.created == 1
+    assert store.require("Ticket", "TCKT-1").risk_tier == "low"
+    assert store.require("Ticket", "TCKT-2").state == "Draft"
+
+
+def test_upsert_many_single_rewrite(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json")
+    store.upsert_many(EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {}) for i in range(50))
+    found = store.get_many([("Ticket", "TCKT-0"), ("Ticket", "TCKT-49"), ("Ticket", "TCKT-99")])
+    assert set(found) == {("Ticket", "TCKT-0"), ("Ticket", "TCKT-49")}
@@ -0,0 +1,131 @@
+import threading
+from pathlib import Path
+
+from app.engine.changefeed import ChangeFeed
+from app.engine.store import EntityRecord, FileEntityStore
+
+
+def _store(tmp_path: Path) -> tuple[FileEntityStore, ChangeFeed]:
+    feed = ChangeFeed(tmp_path / "changes.jsonl")
+    return FileEntityStore(tmp_path / "entities.json", feed=feed), feed
+
+
+def test_store_writes_emit_before_after_events(tmp_path: Path):
+    store, feed = _store(tmp_path)
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+    rec = store.require("Ticket", "TCKT-1")
+    rec.state = "ReadyForReview"
+    store.upsert(rec, cas=True)
+
+    events = list(feed.read())
+    assert [e.seq for e in events] == [1, 2]
+    assert events[0].before is None
+    assert events[1].before["state"] == "Draft"
+    assert events[1].after["state"] == "ReadyForReview"
+    assert feed.last_seq() == 2
+
+
+def test_deletes_emit_events_without_after(tmp_path: Path):
+    store, feed = _store(tmp_path)
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+    store.delete_many([("Ticket", "TCKT-1")])
+
+    event = list(feed.read(after_seq=1))[0]
+    assert (event.entity_id, event.after) == ("TCKT-1", None)
+    assert event.before["state"] == "Draft"
+
+
+def test_read_resumes_from_offset(tmp_path: Path):
+    store, feed = _store(tmp_path)
+    for i in range(200):
+        store.upsert(EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {"pad": "x" * (i % 17)}))
+
+    for after in (0, 1, 57, 123, 199, 200):
+        assert [e.seq for e in feed.read(after, limit=3)] == list(
+            range(after + 1, min(after + 4, 201))
+        )
+
+
+def test_torn_tail_is_ignored(tmp_path: Path):
+    _, feed = _store(tmp_path)
+    feed.append([(None, {"entity_type": "Ticket", "entity_id": "TCKT-1", "state": "Draft"})])
+    with feed.path.open("a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "times')
+
+    assert feed.last_seq() == 1
+    assert [e.seq for e in feed.read()] == [1]
+
+
+def test_follow_wakes_on_new_events(tmp_path: Path):
+    store, feed = _store(tmp_path)
+    seen: list[int] = []
+
+    def consume() -> None:
+        for event in feed.follow(0, timeout=2.0):
+            seen.append(event.seq)
+            if event.seq == 3:
+                return
+
+    t = threading.Thread(target=consume)
+    t.start()
+    for i in range(3):
+        store.upsert(EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {}))
+    t.join(timeout=5)
+
+    assert seen == [1, 2, 3]
+
+
+class _DyingFeed(ChangeFeed):
+    """Raises on the first append, as if the writer died right after the file swap."""
+
+    died = False
+
+    def append(self, changes):
+        if not self.died:
+            self.died = True
+            raise KeyboardInterrupt
+        return super().append(changes)
+
+
+def test_crash_between_swap_and_feed_append_is_recovered(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json", feed=_DyingFeed(tmp_path / "changes.jsonl"))
+    try:
+        store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+    except KeyboardInterrupt:
+        pass
+    assert store.get("Ticket", "TCKT-1") is not None  # committed, but no event yet
+
+    store, feed = _store(tmp_path)
+    store.upsert(EntityRecord("Ticket", "TCKT-2", "low", "Draft", {}))
+    assert [(e.seq, e.entity_id) for e in feed.read()] == [(1, "TCKT-1"), (2, "TCKT-2")]
+    assert not (tmp_path / "entities.json.feed-pending").exists()
+
+
+def test_crash_before_swap_publishes_nothing(tmp_path: Path, monkeypatch):
+    store, feed = _store(tmp_path)
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+
+    def _die(_payload):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(store, "_write_all", _die)
+    try:
+        store.upsert(EntityRecord("Ticket", "TCKT-2", "low", "Draft", {}))
+    except KeyboardInterrupt:
+        pass
+
+    store, feed = _store(tmp_path)
+    store.delete_many([("Ticket", "TCKT-1")])
+    assert [(e.seq, e.entity_id, e.after) for e in feed.read(after_seq=1)] == [(2, "TCKT-1", None)]
+
+
+def test_batch_already_in_feed_is_not_published_twice(tmp_path: Path, monkeypatch):
+    store, feed = _store(tmp_path)
+    # Dies after the feed append but before removing the pending file.
+    monkeypatch.setattr(store, "_publish", lambda changes: feed.append(changes))
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+    assert (tmp_path / "entities.json.feed-pending").exists()
+
+    store, feed = _store(tmp_path)
+    store.upsert(EntityRecord("Ticket", "TCKT-2", "low", "Draft", {}))
+    assert [e.entity_id for e in feed.read()] == ["TCKT-1", "TCKT-2"]
@@ -0,0 +1,204 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.engine import columnar_export
+from app.engine.audit import AuditLogEntry, AuditLogger
+from app.engine.columnar_export import ColumnarExporter, ExportError, load_chunk
+from app.engine.store import EntityRecord, FileEntityStore
+
+BLOCKED_REASONS = (
+    "Completeness 10% is below required 60%.",
+    "Human approval required but not provided.",
+)
+
+
+def _entry(i: int, allowed: bool = True) -> AuditLogEntry:
+    return AuditLogEntry(
+        timestamp=f"2026-10-01T00:{i // 60:02d}:{i % 60:02d}+02:00",
+        entity_type="Ticket",
+        from_state="Draft",
+        to_state="Planned",
+        risk_tier="low" if i % 2 else "high",
+        human_approved=False,
+        allowed=allowed,
+        reasons=() if allowed else BLOCKED_REASONS,
+        completeness_percent=None if i == 0 else i,
+        entity_id=f"TCKT-{i % 3}",
+    )
+
+
+def _audit_rows(out: Path) -> list:
+    rows = []
+    for path in sorted(out.glob("audit-*.npz")):
+        cols = load_chunk(path)
+        rows += [
+            (
+                cols["entity_id"][i],
+                cols["allowed"][i],
+                int(cols["completeness_percent"][i]),
+                cols["reasons"][i],
+            )
+            for i in range(len(cols["allowed"]))
+        ]
+    return rows
+
+
+def test_audit_export_is_chunked_and_incremental_across_rotation(tmp_path: Path):
+    logger = AuditLogger(tmp_path / "audit_log.jsonl", segment_bytes=3000)
+    logger.log_many([_entry(i, allowed=i % 4 != 0) for i in range(10)])
+    out = tmp_path / "export"
+    exporter = ColumnarExporter(out, chunk_rows=4)
+
+    assert exporter.export_audit(logger.segments) == 10
+    assert len(list(out.glob("audit-*.npz"))) == 3
+    assert exporter.export_audit(logger.segments) == 0
+
+    for i in range(10, 25):
+        logger.log(_entry(i))
+    assert logger.segments.segments()  # some of it now lives in compressed segments
+    assert exporter.export_audit(logger.segments) == 15
+
+    rows = _audit_rows(out)
+    assert [r[0] for r in rows] == [f"TCKT-{i % 3}" for i in range(25)]
+    assert rows[0][1:] == (False, -1, [
+        "Completeness 10% is below required 60%.",
+        "Human approval required but not provided.",
+    ])
+    assert rows[1][1:] == (True, 1, [])
+
+
+def test_audit_columns_are_typed_and_dictionary_encoded(tmp_path: Path):
+    logger = AuditLogger(tmp_path / "audit_log.jsonl")
+    logger.log_many([_entry(i) for i in range(6)])
+    ColumnarExporter(tmp_path / "out").export_audit(logger.segments)
+
+    with np.load(tmp_path / "out" / "audit-000001.npz", allow_pickle=False) as z:
+        assert z["risk_tier.dictionary"].tolist() == ["high", "low"]
+        assert z["risk_tier.codes"].tolist() == [0, 1, 0, 1, 0, 1]
+        assert z["timestamp"][1] == np.datetime64("2026-09-30T22:00:01", "us")  # normalized to UTC
+        assert z["log_offset"][0] == 0 and z["log_segment"][0] == 1
+
+
+def test_crash_before_cursor_save_rewrites_the_same_chunk(tmp_path: Path, monkeypatch):
+    logger = AuditLogger(tmp_path / "audit_log.jsonl")
+    logger.log_many([_entry(i) for i in range(6)])
+    out = tmp_path / "out"
+
+    real = columnar_export.atomic_write_text
+    calls = []
+
+    def crash_on_second(path, text, **kwargs):
+        calls.append(path)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        real(path, text, **kwargs)
+
+    monkeypatch.setattr(columnar_export, "atomic_write_text", crash_on_second)
+    with pytest.raises(KeyboardInterrupt):
+        ColumnarExporter(out, chunk_rows=4).export_audit(logger.segments)
+    monkeypatch.setattr(columnar_export, "atomic_write_text", real)
+
+    assert ColumnarExporter(out, chunk_rows=4).export_audit(logger.segments) == 2
+    assert [r[0] for r in _audit_rows(out)] == [f"TCKT-{i % 3}" for i in range(6)]
+
+
+def test_replaced_log_is_refused(tmp_path: Path):
+    path = tmp_path / "audit_log.jsonl"
+    logger = AuditLogger(path)
+    logger.log_many([_entry(i) for i in range(6)])
+    exporter = ColumnarExporter(tmp_path / "out")
+    exporter.export_audit(logger.segments)
+
+    path.write_text("")
+    with pytest.raises(ExportError):
+        exporter.export_audit(logger.segments)
+
+
+def test_entity_snapshot_replaces_previous_chunks(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "e.json")
+    store.upsert_many(
+        [EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {"n": i}) for i in range(7)]
+    )
+    out = tmp_path / "out"
+
+    assert ColumnarExporter(out, chunk_rows=3).export_entities(store) == 7
+    assert len(list((out / "entities").glob("entities-*.npz"))) == 3
+
+    store.delete_many([("Ticket", f"TCKT-{i}") for i in range(4)])
+    assert ColumnarExporter(out, chunk_rows=3).export_entities(store) == 3
+    assert len(list((out / "entities").glob("entities-*.npz"))) == 1
+    cols = load_chunk(out / "entities" / "entities-000001.npz")
+    assert cols["entity_id"] == ["TCKT-4", "TCKT-5", "TCKT-6"]
+    assert cols["data"][0] == '{"n": 4}'
+    assert cols["state"].tolist() == ["Draft"] * 3
+    assert sorted(p.name for p in out.iterdir()) == ["entities", "export.lock"]
+
+
+def test_failed_entity_snapshot_keeps_the_previous_one(tmp_path: Path, monkeypatch):
+    store = FileEntityStore(tmp_path / "e.json")
+    store.upsert_many(
+        [EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {"n": i}) for i in range(7)]
+    )
+    out = tmp_path / "out"
+    exporter = ColumnarExporter(out, chunk_rows=3)
+    exporter.export_entities(store)
+    store.delete_many([("Ticket", f"TCKT-{i}") for i in range(4)])
+
+    real_write = ColumnarExporter._write
+
+    def write(self, directory, kind, n, chunk, dtypes):
+        if n == 2:
+            raise OSError("disk full")
+        real_write(self, directory, kind, n, chunk, dtypes)
+
+    store.upsert_many(
+        [EntityRecord("Ticket", f"TCKT-{i}", "low", "Done", {}) for i in range(10, 14)]
+    )
+    monkeypatch.setattr(ColumnarExporter, "_write", write)
+    with pytest.raises(OSError):
+        exporter.export_entities(store)
+
+    # The old snapshot is untouched: its first chunk was not overwritten.
+    assert len(list((out / "entities").glob("entities-*.npz"))) == 3
+    first = load_chunk(out / "entities" / "entities-000001.npz")
+    assert first["entity_id"] == ["TCKT-0", "TCKT-1", "TCKT-2"]
+    assert not list(out.glob("entities.tmp-*"))
+
+    # A crash between moving the old snapshot aside and renaming the new one in.
+    (out / "entities").rename(out / "entities.old")
+    monkeypatch.setattr(ColumnarExporter, "_write", real_write)
+    assert exporter.export_entities(store) == 7
+    assert sorted(p.name for p in out.iterdir()) == ["entities", "export.lock"]
+
+
+def test_parquet_export_round_trips(tmp_path: Path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    logger = AuditLogger(tmp_path / "audit_log.jsonl")
+    logger.log_many([_entry(i, allowed=i % 4 != 0) for i in range(5)])
+    store = FileEntityStore(tmp_path / "e.json")
+    store.upsert_many(
+        [EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {"n": i}) for i in range(3)]
+    )
+    out = tmp_path / "out"
+    exporter = ColumnarExporter(out, format="parquet")
+
+    assert exporter.export_audit(logger.segments) == 5
+    assert exporter.export_entities(store) == 3
+
+    audit = pq.read_table(out / "audit-000001.parquet").to_pydict()
+    assert audit["entity_id"] == [f"TCKT-{i % 3}" for i in range(5)]
+    assert audit["allowed"] == [i % 4 != 0 for i in range(5)]
+    assert audit["completeness_percent"] == [-1, 1, 2, 3, 4]
+    assert audit["reasons"][0] == list(BLOCKED_REASONS)
+    entities = pq.read_table(out / "entities" / "entities-000001.parquet").to_pydict()
+    assert entities["entity_id"] == ["TCKT-0", "TCKT-1", "TCKT-2"]
+    assert entities["data"] == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
+    assert entities["state"] == ["Draft"] * 3
+
+
+@pytest.mark.skipif(columnar_export.pq is not None, reason="pyarrow is installed")
+def test_parquet_without_pyarrow_is_an_export_error(tmp_path: Path):
+    with pytest.raises(ExportError):
+        ColumnarExporter(tmp_path, format="parquet")
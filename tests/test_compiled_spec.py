@@ -0,0 +1,78 @@
+import pytest
+
+from app.engine.compiled_spec import compile_spec
+from app.engine.gates import GateEngine
+from app.engine.state_machine import TransitionError, resolve_transition
+from app.engine.store import EntityRecord
+from app.spec_loader import load_spec
+
+
+def test_compiled_lookup_matches_resolve_transition():
+    spec = load_spec("guardian_spec.yaml")
+    ticket = compile_spec(spec).entities["Ticket"]
+
+    compiled = ticket.resolve("ReadyForReview", "Done")
+    resolved = resolve_transition(spec.entities["Ticket"], "ReadyForReview", "Done")
+    assert compiled.transition is resolved.transition
+    assert ticket.initial_state == "Draft"
+
+
+@pytest.mark.parametrize(
+    "from_state,to_state,message",
+    [
+        ("Nope", "Done", "Unknown from_state"),
+        ("Draft", "Nope", "Unknown to_state"),
+        ("Draft", "Done", "Transition not allowed"),
+    ],
+)
+def test_compiled_resolve_errors(from_state, to_state, message):
+    ticket = compile_spec(load_spec("guardian_spec.yaml")).entities["Ticket"]
+    with pytest.raises(TransitionError, match=message):
+        ticket.resolve(from_state, to_state)
+
+
+def test_gate_plan_matches_uncompiled_evaluation():
+    spec = load_spec("guardian_spec.yaml")
+    ticket_spec = spec.entities["Ticket"]
+    ticket = compile_spec(spec).entities["Ticket"]
+    engine = GateEngine()
+
+    for data in ({}, {"has_title": True}, {"has_title": True, "has_acceptance_criteria": True}):
+        for approved in (True, False):
+            for (from_state, to_state), compiled in ticket.transitions.items():
+                gate = compiled.transition.gate
+                expected = engine.evaluate(
+                    checklist=ticket_spec.checklist,
+                    entity_data=data,
+                    rules=gate.rules,
+                    require_human_approval=gate.require_human_approval,
+                    risk_tier="medium",
+                    human_approved=approved,
+                )
+                actual = engine.evaluate_plan(
+                    compiled.plan, entity_data=data, risk_tier="medium", human_approved=approved
+                )
+                assert actual == expected
+
+
+def test_update_data_tracks_completeness_on_record():
+    entity = compile_spec(load_spec("guardian_spec.yaml")).entities["Ticket"]
+    rec = EntityRecord("Ticket", "TCKT-1", "low", "Draft", {"has_title": True})
+
+    assert entity.completeness_mask(rec).satisfied == 1
+    assert rec.completeness["checklist"] == entity.checklist.hash
+
+    entity.update_data(rec, {"has_risk_tier": True, "owner": "sam"})
+    assert rec.data["owner"] == "sam"
+    assert entity.checklist.result(entity.completeness_mask(rec)).percent == 66
+
+    # A mask from an older checklist is rebuilt from data.
+    rec.completeness = {"checklist": "old", "bits": 0, "satisfied": 0}
+    assert entity.completeness_mask(rec).satisfied == 2
+
+
+def test_gate_plans_are_keyed_by_spec_hash_and_transition():
+    compiled = compile_spec(load_spec("guardian_spec.yaml"))
+    plan = compiled.entities["Ticket"].resolve("Draft", "Planned").plan
+    assert plan.key == (compiled.spec_hash, "Ticket", "Draft", "Planned")
+    assert compile_spec(load_spec("guardian_spec.yaml")).spec_hash == compiled.spec_hash
@@ -1,4 +1,11 @@
-from app.engine.completeness import CompletenessEngine
+import pytest
+
+from app.engine.completeness import (
+    ChecklistTracker,
+    CompletenessEngine,
+    CompletenessError,
+    CompletenessMask,
+)
 
 
 def test_completeness_all_true():
@@ -26,3 +33,35 @@ def test_completeness_empty_checklist_is_100():
     r = engine.compute([], {})
     assert r.percent == 100
     assert r.total_items == 0
+
+
+def test_tracker_update_matches_full_recompute():
+    checklist = ["a", "b", "c", "d"]
+    tracker = ChecklistTracker(checklist)
+    data = {"a": True, "c": 0}
+    mask = tracker.track(data)
+
+    for changes in (
+        {"b": 1, "zzz": True},
+        {"a": False, "c": "yes"},
+        {"a": True, "a2": 1},
+        {"d": None},
+    ):
+        mask = tracker.update(mask, changes)
+        data.update(changes)
+        assert mask == tracker.track(data)
+        assert tracker.result(mask) == CompletenessEngine().compute(checklist, data)
+
+
+def test_tracker_recomputes_when_checklist_changes():
+    old = ChecklistTracker(["a", "b"])
+    new = ChecklistTracker(["b", "a", "c"])
+    data = {"a": True, "c": True}
+    stale = CompletenessMask.from_json(old.track(data).to_json())
+
+    assert old.current(stale, {}) is stale
+    fresh = new.current(stale, data)
+    assert fresh.checklist_hash == new.hash != old.hash
+    assert new.result(fresh).missing_items == ("b",)
+    with pytest.raises(CompletenessError):
+        new.update(stale, {"b": True})
@@ -0,0 +1,178 @@
+import json
+
+import pytest
+import yaml
+
+from app import main
+from app.engine.bulk_gates import BulkGateEvaluator
+from app.engine.compiled_spec import compile_spec
+from app.engine.completeness import ChecklistTracker, CompletenessEngine
+from app.engine.expressions import ExpressionError, compile_expression
+from app.engine.gates import GateEngine, compile_gate
+from app.models import EntitySpec, GateRule, GuardianSpec
+
+
+@pytest.mark.parametrize(
+    "source, env, expected",
+    [
+        ("len(acceptance_criteria) >= 3", {"acceptance_criteria": ["a", "b", "c"]}, True),
+        ("len(acceptance_criteria) >= 3", {}, False),
+        ("owner and lower(owner) != 'nobody'", {"owner": "Sam"}, True),
+        ("owner and lower(owner) != 'nobody'", {"owner": None}, None),
+        ("1 < points <= 8 and status in ('open', 'ready')", {"points": 5, "status": "ready"}, True),
+        ("labels[0] if labels else 'none'", {"labels": ["x"]}, "x"),
+        ("not blocked or -priority > -2", {"blocked": True, "priority": 1}, True),
+        ("max(a, b) + a * 2 // 3 % 5", {"a": 3, "b": 7}, 9),
+    ],
+)
+def test_expression_values(source, env, expected):
+    assert compile_expression(source)(env) == expected
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "__import__('os').system('true')",
+        "owner.__class__",
+        "[x for x in labels]",
+        "lambda: 1",
+        "len(x, key=1)",
+        "a ** 2",
+        "len(",
+        "",
+    ],
+)
+def test_unsafe_or_invalid_expressions_are_rejected(source):
+    with pytest.raises(ExpressionError):
+        compile_expression(source)
+
+
+def test_names_and_error_tolerant_test():
+    expr = compile_expression("len(items) > limit")
+    assert expr.names == {"items", "limit"}
+    assert expr.test({"items": [1, 2], "limit": 1}) is True
+    assert expr.test({"items": 3, "limit": 1}) is False  # len(3) -> TypeError -> not satisfied
+
+
+def _ticket_spec(**gate) -> GuardianSpec:
+    return GuardianSpec.model_validate(_ticket_spec_raw(**gate))
+
+
+def _ticket_spec_raw(**gate) -> dict:
+    gate = {"require_human_approval": False, **gate}
+    return {
+        "risk_tiers": ["low", "high"],
+        "entities": {
+            "Ticket": {
+                "id": {"canonical_regex": "^TCKT-[0-9]+$"},
+                "checklist": ["has_title", {"enough_ac": "len(acceptance_criteria) >= 3"}],
+                "states": ["Draft", "Done"],
+                "transitions": [{"from": "Draft", "to": "Done", "gate": gate}],
+            }
+        },
+    }
+
+
+def test_spec_checklist_predicates_are_split_and_compiled():
+    spec = _ticket_spec()
+    ticket = spec.entities["Ticket"]
+    assert ticket.checklist == ["has_title", "enough_ac"]
+    assert ticket.checklist_expressions == {"enough_ac": "len(acceptance_criteria) >= 3"}
+
+    entity = compile_spec(spec).entities["Ticket"]
+    data = {"has_title": True, "acceptance_criteria": ["a", "b", "c"]}
+    assert entity.checklist.result(entity.checklist.track(data)).percent == 100
+    with pytest.raises(ValueError):
+        EntitySpec.model_validate(
+            {
+                **spec.entities["Ticket"].model_dump(by_alias=True),
+                "checklist": [{"a": "1", "b": "2"}],
+            }
+        )
+
+
+def test_completeness_command_evaluates_checklist_predicates(tmp_path, capsys):
+    spec_path = tmp_path / "spec.yaml"
+    spec_path.write_text(yaml.safe_dump(_ticket_spec_raw()), encoding="utf-8")
+    # A stale flag under the item's name must not override its predicate.
+    payload = json.dumps({"has_title": True, "enough_ac": True, "acceptance_criteria": ["a"]})
+
+    assert main.cmd_completeness(spec_path, "Ticket", payload) == 0
+    out = capsys.readouterr().out
+    assert "Completeness: 50% (1/2)" in out
+    assert "  - enough_ac" in out
+
+
+def test_checklist_predicates_reject_gate_context_names():
+    spec = _ticket_spec()
+    ticket = spec.entities["Ticket"].model_dump(by_alias=True)
+    ticket["checklist_expressions"] = {
+        "enough_ac": 'len(acceptance_criteria) >= 3 and risk_tier != "high"'
+    }
+    spec.entities["Ticket"] = EntitySpec.model_validate(ticket)
+    with pytest.raises(ExpressionError, match="risk_tier"):
+        compile_spec(spec)
+
+
+def test_multiplication_is_limited_to_numbers():
+    assert compile_expression("points * 2.5")({"points": 2}) == 5.0
+    repeat = compile_expression('"x" * n')
+    with pytest.raises(TypeError):
+        repeat({"n": 10**9})
+    assert repeat.test({"n": 10**9}) is False
+    assert compile_expression("labels * 2").test({"labels": ["a"]}) is False
+
+
+def test_modulo_is_limited_to_numbers():
+    assert compile_expression("points % 3")({"points": 7}) == 1
+    pad = compile_expression('"%0200000000d" % n')
+    with pytest.raises(TypeError):
+        pad({"n": 1})
+    assert pad.test({"n": 1}) is False
+
+
+def test_tracker_update_reevaluates_dependent_predicates():
+    predicates = {"enough_ac": compile_expression("len(acceptance_criteria) >= 2")}
+    tracker = ChecklistTracker(["has_title", "enough_ac"], predicates)
+    assert tracker.hash != ChecklistTracker(["has_title", "enough_ac"]).hash
+
+    data = {"acceptance_criteria": ["a"]}
+    mask = tracker.track(data)
+    data["acceptance_criteria"] = ["a", "b"]
+    mask = tracker.update(mask, {"acceptance_criteria": data["acceptance_criteria"]}, data)
+    assert mask == tracker.track(data)
+    assert tracker.result(mask) == CompletenessEngine().compute(
+        ["has_title", "enough_ac"], data, predicates
+    )
+
+
+def test_expr_rule_sees_risk_tier_and_completeness():
+    rule = GateRule(
+        type="expr",
+        expr='len(acceptance_criteria) >= 3 and risk_tier != "high" and completeness >= 50',
+    )
+    predicates = {"enough_ac": compile_expression("len(acceptance_criteria) >= 3")}
+    plan = compile_gate(
+        checklist=["has_title", "enough_ac"], predicates=predicates, rules=[rule],
+        require_human_approval=False, key=("k",),
+    )
+    assert plan.key == ("k",)
+    assert plan.fields == ("has_title", "acceptance_criteria")
+
+    engine = GateEngine()
+    data = [
+        {"acceptance_criteria": [1, 2, 3]},
+        {"acceptance_criteria": [1]},
+        {"acceptance_criteria": 7},
+    ]
+    tiers = ["low", "low", "low"]
+    report = BulkGateEvaluator(plan).evaluate(entity_data=data, risk_tiers=tiers)
+    for i, d in enumerate(data):
+        expected = engine.evaluate_plan(
+            plan, entity_data=d, risk_tier=tiers[i], human_approved=False
+        )
+        assert report.decision(i) == expected
+    assert report.allowed.tolist() == [True, False, False]
+    assert "could not be evaluated" in report.decision(2).reasons[0]
+    high = engine.evaluate_plan(plan, entity_data=data[0], risk_tier="high", human_approved=False)
+    assert not high.allowed
@@ -1,4 +1,5 @@
-from app.engine.gates import GateEngine
+from app.engine.cache import cache_stats
+from app.engine.gates import GateEngine, compile_gate
 from app.models import GateRule
 
 
@@ -71,3 +72,74 @@ def test_always_blocks_with_reason():
     )
     assert decision.allowed is False
     assert "Rule always_block triggered." in decision.reasons[0]
+
+
+def test_decision_cache_hits_for_unchanged_relevant_data():
+    plan = compile_gate(
+        checklist=["a", "b"],
+        rules=[GateRule(type="completeness_min", percent=100)],
+        require_human_approval=False,
+        key=("spec", "Ticket", "Draft", "Planned"),
+    )
+    engine = GateEngine(decision_cache_size=2)
+    stats = cache_stats("gates.decisions")
+    hits = stats.hits
+
+    first = engine.evaluate_plan(plan, entity_data={"a": 1}, risk_tier="low", human_approved=False)
+    again = engine.evaluate_plan(
+        plan, entity_data={"a": 1, "noise": 2}, risk_tier="low", human_approved=False
+    )
+    assert not first.cache_hit
+    assert again.cache_hit and again == first
+    assert stats.hits == hits + 1
+
+    changed = engine.evaluate_plan(
+        plan, entity_data={"a": 1, "b": 1}, risk_tier="low", human_approved=False
+    )
+    assert not changed.cache_hit and changed.allowed
+
+    other_tier = engine.evaluate_plan(
+        plan, entity_data={"a": 1}, risk_tier="high", human_approved=False
+    )
+    assert not other_tier.cache_hit
+
+
+def test_unkeyed_plans_are_not_cached():
+    engine = GateEngine(decision_cache_size=8)
+    plan = compile_gate(checklist=["a"], rules=[], require_human_approval=False)
+    engine.evaluate_plan(plan, entity_data={}, risk_tier="low", human_approved=False)
+    assert not engine.evaluate_plan(
+        plan, entity_data={}, risk_tier="low", human_approved=False
+    ).cache_hit
+
+
+def test_persistent_decision_cache_is_shared_across_engines(tmp_path):
+    plan = compile_gate(
+        checklist=["a", "b"],
+        rules=[GateRule(type="completeness_min", percent=100)],
+        require_human_approval=False,
+        key=("spec", "Ticket", "Draft", "Planned"),
+    )
+    path = tmp_path / "decisions.db"
+
+    first_run = GateEngine(decision_cache_path=path)
+    first = first_run.evaluate_plan(
+        plan, entity_data={"a": 1}, risk_tier="low", human_approved=False
+    )
+    first_run.close()
+
+    second_run = GateEngine(decision_cache_path=path)
+    again = second_run.evaluate_plan(
+        plan, entity_data={"a": 1}, risk_tier="low", human_approved=False
+    )
+    changed = second_run.evaluate_plan(
+        plan, entity_data={"a": 1, "b": 1}, risk_tier="low", human_approved=False
+    )
+    stats = second_run.persistent.stats()
+    second_run.close()
+
+    assert not first.cache_hit
+    assert again.cache_hit and again == first
+    assert again.completeness == first.completeness
+    assert not changed.cache_hit and changed.allowed
+    assert (stats.hits, stats.misses) == (1, 2)
@@ -0,0 +1,187 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.engine.audit_index import AuditIndex
+from app.engine.audit_segments import AuditSegments
+from app.engine.id_migration import IdMigration
+from app.engine.identity import IdentityValidator
+from app.engine.sqlite_store import SqliteEntityStore
+from app.engine.store import EntityRecord, FileEntityStore
+
+IDS = IdentityValidator(
+    r"^TCKT-(?P<num>[0-9]+)$",
+    [r"^TICKET_(?P<num>[0-9]+)$", r"^T-(?P<num>[0-9]+)$"],
+    canonical_format="TCKT-{num}",
+)
+
+
+class _CrashingStore(FileEntityStore):
+    """Dies on the given delete_many call, after that batch's copies are written."""
+
+    def __init__(self, path: Path, crash_on: int):
+        super().__init__(path)
+        self._deletes = 0
+        self._crash_on = crash_on
+
+    def delete_many(self, keys, **kwargs):
+        self._deletes += 1
+        if self._deletes == self._crash_on:
+            raise KeyboardInterrupt
+        return super().delete_many(keys, **kwargs)
+
+
+class _UpdatingStore(FileEntityStore):
+    """Another writer updates TICKET_1 between its copy and the legacy delete."""
+
+    def delete_many(self, keys, **kwargs):
+        if ("Ticket", "TICKET_1") in keys:
+            other = FileEntityStore(self._path)
+            record = other.require("Ticket", "TICKET_1")
+            record.state = "Planned"
+            other.upsert_many([record])
+        return super().delete_many(keys, **kwargs)
+
+
+def _seed(store) -> None:
+    records = [EntityRecord("Ticket", f"TICKET_{i}", "low", "Draft", {"n": i}) for i in range(10)]
+    records += [EntityRecord("Ticket", f"T-{i}", "low", "Draft", {"n": i}) for i in range(10, 20)]
+    records.append(EntityRecord("Ticket", "TCKT-99", "high", "Planned", {"n": 99}))
+    store.upsert_many(records)
+
+
+def _audit(path: Path) -> None:
+    lines = [
+        {"entity_type": "Ticket", "entity_id": f"T-{i}", "allowed": True} for i in range(10, 20)
+    ]
+    lines.append({"entity_type": "Ticket", "from_state": "Draft"})  # entry without an entity_id
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+
+
+def _migration(store, tmp_path: Path, **kwargs) -> IdMigration:
+    return IdMigration(
+        store,
+        IDS,
+        "Ticket",
+        checkpoint=tmp_path / "checkpoint.json",
+        audit_path=tmp_path / "audit_log.jsonl",
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("kind", ["json", "sqlite"])
+def test_migration_rewrites_store_keys_and_audit(kind: str, tmp_path: Path):
+    store = (
+        FileEntityStore(tmp_path / "e.json")
+        if kind == "json"
+        else SqliteEntityStore(tmp_path / "e.db")
+    )
+    _seed(store)
+    _audit(tmp_path / "audit_log.jsonl")
+
+    state = _migration(store, tmp_path, batch_size=4).run()
+
+    assert state.migrated == 20
+    assert state.audit_rewritten == 10
+    ids = [s.entity_id for s in store.query(entity_type="Ticket")]
+    assert len(ids) == 21 and all(i.startswith("TCKT-") for i in ids)
+    assert store.require("Ticket", "TCKT-12").data == {"n": 12}
+    assert store.require("Ticket", "TCKT-99").state == "Planned"
+
+    audit = [json.loads(line) for line in (tmp_path / "audit_log.jsonl").read_text().splitlines()]
+    assert [a.get("entity_id") for a in audit[:2]] == ["TCKT-10", "TCKT-11"]
+    assert audit[-1] == {"entity_type": "Ticket", "from_state": "Draft"}
+    assert not (tmp_path / "checkpoint.json").exists()
+
+
+def test_migration_resumes_after_interrupted_batch(tmp_path: Path):
+    crashing = _CrashingStore(tmp_path / "e.json", crash_on=2)
+    _seed(crashing)
+    with pytest.raises(KeyboardInterrupt):
+        _migration(crashing, tmp_path, batch_size=4).run()
+
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert checkpoint["pending"]  # second batch copied but not yet deleted
+
+    store = FileEntityStore(tmp_path / "e.json")
+    state = _migration(store, tmp_path, batch_size=4).run()
+
+    assert state.migrated == 20
+    assert state.conflicts == []
+    assert len(list(store.query(entity_type="Ticket"))) == 21
+
+
+def test_legacy_entity_updated_during_migration_is_kept(tmp_path: Path):
+    store = _UpdatingStore(tmp_path / "e.json")
+    _seed(store)
+
+    state = _migration(store, tmp_path, batch_size=4).run()
+
+    assert state.changed == ["TICKET_1"]
+    assert state.migrated == 19
+    assert store.require("Ticket", "TICKET_1").state == "Planned"
+    assert store.get("Ticket", "TCKT-1") is None
+
+
+def test_existing_canonical_id_is_reported_as_conflict(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "e.json")
+    store.upsert_many([
+        EntityRecord("Ticket", "TICKET_5", "low", "Draft", {"old": True}),
+        EntityRecord("Ticket", "TCKT-5", "low", "Draft", {"new": True}),
+    ])
+
+    state = _migration(store, tmp_path).run()
+
+    assert state.conflicts == ["TICKET_5"]
+    assert store.require("Ticket", "TICKET_5").data == {"old": True}
+    assert store.require("Ticket", "TCKT-5").data == {"new": True}
+
+
+def test_migration_rewrites_rotated_audit_segments(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "e.json")
+    _seed(store)
+    audit_path = tmp_path / "audit_log.jsonl"
+    _audit(audit_path)
+    AuditSegments(audit_path).rotate()
+    _audit(audit_path)
+    index = AuditIndex(AuditSegments(audit_path))
+    index.catch_up()
+    index.close()
+
+    state = _migration(store, tmp_path).run()
+
+    assert state.audit_rewritten == 20
+    rows = list(AuditSegments(audit_path).read())
+    assert [r.get("entity_id") for r in rows].count("TCKT-15") == 2
+    assert not any(str(r.get("entity_id")).startswith("T-") for r in rows)
+    # The history index was reset and follows the rewritten offsets.
+    history = list(AuditIndex(AuditSegments(audit_path)).lookup("Ticket", "TCKT-15"))
+    assert [r["entity_id"] for r in history] == ["TCKT-15", "TCKT-15"]
+
+
+@pytest.mark.parametrize("rotate", [False, True])
+def test_audit_appends_during_migration_are_kept(rotate: bool, tmp_path: Path, monkeypatch):
+    store = FileEntityStore(tmp_path / "e.json")
+    _seed(store)
+    audit_path = tmp_path / "audit_log.jsonl"
+    _audit(audit_path)
+    migration = _migration(store, tmp_path)
+    bulk_pass = migration._migrate_audit
+
+    def _then_append(state):
+        bulk_pass(state)
+        monkeypatch.setattr(migration, "_migrate_audit", bulk_pass)
+        # A transition logged after the bulk copy, possibly after a rotation.
+        if rotate:
+            AuditSegments(audit_path).rotate()
+        with audit_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"entity_type": "Ticket", "entity_id": "T-12", "late": True}) + "\n")
+
+    monkeypatch.setattr(migration, "_migrate_audit", _then_append)
+    migration.run()
+
+    rows = list(AuditSegments(audit_path).read())
+    assert len(rows) == 12
+    assert rows[-1] == {"entity_type": "Ticket", "entity_id": "TCKT-12", "late": True}
+    assert not any(str(r.get("entity_id")).startswith("T-") for r in rows)
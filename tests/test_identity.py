@@ -1,6 +1,7 @@
 import pytest
 
-from app.engine.identity import IdentityValidator, IdentityError
+from app.engine.identity import IdentityError, IdentityValidator
+
 
 def test_canonical_id_ok():
     v = IdentityValidator(r"^TCKT-[0-9]+$", [r"^TICKET_[0-9]+$", r"^T-[0-9]+$"])
@@ -17,4 +18,57 @@ def test_legacy_id_detected():
 def test_invalid_id_rejected():
     v = IdentityValidator(r"^TCKT-[0-9]+$", [r"^TICKET_[0-9]+$", r"^T-[0-9]+$"])
     with pytest.raises(IdentityError):
-        v.validate("Ticket", "ABC-999")
\ No newline at end of file
+        v.validate("Ticket", "ABC-999")
+
+def test_single_pass_classifies_and_extracts_named_groups():
+    v = IdentityValidator(
+        r"^TCKT-(?P<num>[0-9]+)$",
+        [r"^TICKET_(?P<num>[0-9]+)$", r"^T-(?P<num>[0-9]+)$"],
+    )
+    r = v.validate("Ticket", "T-77")
+    assert r.pattern == "legacy_1"
+    assert r.groups == {"num": "77"}
+    assert v.validate("Ticket", "TCKT-5").groups == {"num": "5"}
+    assert v.classify("Ticket", "TCKT-") is None
+
+def test_uncombinable_patterns_fall_back_to_sequential():
+    v = IdentityValidator(r"^(A)\1-[0-9]+$", [r"(?i)^tckt-[0-9]+$"])
+    assert v.validate("Ticket", "AA-1").pattern == "canonical"
+    assert v.validate("Ticket", "TcKt-9").pattern == "legacy_0"
+    with pytest.raises(IdentityError):
+        v.validate("Ticket", "AB-1")
+
+def test_validate_many_matches_validate():
+    ids = [f"{prefix}{i}" for i in range(500) for prefix in ("TCKT-", "TICKET_", "T-", "BAD/")]
+    v = IdentityValidator(r"^TCKT-[0-9]+$", [r"^TICKET_[0-9]+$", r"^T-[0-9]+$"])
+    seq = IdentityValidator(r"^TCKT-[0-9]+$", [r"^TICKET_[0-9]+$", r"^T-[0-9]+$"])
+    seq._combined = None
+    for (id_value, result), (_, expected) in zip(
+        v.validate_many("Ticket", ids), seq.validate_many("Ticket", ids)
+    ):
+        assert result == expected, id_value
+
+def test_legacy_ids_normalize_with_canonical_format():
+    v = IdentityValidator(
+        r"^TCKT-(?P<num>[0-9]+)$",
+        [r"^TICKET_(?P<num>[0-9]+)$", r"^T-(?P<num>[0-9]+)$"],
+        canonical_format="TCKT-{num}",
+    )
+    assert v.validate("Ticket", "TICKET_1024").canonical_id == "TCKT-1024"
+    assert v.normalize("Ticket", "T-1024") == "TCKT-1024"
+    assert v.normalize("Ticket", "TCKT-7") == "TCKT-7"
+    assert v.format_number(42) == "TCKT-42"
+    with pytest.raises(IdentityError):
+        v.normalize("Ticket", "ABC-1")
+
+def test_canonical_format_must_be_fillable_and_canonical():
+    with pytest.raises(IdentityError):
+        IdentityValidator(r"^TCKT-[0-9]+$", [r"^TICKET_[0-9]+$"], canonical_format="TCKT-{num}")
+
+    # A template that does not produce a canonical id leaves the id un-normalized.
+    v = IdentityValidator(
+        r"^TCKT-[0-9]+$", [r"^TICKET_(?P<num>[0-9]+)$"], canonical_format="TK-{num}"
+    )
+    assert v.validate("Ticket", "TICKET_5").canonical_id is None
+    with pytest.raises(IdentityError):
+        v.normalize("Ticket", "TICKET_5")
@@ -0,0 +1,116 @@
+import json
+import time
+from pathlib import Path
+
+from app.engine.locking import file_lock
+from app.engine.log_store import LogEntityStore, migrate_json_store
+from app.engine.store import EntityRecord
+
+
+def _rec(entity_id: str, state: str = "Draft") -> EntityRecord:
+    return EntityRecord(
+        entity_type="Ticket",
+        entity_id=entity_id,
+        risk_tier="low",
+        state=state,
+        data={"has_title": True},
+    )
+
+
+def test_upsert_and_get_roundtrip(tmp_path: Path):
+    store = LogEntityStore(tmp_path / "log")
+    store.upsert(_rec("TCKT-1"))
+    store.upsert(_rec("TCKT-1", state="Planned"))
+
+    rec = store.require("Ticket", "TCKT-1")
+    assert rec.state == "Planned"
+    assert store.get("Ticket", "TCKT-2") is None
+
+
+def test_index_is_rebuilt_on_reopen(tmp_path: Path):
+    store = LogEntityStore(tmp_path / "log")
+    store.upsert(_rec("TCKT-1"))
+    store.upsert(_rec("TCKT-2", state="Planned"))
+
+    reopened = LogEntityStore(tmp_path / "log")
+    assert reopened.require("Ticket", "TCKT-2").state == "Planned"
+    assert len(reopened) == 2
+
+
+def test_compaction_keeps_only_live_records(tmp_path: Path):
+    store = LogEntityStore(tmp_path / "log", segment_bytes=200, compact_after_segments=100)
+    for i in range(20):
+        store.upsert(_rec("TCKT-1", state=f"S{i}"))
+        store.upsert(_rec(f"TCKT-{i + 2}"))
+
+    store.compact()
+
+    segments = sorted(p.name for p in (tmp_path / "log").glob("segment-*.log"))
+    assert len(segments) == 2  # compacted + active
+    assert store.require("Ticket", "TCKT-1").state == "S19"
+
+    reopened = LogEntityStore(tmp_path / "log")
+    assert reopened.require("Ticket", "TCKT-1").state == "S19"
+    assert len(reopened) == 21
+
+
+def test_deletes_survive_compaction_and_reopen(tmp_path: Path):
+    store = LogEntityStore(tmp_path / "log", segment_bytes=200, compact_after_segments=100)
+    for i in range(10):
+        store.upsert(_rec(f"TCKT-{i}"))
+    assert store.delete_many([("Ticket", "TCKT-3"), ("Ticket", "TCKT-3")]) == 1
+    store.upsert(_rec("TCKT-10"))
+    store.compact()
+
+    for s in (store, LogEntityStore(tmp_path / "log")):
+        assert s.get("Ticket", "TCKT-3") is None
+        assert len(s) == 10
+
+
+def test_background_compaction(tmp_path: Path):
+    store = LogEntityStore(tmp_path / "log", segment_bytes=200, compact_after_segments=2)
+    for i in range(30):
+        store.upsert(_rec(f"TCKT-{i % 5}", state=f"S{i}"))
+    store.wait_for_compaction()
+
+    for i in range(25, 30):
+        assert store.require("Ticket", f"TCKT-{i % 5}").state == f"S{i}"
+
+
+def test_migrate_json_store(tmp_path: Path):
+    json_path = tmp_path / "entities.json"
+    json_path.write_text(
+        json.dumps({"Ticket:TCKT-7": {
+            "entity_type": "Ticket",
+            "entity_id": "TCKT-7",
+            "risk_tier": "high",
+            "state": "Done",
+            "data": {},
+        }}),
+        encoding="utf-8",
+    )
+    store = LogEntityStore(tmp_path / "log")
+    assert migrate_json_store(json_path, store) == 1
+    assert store.require("Ticket", "TCKT-7").risk_tier == "high"
+
+
+def test_compaction_waits_for_other_compactors(tmp_path: Path):
+    store = LogEntityStore(tmp_path / "log", segment_bytes=200, compact_after_segments=100)
+    for i in range(20):
+        store.upsert(_rec(f"TCKT-{i % 4}", state=f"S{i}"))
+    closed = sorted((tmp_path / "log").glob("segment-*.log"))[:-1]
+
+    # Another process compacting the same directory holds COMPACT.LOCK.
+    with file_lock(tmp_path / "log" / "COMPACT.LOCK"):
+        store.compact(background=True)
+        store.upsert(_rec("TCKT-9"))  # appends are not blocked meanwhile
+        time.sleep(0.1)
+        assert not list((tmp_path / "log").glob("*.compacting"))
+        assert all(p.exists() for p in closed)
+    store.wait_for_compaction()
+
+    assert len(list((tmp_path / "log").glob("segment-*.log"))) == 2
+    for s in (store, LogEntityStore(tmp_path / "log")):
+        states = [s.require("Ticket", f"TCKT-{i}").state for i in range(4)]
+        assert states == ["S16", "S17", "S18", "S19"]
+        assert len(s) == 5
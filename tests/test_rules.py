@@ -0,0 +1,102 @@
+import pytest
+
+from app.engine.bulk_gates import BulkGateEvaluator
+from app.engine.gates import GateEngine, compile_gate
+from app.engine.rules import RuleError, RuleRegistry, default_rule_registry
+from app.models import GateRule
+
+
+def _registry(calls: list):
+    registry = RuleRegistry()
+    for name in default_rule_registry().names():
+        builtin = default_rule_registry().get(name)
+        registry.register(name, builtin.lower, cost=builtin.cost, fields=builtin.fields)
+
+    @registry.register("linked_pr_merged", cost=50)
+    def lower_linked_pr(rule):
+        def check(ctx):
+            calls.append(ctx.entity_data.get("pr"))
+            if ctx.entity_data.get("pr_state") != "merged":
+                return f"Linked PR {ctx.entity_data.get('pr')} not merged ({rule.repo}).", False
+            return None, False
+
+        return check
+
+    return registry
+
+
+RULES = [
+    GateRule(type="linked_pr_merged", repo="core"),
+    GateRule(type="completeness_min", percent=100),
+]
+
+
+def test_register_rejects_duplicates_unless_replacing():
+    registry = RuleRegistry()
+    registry.register("x", lambda rule: lambda ctx: (None, False))
+    with pytest.raises(RuleError):
+        registry.register("x", lambda rule: lambda ctx: (None, False))
+    registry.register("x", lambda rule: lambda ctx: ("no", False), replace=True)
+    assert registry.names() == ["x"]
+
+
+def test_fail_fast_runs_cheap_rules_first_and_stops():
+    calls = []
+    plan = compile_gate(
+        checklist=["a"], rules=RULES, require_human_approval=False, registry=_registry(calls)
+    )
+    engine = GateEngine()
+    data = {"pr": 7, "pr_state": "open"}
+
+    fast = engine.evaluate_plan(
+        plan, entity_data=data, risk_tier="low", human_approved=False, fail_fast=True
+    )
+    assert fast.reasons == ("Completeness 0% is below required 100%.",)
+    assert calls == []
+
+    full = engine.evaluate_plan(plan, entity_data=data, risk_tier="low", human_approved=False)
+    assert full.reasons == (
+        "Linked PR 7 not merged (core).",
+        "Completeness 0% is below required 100%.",
+    )
+    assert calls == [7]
+
+    ok = engine.evaluate_plan(
+        plan, entity_data={**data, "a": True, "pr_state": "merged"}, risk_tier="low",
+        human_approved=False, fail_fast=True,
+    )
+    assert ok.allowed and ok.completeness.percent == 100
+
+
+def test_rules_without_declared_fields_disable_decision_cache():
+    plan = compile_gate(
+        checklist=["a"], rules=RULES, require_human_approval=False, key=("k",),
+        registry=_registry([]),
+    )
+    assert plan.key is None
+    keyed = compile_gate(checklist=["a"], rules=RULES[1:], require_human_approval=False, key=("k",))
+    assert keyed.key == ("k",)
+
+
+def test_bulk_runs_plugin_rules_per_entity():
+    calls = []
+    registry = _registry(calls)
+    rules = [GateRule(type="always_block")] + RULES
+    data = [{"pr": 1, "pr_state": "merged", "a": 1}, {"pr": 2}]
+    engine = GateEngine()
+
+    for gate_rules in (RULES, rules):
+        plan = compile_gate(
+            checklist=["a"], rules=gate_rules, require_human_approval=False, registry=registry
+        )
+        report = BulkGateEvaluator(plan, registry=registry).evaluate(
+            entity_data=data, risk_tiers=["low", "low"]
+        )
+        for i, d in enumerate(data):
+            expected = engine.evaluate_plan(
+                plan, entity_data=d, risk_tier="low", human_approved=False
+            )
+            assert report.decision(i).reasons == expected.reasons
+            assert bool(report.allowed[i]) is expected.allowed
+    # always_block stops evaluation before the PR lookup, as in the scalar engine.
+    assert calls == [1, 2, 1, 2]
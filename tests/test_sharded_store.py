@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+
+from app.engine.sharded_store import ShardedFileEntityStore, reshard_json_store, shard_of
+from app.engine.store import EntityRecord, FileEntityStore, StoreError
+
+
+def _records(n: int) -> list[EntityRecord]:
+    return [EntityRecord("Ticket", f"TCKT-{i:03d}", "low", "Draft", {}) for i in range(n)]
+
+
+def test_upsert_touches_only_one_shard(tmp_path: Path):
+    store = ShardedFileEntityStore(tmp_path / "shards", shards=4)
+    store.upsert_many(_records(40))
+    before = {p.name: p.stat().st_mtime_ns for p in (tmp_path / "shards" / "Ticket").glob("*.json")}
+
+    store.upsert(EntityRecord("Ticket", "TCKT-007", "low", "Planned", {}))
+
+    after = {p.name: p.stat().st_mtime_ns for p in (tmp_path / "shards" / "Ticket").glob("*.json")}
+    changed = [name for name in before if before[name] != after[name]]
+    assert changed == [f"shard-{shard_of('TCKT-007', 4):03d}.json"]
+    assert store.require("Ticket", "TCKT-007").state == "Planned"
+
+
+def test_query_merges_shards_in_key_order(tmp_path: Path):
+    store = ShardedFileEntityStore(tmp_path / "shards", shards=4)
+    store.upsert_many(_records(25))
+
+    page1 = list(store.query(entity_type="Ticket", limit=10))
+    page2 = list(store.query(entity_type="Ticket", after=page1[-1].key, limit=10))
+    ids = [s.entity_id for s in page1 + page2]
+    assert ids == [f"TCKT-{i:03d}" for i in range(20)]
+
+
+def test_reads_of_unknown_type_create_no_directory(tmp_path: Path):
+    store = ShardedFileEntityStore(tmp_path / "shards", shards=4)
+    store.upsert_many(_records(5))
+
+    assert store.get("Bug", "BUG-1") is None
+    assert store.get_many([("Bug", "BUG-1")]) == {}
+    assert store.delete_many([("Bug", "BUG-1")]) == 0
+    assert list(store.query(entity_type="Bug")) == []
+    assert store.last_number("Bug", "BUG-") is None
+
+    assert sorted(p.name for p in (tmp_path / "shards").iterdir()) == ["Ticket", "layout.json"]
+    assert [s.entity_type for s in store.query()] == ["Ticket"] * 5
+
+
+def test_shard_count_is_fixed(tmp_path: Path):
+    ShardedFileEntityStore(tmp_path / "shards", shards=4)
+    with pytest.raises(StoreError):
+        ShardedFileEntityStore(tmp_path / "shards", shards=8)
+
+
+def test_reshard_json_store_keeps_versions(tmp_path: Path):
+    single = FileEntityStore(tmp_path / "entities.json")
+    single.upsert_many(_records(10))
+    single.upsert(single.require("Ticket", "TCKT-003"))
+
+    target = ShardedFileEntityStore(tmp_path / "shards", shards=3)
+    assert reshard_json_store(tmp_path / "entities.json", target) == 10
+    assert target.require("Ticket", "TCKT-003").version == 2
+    assert target.require("Ticket", "TCKT-009").version == 1
+    # Writes after the copy carry on from the copied versions.
+    target.upsert(EntityRecord("Ticket", "TCKT-003", "low", "Planned", {}))
+    assert target.require("Ticket", "TCKT-003").version == 3
+
+
+def test_id_range_merges_shards_in_numeric_order(tmp_path: Path):
+    store = ShardedFileEntityStore(tmp_path / "shards", shards=4)
+    store.upsert_many(
+        EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {}) for i in range(0, 200, 7)
+    )
+
+    ids = [s.entity_id for s in store.id_range("Ticket", "TCKT-", start=50, end=100)]
+    assert ids == [f"TCKT-{i}" for i in range(56, 101, 7)]
+    assert store.last_number("Ticket", "TCKT-") == 196
@@ -0,0 +1,57 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app import spec_loader
+from app.engine.compiled_spec import CompiledSpec
+from app.spec_loader import load_compiled_spec, spec_cache_path
+
+
+@pytest.fixture
+def spec_copy(tmp_path: Path) -> Path:
+    path = tmp_path / "guardian_spec.yaml"
+    shutil.copy("guardian_spec.yaml", path)
+    return path
+
+
+def test_second_load_skips_yaml_and_validation(spec_copy: Path, monkeypatch):
+    first = load_compiled_spec(spec_copy, use_cache=True)
+    assert spec_cache_path(spec_copy).exists()
+
+    def _no_yaml(*_args, **_kwargs):
+        raise AssertionError("YAML should not be parsed on a cache hit")
+
+    monkeypatch.setattr(spec_loader.yaml, "safe_load", _no_yaml)
+    second = load_compiled_spec(spec_copy, use_cache=True)
+
+    assert isinstance(second, CompiledSpec)
+    assert second.spec == first.spec
+    assert second.entities["Ticket"].resolve("Draft", "Planned").plan.checks
+
+
+def test_cache_invalidated_when_spec_changes(spec_copy: Path):
+    load_compiled_spec(spec_copy, use_cache=True)
+    spec_copy.write_text(
+        spec_copy.read_text(encoding="utf-8").replace(
+            "risk_tiers: [low, medium, high]", "risk_tiers: [low, high]"
+        ),
+        encoding="utf-8",
+    )
+    assert load_compiled_spec(spec_copy, use_cache=True).spec.risk_tiers == ["low", "high"]
+
+
+def test_corrupt_cache_falls_back(spec_copy: Path):
+    spec_cache_path(spec_copy).write_bytes(b"not a pickle")
+    compiled = load_compiled_spec(spec_copy, use_cache=True)
+    assert "Ticket" in compiled.entities
+
+
+def test_version_mismatch_falls_back(spec_copy: Path, monkeypatch):
+    load_compiled_spec(spec_copy, use_cache=True)
+    monkeypatch.setattr(spec_loader, "SPEC_CACHE_FORMAT", spec_loader.SPEC_CACHE_FORMAT + 1)
+    calls = []
+    real = spec_loader.yaml.safe_load
+    monkeypatch.setattr(spec_loader.yaml, "safe_load", lambda c: calls.append(1) or real(c))
+    load_compiled_spec(spec_copy, use_cache=True)
+    assert calls == [1]
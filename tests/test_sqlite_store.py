@@ -0,0 +1,123 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app import main
+from app.engine.sharded_store import ShardedFileEntityStore
+from app.engine.sqlite_store import SqliteEntityStore
+from app.engine.store import EntityRecord, FileEntityStore, StoreError
+from app.engine.store_factory import StoreConfig, get_store_config, open_store
+
+
+def _rec(entity_id: str, state: str = "Draft") -> EntityRecord:
+    return EntityRecord(
+        entity_type="Ticket",
+        entity_id=entity_id,
+        risk_tier="medium",
+        state=state,
+        data={"has_title": True},
+    )
+
+
+def test_sqlite_store_roundtrip(tmp_path: Path):
+    store = SqliteEntityStore(tmp_path / "entities.db")
+    store.upsert(_rec("TCKT-1"))
+    store.upsert(_rec("TCKT-1", state="Planned"))
+
+    rec = store.require("Ticket", "TCKT-1")
+    assert rec.state == "Planned"
+    assert rec.data == {"has_title": True}
+    assert rec.completeness is None
+    assert store.get("Ticket", "TCKT-2") is None
+
+    rec.completeness = {"checklist": "abc", "bits": 1, "satisfied": 1}
+    store.upsert(rec)
+    assert store.require("Ticket", "TCKT-1").completeness == rec.completeness
+    with pytest.raises(StoreError):
+        store.require("Ticket", "TCKT-2")
+
+
+def test_sqlite_store_uses_wal_and_indexes(tmp_path: Path):
+    path = tmp_path / "entities.db"
+    SqliteEntityStore(path).upsert(_rec("TCKT-1"))
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT entity_id FROM entities WHERE entity_type = ? AND state = ?",
+        ("Ticket", "ReadyForReview"),
+    ).fetchall()
+    assert any("idx_entities_type_state" in row[-1] for row in plan)
+
+
+def test_sqlite_store_backfills_numeric_id_columns(tmp_path: Path):
+    path = tmp_path / "entities.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE entities (entity_type TEXT NOT NULL, entity_id TEXT NOT NULL, "
+        "risk_tier TEXT NOT NULL, state TEXT NOT NULL, data TEXT NOT NULL, "
+        "PRIMARY KEY (entity_type, entity_id)) WITHOUT ROWID"
+    )
+    conn.executemany(
+        "INSERT INTO entities VALUES ('Ticket', ?, 'low', 'Draft', '{}')",
+        [("TCKT-12",), ("TCKT-3",), ("misc",)],
+    )
+    conn.commit()
+    conn.close()
+
+    store = SqliteEntityStore(path)
+    assert [s.entity_id for s in store.id_range("Ticket", "TCKT-")] == ["TCKT-3", "TCKT-12"]
+    plan = store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT MAX(id_num) FROM entities "
+        "WHERE entity_type = ? AND id_prefix = ?",
+        ("Ticket", "TCKT-"),
+    ).fetchall()
+    assert any("idx_entities_id_num" in row[-1] for row in plan)
+
+
+def test_store_config_from_env(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("GUARDIAN_STORE_BACKEND", "sqlite")
+    monkeypatch.setenv("GUARDIAN_STORE_PATH", str(tmp_path / "x.db"))
+    cfg = get_store_config()
+    assert cfg == StoreConfig(backend="sqlite", path=tmp_path / "x.db")
+    assert isinstance(open_store(cfg), SqliteEntityStore)
+
+    monkeypatch.setenv("GUARDIAN_STORE_BACKEND", "bogus")
+    with pytest.raises(StoreError):
+        get_store_config()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "log"])
+def test_change_feed_is_refused_by_backends_without_one(backend: str, tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("GUARDIAN_STORE_BACKEND", backend)
+    monkeypatch.setenv("GUARDIAN_STORE_PATH", str(tmp_path / "store"))
+    monkeypatch.setenv("GUARDIAN_CHANGE_FEED", str(tmp_path / "changes.jsonl"))
+    with pytest.raises(StoreError, match="GUARDIAN_CHANGE_FEED"):
+        open_store()
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {"GUARDIAN_STORE_BACKEND": "bogus"},
+        {"GUARDIAN_STORE_BACKEND": "sqlite", "GUARDIAN_CHANGE_FEED": "changes.jsonl"},
+        {"GUARDIAN_STORE_BACKEND": "sharded", "GUARDIAN_STORE_SHARDS": "8"},
+    ],
+)
+def test_cli_reports_store_errors(env: dict, tmp_path: Path, monkeypatch, capsys):
+    ShardedFileEntityStore(tmp_path / "store", shards=4)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GUARDIAN_STORE_PATH", str(tmp_path / "store"))
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr("sys.argv", ["guardian", "list"])
+
+    assert main.main() == 1
+    assert capsys.readouterr().out.startswith("❌ ")
+
+
+def test_default_store_is_json(monkeypatch):
+    monkeypatch.delenv("GUARDIAN_STORE_BACKEND", raising=False)
+    monkeypatch.delenv("GUARDIAN_STORE_PATH", raising=False)
+    assert isinstance(open_store(), FileEntityStore)
@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from app.engine.cache import LRUCache, cache_stats_snapshot
+from app.engine.store import EntityRecord, FileEntityStore
+
+
+def _seed(path: Path) -> FileEntityStore:
+    store = FileEntityStore(path, cache_size=2)
+    store.upsert_many(
+        EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {"n": i}) for i in range(3)
+    )
+    return store
+
+
+def test_cache_serves_repeat_reads_without_parsing(tmp_path: Path, monkeypatch):
+    store = _seed(tmp_path / "entities.json")
+    assert store.require("Ticket", "TCKT-1").data == {"n": 1}
+
+    monkeypatch.setattr(store, "_read_all", lambda: (_ for _ in ()).throw(AssertionError("parsed")))
+    assert store.require("Ticket", "TCKT-1").data == {"n": 1}
+    assert store.cache_stats.hits >= 1
+    assert cache_stats_snapshot()["store.records"]["hits"] >= 1
+
+
+def test_cached_records_are_not_shared(tmp_path: Path):
+    store = _seed(tmp_path / "entities.json")
+    rec = store.require("Ticket", "TCKT-1")
+    rec.data["n"] = 99
+    rec.state = "Done"
+    assert store.require("Ticket", "TCKT-1").data == {"n": 1}
+    assert store.require("Ticket", "TCKT-1").state == "Draft"
+
+
+def test_cache_invalidated_by_external_writer(tmp_path: Path):
+    path = tmp_path / "entities.json"
+    store = _seed(path)
+    assert store.require("Ticket", "TCKT-1").state == "Draft"
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload["Ticket:TCKT-1"]["state"] = "Planned"
+    path.write_text(json.dumps(payload, indent=4), encoding="utf-8")
+
+    assert store.require("Ticket", "TCKT-1").state == "Planned"
+    assert store.cache_stats.invalidations >= 1
+
+
+def test_own_writes_keep_cache_warm(tmp_path: Path):
+    store = _seed(tmp_path / "entities.json")
+    rec = store.require("Ticket", "TCKT-1")
+    rec.state = "Planned"
+    store.upsert(rec, cas=True)
+
+    hits = store.cache_stats.hits
+    assert store.require("Ticket", "TCKT-1").state == "Planned"
+    assert store.cache_stats.hits == hits + 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.stats.evictions == 1
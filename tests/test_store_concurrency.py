@@ -0,0 +1,89 @@
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from app.engine.log_store import LogEntityStore
+from app.engine.sqlite_store import SqliteEntityStore
+from app.engine.store import ConcurrencyError, EntityRecord, FileEntityStore
+
+
+def _make_store(kind: str, tmp_path: Path):
+    if kind == "json":
+        return FileEntityStore(tmp_path / "entities.json")
+    if kind == "log":
+        return LogEntityStore(tmp_path / "entities.log")
+    return SqliteEntityStore(tmp_path / "entities.db")
+
+
+@pytest.mark.parametrize("kind", ["json", "log", "sqlite"])
+def test_versions_bump_on_every_write(kind: str, tmp_path: Path):
+    store = _make_store(kind, tmp_path)
+    rec = EntityRecord("Ticket", "TCKT-1", "low", "Draft", {})
+    store.upsert(rec, cas=True)
+    assert rec.version == 1
+
+    rec.state = "Planned"
+    store.upsert(rec, cas=True)
+    assert store.require("Ticket", "TCKT-1").version == 2
+
+
+@pytest.mark.parametrize("kind", ["json", "log", "sqlite"])
+def test_cas_rejects_stale_writer(kind: str, tmp_path: Path):
+    store = _make_store(kind, tmp_path)
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}))
+
+    first = store.require("Ticket", "TCKT-1")
+    second = store.require("Ticket", "TCKT-1")
+    first.state = "Planned"
+    store.upsert(first, cas=True)
+
+    second.state = "Done"
+    with pytest.raises(ConcurrencyError):
+        store.upsert(second, cas=True)
+    assert store.require("Ticket", "TCKT-1").state == "Planned"
+
+
+@pytest.mark.parametrize("kind", ["json", "log", "sqlite"])
+def test_plain_writes_never_move_the_version_back(kind: str, tmp_path: Path):
+    store = _make_store(kind, tmp_path)
+    rec = EntityRecord("Ticket", "TCKT-1", "low", "Draft", {})
+    for _ in range(3):
+        store.upsert(rec, cas=True)
+    stale = store.require("Ticket", "TCKT-1")
+    store.upsert(rec, cas=True)
+
+    fresh = EntityRecord("Ticket", "TCKT-1", "high", "Draft", {})
+    store.upsert(fresh)
+    assert fresh.version == 5
+    store.upsert(stale)
+    assert stale.version == 6
+    assert store.require("Ticket", "TCKT-1").version == 6
+    store.upsert_many([EntityRecord("Ticket", "TCKT-1", "low", "Done", {})] * 2)
+    assert store.require("Ticket", "TCKT-1").version == 8
+
+
+def test_cas_create_refuses_existing(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json")
+    store.upsert(EntityRecord("Ticket", "TCKT-1", "low", "Draft", {}), cas=True)
+    with pytest.raises(ConcurrencyError):
+        store.upsert(EntityRecord("Ticket", "TCKT-1", "high", "Draft", {}), cas=True)
+
+
+def _bump(path: str, worker: int, n: int) -> None:
+    store = FileEntityStore(Path(path))
+    for i in range(n):
+        store.upsert(EntityRecord("Ticket", f"TCKT-{worker}-{i}", "low", "Draft", {}))
+
+
+def test_parallel_writers_do_not_lose_updates(tmp_path: Path):
+    path = tmp_path / "entities.json"
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_bump, args=(str(path), w, 10)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    store = FileEntityStore(path)
+    assert len(list(store.query(entity_type="Ticket"))) == 40
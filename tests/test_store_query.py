@@ -0,0 +1,168 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.engine.log_store import LogEntityStore
+from app.engine.sqlite_store import SqliteEntityStore
+from app.engine.store import EntityRecord, EntityStore, FileEntityStore, summarize
+from app.engine.store_index import EntitySummary, FieldIndex
+
+
+def _make_store(kind: str, tmp_path: Path):
+    if kind == "json":
+        return FileEntityStore(tmp_path / "entities.json")
+    if kind == "log":
+        return LogEntityStore(tmp_path / "entities.log")
+    return SqliteEntityStore(tmp_path / "entities.db")
+
+
+def _seed(store) -> None:
+    states = ["Draft", "ReadyForReview"]
+    tiers = ["low", "medium", "high"]
+    store.upsert_many(
+        EntityRecord("Ticket", f"TCKT-{i:03d}", tiers[i % 3], states[i % 2], {}) for i in range(30)
+    )
+
+
+@pytest.mark.parametrize("kind", ["json", "log", "sqlite"])
+def test_query_filters_and_paginates(kind: str, tmp_path: Path):
+    store = _make_store(kind, tmp_path)
+    _seed(store)
+
+    ready = list(store.query(entity_type="Ticket", state="ReadyForReview"))
+    assert len(ready) == 15
+    assert all(s.state == "ReadyForReview" for s in ready)
+    assert [s.entity_id for s in ready] == sorted(s.entity_id for s in ready)
+
+    page1 = list(store.query(state="ReadyForReview", risk_tier="high", limit=2))
+    page2 = list(
+        store.query(state="ReadyForReview", risk_tier="high", after=page1[-1].key, limit=2)
+    )
+    assert [s.entity_id for s in page1] == ["TCKT-005", "TCKT-011"]
+    assert [s.entity_id for s in page2] == ["TCKT-017", "TCKT-023"]
+
+
+@pytest.mark.parametrize("kind", ["json", "log", "sqlite"])
+def test_query_sees_state_changes(kind: str, tmp_path: Path):
+    store = _make_store(kind, tmp_path)
+    _seed(store)
+    store.upsert(EntityRecord("Ticket", "TCKT-000", "low", "ReadyForReview", {}))
+
+    keys = [s.entity_id for s in store.query(state="ReadyForReview", risk_tier="low")]
+    assert keys[0] == "TCKT-000"
+    assert "TCKT-000" not in [s.entity_id for s in store.query(state="Draft")]
+
+
+def test_json_store_query_does_not_decode_store(tmp_path: Path, monkeypatch):
+    store = FileEntityStore(tmp_path / "entities.json")
+    _seed(store)
+
+    def _boom():
+        raise AssertionError("query should be served from the index")
+
+    monkeypatch.setattr(store, "_read_all", _boom)
+    assert len(list(store.query(state="Draft"))) == 15
+
+
+def test_json_store_rebuilds_stale_index(tmp_path: Path):
+    store = FileEntityStore(tmp_path / "entities.json")
+    _seed(store)
+    store.close()
+    with sqlite3.connect(tmp_path / "entities.json.index.db") as conn:
+        conn.execute("DELETE FROM summaries WHERE state = 'Draft'")
+        conn.execute("UPDATE source SET fingerprint = '[0, 0, 0]'")
+    assert len(list(FileEntityStore(tmp_path / "entities.json").query(state="Draft"))) == 15
+
+    (tmp_path / "entities.json.index.db").write_bytes(b"not a database")
+    assert len(list(FileEntityStore(tmp_path / "entities.json").query(state="Draft"))) == 15
+
+
+def test_json_store_writes_update_index_rows_in_place(tmp_path: Path, monkeypatch):
+    store = FileEntityStore(tmp_path / "entities.json")
+    _seed(store)
+
+    def _boom(*_args):
+        raise AssertionError("an in-sync index should not be rebuilt")
+
+    monkeypatch.setattr(store._index, "rebuild", _boom)
+    store.upsert(EntityRecord("Ticket", "TCKT-000", "low", "ReadyForReview", {}, version=1))
+    store.delete_many([("Ticket", "TCKT-001")])
+    ready = store.query(state="ReadyForReview", limit=2)
+    assert [s.entity_id for s in ready] == ["TCKT-000", "TCKT-003"]
+
+
+def test_field_index_remove():
+    index = FieldIndex()
+    rec = EntityRecord("Ticket", "TCKT-1", "low", "Draft", {})
+    index.put(summarize(rec))
+    index.remove("Ticket:TCKT-1")
+    assert list(index.select(state="Draft")) == []
+    assert len(index) == 0
+
+
+@pytest.mark.parametrize("kind", ["json", "log", "sqlite"])
+def test_delete_many_removes_records_and_index_entries(kind: str, tmp_path: Path):
+    store = _make_store(kind, tmp_path)
+    _seed(store)
+
+    keys = [("Ticket", "TCKT-001"), ("Ticket", "TCKT-002"), ("Ticket", "TCKT-999")]
+    assert store.delete_many(keys) == 2
+    assert store.get("Ticket", "TCKT-001") is None
+    ids = [s.entity_id for s in store.query(entity_type="Ticket", limit=3)]
+    assert ids == ["TCKT-000", "TCKT-003", "TCKT-004"]
+
+    reopened = _make_store(kind, tmp_path)
+    assert reopened.get("Ticket", "TCKT-002") is None
+    assert len(list(reopened.query(entity_type="Ticket"))) == 28
+
+
+@pytest.mark.parametrize("kind", ["json", "log", "sqlite"])
+def test_id_range_is_numeric_and_tracks_writes(kind: str, tmp_path: Path):
+    store = _make_store(kind, tmp_path)
+    store.upsert_many(
+        EntityRecord("Ticket", f"TCKT-{i}", "low", "Draft", {}) for i in (9, 10, 100, 1000, 99)
+    )
+    store.upsert(EntityRecord("Ticket", "TICKET_50", "low", "Draft", {}))  # other prefix
+
+    ids = [s.entity_id for s in store.id_range("Ticket", "TCKT-", start=10, end=999)]
+    assert ids == ["TCKT-10", "TCKT-99", "TCKT-100"]
+    first_two = store.id_range("Ticket", "TCKT-", limit=2)
+    assert [s.entity_id for s in first_two] == ["TCKT-9", "TCKT-10"]
+    assert store.last_number("Ticket", "TCKT-") == 1000
+    assert store.last_number("Ticket", "NOPE-") is None
+
+    store.delete_many([("Ticket", "TCKT-1000")])
+    assert store.last_number("Ticket", "TCKT-") == 100
+    assert _make_store(kind, tmp_path).last_number("Ticket", "TICKET_") == 50
+
+
+def test_field_index_build_matches_incremental_puts():
+    summaries = [
+        EntitySummary("Ticket", f"TCKT-{i}", "Draft" if i % 3 else "Done", tier)
+        for i, tier in ((20, "high"), (3, "low"), (100, "high"), (7, "low"), (41, "low"))
+    ] + [EntitySummary("Epic", "misc", "Draft", "low")]
+    incremental = FieldIndex()
+    for summary in summaries:
+        incremental.put(summary)
+    built = FieldIndex.build(summaries)
+
+    for filters in ({}, {"state": "Draft"}, {"risk_tier": "high"}, {"entity_type": "Ticket"}):
+        assert list(built.select(**filters)) == list(incremental.select(**filters))
+    assert list(built.id_range("Ticket", "TCKT-")) == list(incremental.id_range("Ticket", "TCKT-"))
+    assert built.last_number("Ticket", "TCKT-") == 100
+
+    built.put(EntitySummary("Ticket", "TCKT-5", "Draft", "low"))
+    built.remove("Ticket:TCKT-100")
+    assert [s.entity_id for s in built.id_range("Ticket", "TCKT-")] == [
+        "TCKT-3", "TCKT-5", "TCKT-7", "TCKT-20", "TCKT-41"
+    ]
+
+
+def test_backends_must_implement_the_whole_contract():
+    class GetOnly(EntityStore):
+        def get(self, entity_type, entity_id):
+            return None
+
+    with pytest.raises(TypeError, match="id_range"):
+        GetOnly()
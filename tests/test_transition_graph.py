@@ -0,0 +1,77 @@
+import pytest
+
+from app.engine.cache import cache_stats
+from app.engine.compiled_spec import compile_spec
+from app.engine.path_planner import plan_path
+from app.engine.state_machine import TransitionError
+from app.engine.store import EntityRecord
+from app.models import GuardianSpec
+
+
+def _gate(percent=None, human=False):
+    rules = [{"type": "completeness_min", "percent": percent}] if percent is not None else []
+    return {"require_human_approval": human, "rules": rules}
+
+
+def _compiled():
+    return compile_spec(GuardianSpec.model_validate({
+        "risk_tiers": ["low", "high"],
+        "entities": {
+            "Ticket": {
+                "id": {"canonical_regex": "^TCKT-[0-9]+$"},
+                "checklist": ["a", "b"],
+                "states": ["Draft", "Planned", "InProgress", "Review", "Done", "Archived"],
+                "transitions": [
+                    {"from": "Draft", "to": "Planned", "gate": _gate()},
+                    {"from": "Planned", "to": "InProgress", "gate": _gate(50)},
+                    {"from": "InProgress", "to": "Review", "gate": _gate()},
+                    {"from": "Review", "to": "Done", "gate": _gate(100, human=True)},
+                    {"from": "Planned", "to": "Review", "gate": _gate(100)},
+                    {"from": "Review", "to": "InProgress", "gate": _gate()},
+                ],
+            }
+        },
+    }))
+
+
+def test_graph_adjacency_closure_and_shortest_path():
+    graph = _compiled().entities["Ticket"].graph
+    index = graph.index
+    assert graph.successors[index["Planned"]] == (index["InProgress"], index["Review"])
+    assert graph.can_reach("Draft", "Done")
+    assert graph.can_reach("Review", "Review")
+    assert not graph.can_reach("Done", "Draft")
+    assert not graph.can_reach("Draft", "Archived")
+
+    assert graph.shortest_path("Draft", "Done") == ("Draft", "Planned", "Review", "Done")
+    assert graph.shortest_path("Draft", "Archived") is None
+    with pytest.raises(TransitionError):
+        graph.shortest_path("Draft", "Nowhere")
+
+
+def test_shortest_paths_are_cached_per_spec_hash():
+    stats = cache_stats("graph.paths")
+    _compiled().entities["Ticket"].graph.shortest_path("InProgress", "Done")
+    hits = stats.hits
+    # A freshly compiled copy of the same spec shares the cached path.
+    path = _compiled().entities["Ticket"].graph.shortest_path("InProgress", "Done")
+    assert path == ("InProgress", "Review", "Done")
+    assert stats.hits == hits + 1
+
+
+def test_plan_path_predicts_each_hop():
+    entity = _compiled().entities["Ticket"]
+    rec = EntityRecord("Ticket", "TCKT-1", "low", "Draft", {"a": True})
+
+    plan = plan_path(entity, rec, "Done")
+    assert [(h.from_state, h.to_state, h.decision.allowed) for h in plan.hops] == [
+        ("Draft", "Planned", True),
+        ("Planned", "Review", False),
+        ("Review", "Done", False),
+    ]
+    assert plan.hops[1].missing_items == ("b",)
+    assert "Human approval required but not provided." in plan.hops[2].decision.reasons
+    assert plan.hops[0].missing_items == ()
+
+    assert plan_path(entity, rec, "Archived").hops is None
+    assert plan_path(entity, rec, "Draft").hops == ()